@@ -53,9 +53,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'video_app.middleware.SecurityMiddleware',
     'video_app.middleware.LoggingMiddleware',
     'video_app.middleware.RateLimitMiddleware',
+    'video_app.middleware.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -92,11 +92,43 @@ ASGI_APPLICATION = 'myprojectv3.asgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgresql is the profile for multi-process deployments. Under
+# ASGI every request runs its ORM calls in its own thread, so persistent
+# connections would pile up; connections close after each request
+# (DB_CONN_MAX_AGE=0) and PgBouncer does the pooling. The default SQLite
+# profile suits single-node installs; the PRAGMAs in SQLITE_PRAGMAS are
+# applied to every new connection (video_app.db) so readers never block the
+# writer and writers wait up to busy_timeout instead of failing.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'handgesture'),
+            'USER': os.environ.get('DB_USER', 'handgesture'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': 5,
+            },
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',      # readers don't block the writer and vice versa
+    'synchronous': 'NORMAL',    # fsync at checkpoints only; safe with WAL
+    'busy_timeout': 5000,       # milliseconds a writer waits for the lock
 }
 
 # Password validation
@@ -135,9 +167,19 @@ USE_TZ = True
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Offload media transfers to the front server: None, 'xsendfile' (Apache
+# mod_xsendfile) or 'nginx' (X-Accel-Redirect to an internal location
+# at MEDIA_ACCEL_PREFIX aliased to MEDIA_ROOT)
+MEDIA_SENDFILE_BACKEND = os.environ.get('MEDIA_SENDFILE_BACKEND') or None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = 3600  # seconds, for files that are not content-addressed
 
 STATIC_URL = 'static/'
 
+# Uploads above this size are spooled to a temporary file and streamed to
+# storage in chunks, bounding memory per upload
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5 MB
+
 # Absolute path to the directory where static files will be collected.
 # STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
@@ -156,6 +198,123 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Speech Recognition Configuration
+# Backends are tried in order; built-in names are 'vosk', 'whisper' and
+# 'google', or use a dotted path to an ASRBackend subclass. Drop 'google'
+# on nodes without internet access.
+ASR_BACKENDS = ['vosk', 'whisper', 'google']
+ASR_VOSK_MODEL_PATH = os.environ.get('ASR_VOSK_MODEL_PATH', os.path.join(BASE_DIR, 'video_app', 'models', 'vosk-model-ar'))
+# Whisper is never downloaded at runtime: point ASR_WHISPER_MODEL_PATH at a
+# converted model directory, or pre-fetch ASR_WHISPER_MODEL into the Hugging
+# Face cache (`manage.py shell -c "from faster_whisper.utils import
+# download_model; download_model('small')"`). Without either it is skipped.
+ASR_WHISPER_MODEL = os.environ.get('ASR_WHISPER_MODEL', 'small')
+ASR_WHISPER_MODEL_PATH = os.environ.get('ASR_WHISPER_MODEL_PATH') or None
+ASR_CACHE_TIMEOUT = 60 * 60 * 24  # seconds
+ASR_PARALLELISM = 2  # utterances transcribed concurrently per worker
+ASR_VAD = {
+    'aggressiveness': 2,
+    'min_silence_ms': 500,
+    'max_utterance_seconds': 15,
+}
+
+# Media garbage collection: per-directory (relative to MEDIA_ROOT) age and
+# size quotas applied by `manage.py cleanup_media` (schedule it with cron or
+# run `cleanup_media --loop`). Files referenced by a FileField are kept.
+MEDIA_GC_POLICIES = {
+    'temp': {'max_age_hours': 24},
+    'renders': {'max_age_hours': 24 * 30, 'max_bytes': 5 * 1024 ** 3},
+    'gesture_videos': {'max_age_hours': 24 * 30},
+    'voice_files': {'max_age_hours': 24 * 30},
+    # Legacy letter renders ("[...].mp4") in the media root; catalog clips are never matched
+    '': {'pattern': '[[]*.mp4', 'recursive': False, 'max_age_hours': 24},
+}
+
+# Caches: set REDIS_URL when running several worker processes so ASR results
+# and per-session result history are shared between them
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Request screening (video_app.screening): the URL and bodies up to
+# max_body_bytes (urlencoded/JSON, and the text fields of multipart forms)
+# are matched against SECURITY_SCREENING['patterns']; larger bodies and
+# uploaded files are never read. Routes can disable body or all screening.
+SECURITY_SCREENING = {
+    'max_body_bytes': 64 * 1024,
+    'routes': {
+        '/admin/': {'inspect_body': False},
+    },
+}
+
+# Rate limiting: 'local' keeps counters per process, 'cache' shares them
+# through CACHES (use it with REDIS_URL). Heavy routes get tighter quotas.
+RATE_LIMIT_BACKEND = 'cache' if os.environ.get('REDIS_URL') else 'local'
+RATE_LIMITS = {
+    'default': {'limit': 100, 'window': 60},  # requests per window (seconds)
+    'routes': [
+        {'prefix': '/stream-upload/', 'limit': 10, 'window': 60},
+        {'prefix': '/upload/', 'limit': 10, 'window': 60},
+        {'prefix': '/upload_voice/', 'limit': 20, 'window': 60},
+        {'prefix': '/stream-voice-to-sign/', 'limit': 20, 'window': 60},
+        {'prefix': '/voice-to-sign/', 'limit': 20, 'window': 60},
+        # Session-scoped API routes: 'pattern' is a regex matched against the path
+        {'pattern': r'^/api/sessions/[^/]+/voice-to-sign/', 'limit': 20, 'window': 60},
+        {'pattern': r'^/api/sessions/[^/]+/text-to-sign/', 'limit': 30, 'window': 60},
+        {'pattern': r'^/api/sessions/[^/]+/gestures/', 'limit': 60, 'window': 60},
+    ],
+}
+# Reverse proxies in front of the app that append to X-Forwarded-For (e.g. 1
+# behind nginx). 0 ignores the header and limits by REMOTE_ADDR, since
+# clients can send any X-Forwarded-For they like.
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', 0))
+
+# Buffered SystemLog writes (video_app.log_sink)
+LOG_SINK = {
+    'ENABLED': True,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_QUEUE': 10000,
+    'OVERFLOW': 'drop_new',  # 'drop_new', 'drop_old' or 'block'
+}
+
+# Seconds the rollup-based dashboard statistics are cached (video_app.stats)
+STATS_CACHE_TIMEOUT = 30
+
+# Seconds GestureConsumer caches a session's connect payload (session fields
+# and recent gestures); saving a gesture through the consumer invalidates it
+SESSION_DATA_CACHE_TIMEOUT = 10
+
+# Data retention (manage.py purge_old_records): rows older than max_age_days
+# are optionally archived to RETENTION_ARCHIVE_DIR, then deleted in batches.
+# On PostgreSQL, `manage.py partition_tables --convert` switches the tables
+# to monthly partitions so that expired months are dropped whole.
+DATA_RETENTION = {
+    'SystemLog': {'max_age_days': 30, 'archive': False},
+    'HandGesture': {'max_age_days': 365, 'archive': True},
+}
+RETENTION_ARCHIVE_DIR = os.path.join(BASE_DIR, 'archive')
+RETENTION_ARCHIVE_FORMAT = 'jsonl'  # 'jsonl' (gzip) or 'parquet' (requires pyarrow)
+RETENTION_BATCH_SIZE = 5000
+
+# Recent gesture/text results kept per browser session (see video_app.result_store)
+RESULT_STORE = {
+    'CACHE': 'default',
+    'MAX_RESULTS': 20,
+    'TIMEOUT': 60 * 60 * 24,
+    'LOCK_TIMEOUT': 5,
+}
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:8000",
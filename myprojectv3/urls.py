@@ -1,10 +1,18 @@
 # myproject/urls.py
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from video_app.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('video_app.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+# serve_media checks ownership of user uploads before serving them; with a
+# sendfile backend the front server only does the transfer, so the view is
+# safe to keep in production
+if settings.DEBUG or getattr(settings, 'MEDIA_SENDFILE_BACKEND', None):
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
+    ]
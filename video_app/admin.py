@@ -1,41 +1,75 @@
 from django.contrib import admin
-from .models import GestureSession, HandGesture, TextToSign, VoiceToSign, SystemLog
+from django.contrib.auth.models import User
+from django.db.models import Q
+from .models import GestureSession, HandGesture, TextToSign, VoiceToSign, SystemLog, GestureHourlyStats
+from .search import search_q, gesture_type_q
+
+
+class IndexedSearchMixin:
+    """Answer the changelist search box from the full-text index instead of LIKE scans"""
+
+    def search_filter(self, search_term, using):
+        """Q object matching search_term; None falls back to the search_fields lookups"""
+        return None
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        q = self.search_filter(search_term, queryset.db)
+        if q is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(q), False
 
 
 @admin.register(GestureSession)
-class GestureSessionAdmin(admin.ModelAdmin):
+class GestureSessionAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['session_name', 'user', 'created_at', 'is_active']
     list_filter = ['is_active', 'created_at', 'user']
     search_fields = ['session_name', 'user__username']
     readonly_fields = ['id', 'created_at', 'updated_at']
     ordering = ['-created_at']
+    
+    def search_filter(self, search_term, using):
+        return search_q('session', search_term, using) | Q(
+            user__in=User.objects.filter(username__icontains=search_term)
+        )
 
 
 @admin.register(HandGesture)
-class HandGestureAdmin(admin.ModelAdmin):
+class HandGestureAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['gesture_type', 'confidence_score', 'session', 'created_at']
     list_filter = ['gesture_type', 'created_at', 'session']
     search_fields = ['gesture_type', 'session__session_name']
     readonly_fields = ['id', 'created_at']
     ordering = ['-created_at']
+    
+    def search_filter(self, search_term, using):
+        return gesture_type_q(search_term) | search_q('session', search_term, using, prefix='session__')
 
 
 @admin.register(TextToSign)
-class TextToSignAdmin(admin.ModelAdmin):
+class TextToSignAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['input_text', 'processing_status', 'session', 'created_at']
     list_filter = ['processing_status', 'created_at', 'session']
     search_fields = ['input_text', 'session__session_name']
     readonly_fields = ['id', 'created_at', 'completed_at']
     ordering = ['-created_at']
+    
+    def search_filter(self, search_term, using):
+        return search_q('text', search_term, using) | search_q('session', search_term, using, prefix='session__')
 
 
 @admin.register(VoiceToSign)
-class VoiceToSignAdmin(admin.ModelAdmin):
+class VoiceToSignAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['transcribed_text', 'processing_status', 'session', 'created_at']
     list_filter = ['processing_status', 'created_at', 'session']
     search_fields = ['transcribed_text', 'session__session_name']
     readonly_fields = ['id', 'created_at', 'completed_at']
     ordering = ['-created_at']
+    
+    def search_filter(self, search_term, using):
+        return search_q('voice', search_term, using) | search_q('session', search_term, using, prefix='session__')
 
 
 @admin.register(SystemLog)
@@ -48,3 +82,10 @@ class SystemLogAdmin(admin.ModelAdmin):
     
     def has_add_permission(self, request):
         return False  # Prevent manual log creation
+
+
+@admin.register(GestureHourlyStats)
+class GestureHourlyStatsAdmin(admin.ModelAdmin):
+    list_display = ['hour', 'gesture_type', 'gesture_count', 'confidence_sum']
+    list_filter = ['gesture_type']
+    ordering = ['-hour']
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class VideoAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'video_app'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import signals  # noqa: F401
+        from .db import configure_sqlite
+        
+        connection_created.connect(configure_sqlite, dispatch_uid='video_app.configure_sqlite')
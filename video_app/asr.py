@@ -0,0 +1,439 @@
+"""
+Pluggable speech recognition backends for voice-to-sign
+
+Backends consume mono 16-bit PCM and are tried in the order configured by
+``settings.ASR_BACKENDS``. Local CPU engines (Vosk, faster-whisper) load
+their model once per worker process; the Google Web Speech API is kept as
+an optional network plugin. Results are cached by audio hash and every call
+records per-backend latency.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+DEFAULT_BACKENDS = ['vosk', 'whisper', 'google']
+
+
+class TranscriptionError(Exception):
+    """Raised when no backend could transcribe the audio"""
+
+
+class NoSpeechError(TranscriptionError):
+    """Raised when a backend understood no speech in the audio"""
+
+
+class ASRBackend:
+    """Base class for speech recognition backends"""
+    name = 'base'
+    supports_streaming = False
+
+    def is_available(self) -> bool:
+        """Return True if the backend's dependencies and model are present"""
+        return True
+
+    def transcribe(self, pcm: bytes, sample_rate: int, language: str) -> str:
+        """
+        Transcribe mono 16-bit little-endian PCM
+
+        Raises:
+            NoSpeechError: If no speech was recognized
+            TranscriptionError: If the backend failed
+        """
+        raise NotImplementedError
+
+    def create_stream(self, sample_rate: int, language: str) -> 'ASRStream':
+        """Create an incremental recognizer (only if ``supports_streaming``)"""
+        raise NotImplementedError
+
+
+class ASRStream:
+    """Incremental recognizer fed with consecutive PCM chunks"""
+
+    def accept(self, pcm: bytes) -> List[str]:
+        """Feed PCM and return the words finalized by it"""
+        raise NotImplementedError
+
+    def finish(self) -> List[str]:
+        """Flush the recognizer and return the remaining words"""
+        raise NotImplementedError
+
+
+class VoskStream(ASRStream):
+    """Vosk recognizer that finalizes words at each detected utterance end"""
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    @staticmethod
+    def _words(result: str) -> List[str]:
+        return json.loads(result).get('text', '').split()
+
+    def accept(self, pcm: bytes) -> List[str]:
+        if self.recognizer.AcceptWaveform(pcm):
+            return self._words(self.recognizer.Result())
+        return []
+
+    def finish(self) -> List[str]:
+        return self._words(self.recognizer.FinalResult())
+
+
+class BufferedStream(ASRStream):
+    """Streaming adapter for batch-only backends: transcribes on finish"""
+
+    def __init__(self, sample_rate: int, language: str):
+        self.sample_rate = sample_rate
+        self.language = language
+        self.buffer = bytearray()
+
+    def accept(self, pcm: bytes) -> List[str]:
+        self.buffer.extend(pcm)
+        return []
+
+    def finish(self) -> List[str]:
+        if not self.buffer:
+            return []
+        import numpy as np
+        try:
+            samples = np.frombuffer(bytes(self.buffer), dtype='<i2')
+            return transcribe_speech(samples, self.sample_rate, self.language)['text'].split()
+        except NoSpeechError:
+            return []
+
+
+class VoskBackend(ASRBackend):
+    """Offline Kaldi-based recognizer, model loaded once per process"""
+    name = 'vosk'
+    supports_streaming = True
+    _model = None
+    _model_lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        try:
+            import vosk  # noqa: F401
+        except ImportError:
+            return False
+        model_path = getattr(settings, 'ASR_VOSK_MODEL_PATH', None)
+        return bool(model_path) and os.path.isdir(model_path)
+
+    @classmethod
+    def get_model(cls):
+        if cls._model is None:
+            with cls._model_lock:
+                if cls._model is None:
+                    from vosk import Model, SetLogLevel
+                    SetLogLevel(-1)
+                    cls._model = Model(settings.ASR_VOSK_MODEL_PATH)
+                    logger.info(f"Loaded Vosk model from {settings.ASR_VOSK_MODEL_PATH}")
+        return cls._model
+
+    def create_recognizer(self, sample_rate: int):
+        from vosk import KaldiRecognizer
+        return KaldiRecognizer(self.get_model(), sample_rate)
+
+    def transcribe(self, pcm: bytes, sample_rate: int, language: str) -> str:
+        recognizer = self.create_recognizer(sample_rate)
+        chunk_size = 32 * 1024
+        for offset in range(0, len(pcm), chunk_size):
+            recognizer.AcceptWaveform(pcm[offset:offset + chunk_size])
+        text = json.loads(recognizer.FinalResult()).get('text', '').strip()
+        if not text:
+            raise NoSpeechError('No speech recognized')
+        return text
+
+    def create_stream(self, sample_rate: int, language: str) -> ASRStream:
+        return VoskStream(self.create_recognizer(sample_rate))
+
+
+class WhisperBackend(ASRBackend):
+    """
+    Offline faster-whisper recognizer on CPU, model loaded once per process
+
+    The model is never downloaded at request time: it is read from
+    ``ASR_WHISPER_MODEL_PATH`` or from the local Hugging Face cache for
+    ``ASR_WHISPER_MODEL``, and the backend reports itself unavailable when
+    neither is present.
+    """
+    name = 'whisper'
+    _model = None
+    _model_lock = threading.Lock()
+    _model_source: Optional[str] = None
+
+    @classmethod
+    def model_source(cls) -> Optional[str]:
+        """Local directory of the configured model, or None if it is not on disk"""
+        if cls._model_source is not None:
+            return cls._model_source
+        model_path = getattr(settings, 'ASR_WHISPER_MODEL_PATH', None)
+        if model_path:
+            source = model_path if os.path.isdir(model_path) else None
+        else:
+            from faster_whisper.utils import download_model
+            try:
+                source = download_model(getattr(settings, 'ASR_WHISPER_MODEL', 'small'), local_files_only=True)
+            except Exception:
+                source = None
+        # Only a model that is present is remembered, so one installed later is picked up
+        cls._model_source = source
+        return source
+
+    def is_available(self) -> bool:
+        try:
+            import faster_whisper  # noqa: F401
+        except ImportError:
+            return False
+        return self.model_source() is not None
+
+    @classmethod
+    def get_model(cls):
+        if cls._model is None:
+            with cls._model_lock:
+                if cls._model is None:
+                    from faster_whisper import WhisperModel
+                    source = cls.model_source()
+                    if source is None:
+                        raise TranscriptionError('Whisper model is not installed')
+                    cls._model = WhisperModel(source, device='cpu', compute_type='int8', local_files_only=True)
+                    logger.info(f"Loaded Whisper model from {source}")
+        return cls._model
+
+    def transcribe(self, pcm: bytes, sample_rate: int, language: str) -> str:
+        import numpy as np
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        segments, _ = self.get_model().transcribe(audio, language=language, beam_size=1)
+        text = ' '.join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            raise NoSpeechError('No speech recognized')
+        return text
+
+
+class GoogleBackend(ASRBackend):
+    """Google Web Speech API via SpeechRecognition (requires network access)"""
+    name = 'google'
+
+    def is_available(self) -> bool:
+        try:
+            import speech_recognition  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def transcribe(self, pcm: bytes, sample_rate: int, language: str) -> str:
+        import speech_recognition as sr
+        recognizer = sr.Recognizer()
+        try:
+            return recognizer.recognize_google(sr.AudioData(pcm, sample_rate, 2), language=language)
+        except sr.UnknownValueError:
+            raise NoSpeechError('No speech recognized')
+        except sr.RequestError as e:
+            raise TranscriptionError(f'Could not request results; {e}')
+
+
+BACKEND_CLASSES = {
+    'vosk': VoskBackend,
+    'whisper': WhisperBackend,
+    'google': GoogleBackend,
+}
+
+_backends: Optional[List[ASRBackend]] = None
+_backends_lock = threading.Lock()
+_metrics: Dict[str, Dict[str, Any]] = {}
+_metrics_lock = threading.Lock()
+
+
+def get_backends() -> List[ASRBackend]:
+    """
+    Instantiate the configured, available backends once per process
+
+    ``settings.ASR_BACKENDS`` entries are either built-in names or dotted
+    paths to ASRBackend subclasses.
+    """
+    global _backends
+    if _backends is None:
+        with _backends_lock:
+            if _backends is None:
+                backends = []
+                for entry in getattr(settings, 'ASR_BACKENDS', DEFAULT_BACKENDS):
+                    backend_class = BACKEND_CLASSES.get(entry) or import_string(entry)
+                    backend = backend_class()
+                    if backend.is_available():
+                        backends.append(backend)
+                    else:
+                        logger.warning(f"ASR backend {entry} is not available")
+                _backends = backends
+    return _backends
+
+
+def record_latency(backend_name: str, seconds: float, ok: bool):
+    """Record the latency of one backend call"""
+    with _metrics_lock:
+        metrics = _metrics.setdefault(backend_name, {
+            'calls': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0
+        })
+        metrics['calls'] += 1
+        metrics['total_seconds'] += seconds
+        metrics['max_seconds'] = max(metrics['max_seconds'], seconds)
+        if not ok:
+            metrics['errors'] += 1
+    logger.info(f"ASR {backend_name} {'ok' if ok else 'failed'} in {seconds:.3f}s")
+
+
+def get_asr_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Get per-backend latency metrics for this process
+
+    Returns:
+        Mapping of backend name to calls, errors, average and max seconds
+    """
+    with _metrics_lock:
+        return {
+            name: {
+                **metrics,
+                'avg_seconds': metrics['total_seconds'] / metrics['calls'] if metrics['calls'] else 0.0,
+            }
+            for name, metrics in _metrics.items()
+        }
+
+
+def audio_hash(pcm: bytes, sample_rate: int, language: str) -> str:
+    """Cache key digest for a PCM buffer"""
+    digest = hashlib.sha256(f'{sample_rate}:{language}:'.encode('utf-8'))
+    digest.update(pcm)
+    return digest.hexdigest()
+
+
+def transcribe(pcm: bytes, sample_rate: int = SAMPLE_RATE, language: str = 'ar') -> Dict[str, Any]:
+    """
+    Transcribe PCM audio with the first backend that succeeds
+
+    Args:
+        pcm: Mono 16-bit little-endian PCM
+        sample_rate: Sample rate of ``pcm``
+        language: Language code
+
+    Returns:
+        Dictionary with text, backend and cached flag
+
+    Raises:
+        NoSpeechError: If a backend recognized no speech
+        TranscriptionError: If every backend failed
+    """
+    cache_key = f'asr:{audio_hash(pcm, sample_rate, language)}'
+    cached = cache.get(cache_key)
+    if cached:
+        return {**cached, 'cached': True}
+
+    last_error = None
+    for backend in get_backends():
+        start_time = time.monotonic()
+        try:
+            text = backend.transcribe(pcm, sample_rate, language)
+        except NoSpeechError:
+            record_latency(backend.name, time.monotonic() - start_time, ok=True)
+            raise
+        except Exception as e:
+            record_latency(backend.name, time.monotonic() - start_time, ok=False)
+            logger.error(f"ASR backend {backend.name} failed: {str(e)}")
+            last_error = e
+            continue
+
+        record_latency(backend.name, time.monotonic() - start_time, ok=True)
+        result = {'text': text, 'backend': backend.name}
+        cache.set(cache_key, result, getattr(settings, 'ASR_CACHE_TIMEOUT', 60 * 60 * 24))
+        return {**result, 'cached': False}
+
+    raise TranscriptionError(str(last_error) if last_error else 'No speech recognition backend available')
+
+
+_utterance_executor = None
+_utterance_executor_lock = threading.Lock()
+
+
+def _get_utterance_executor():
+    global _utterance_executor
+    if _utterance_executor is None:
+        with _utterance_executor_lock:
+            if _utterance_executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _utterance_executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'ASR_PARALLELISM', 2),
+                    thread_name_prefix='asr'
+                )
+    return _utterance_executor
+
+
+def _transcribe_utterance(pcm: bytes, sample_rate: int, language: str) -> Optional[Dict[str, Any]]:
+    try:
+        return transcribe(pcm, sample_rate, language)
+    except NoSpeechError:
+        return None
+
+
+def transcribe_speech(samples, sample_rate: int = SAMPLE_RATE, language: str = 'ar') -> Dict[str, Any]:
+    """
+    Transcribe a decoded recording utterance by utterance
+
+    Voice activity detection drops silence and splits the recording at
+    pauses; the utterances are transcribed in parallel (each cached on its
+    own) and joined in order.
+
+    Args:
+        samples: Mono int16 NumPy array
+        sample_rate: Sample rate of ``samples``
+        language: Language code
+
+    Returns:
+        Dictionary with text, backends, utterance count and cached flag
+
+    Raises:
+        NoSpeechError: If the recording contains no recognizable speech
+        TranscriptionError: If every backend failed
+    """
+    from .vad import split_utterances
+
+    utterances = split_utterances(samples, sample_rate)
+    if not utterances:
+        raise NoSpeechError('No speech detected')
+
+    if len(utterances) == 1:
+        results = [_transcribe_utterance(utterances[0].tobytes(), sample_rate, language)]
+    else:
+        executor = _get_utterance_executor()
+        futures = [
+            executor.submit(_transcribe_utterance, utterance.tobytes(), sample_rate, language)
+            for utterance in utterances
+        ]
+        results = [future.result() for future in futures]
+
+    results = [result for result in results if result]
+    if not results:
+        raise NoSpeechError('No speech recognized')
+
+    return {
+        'text': ' '.join(result['text'] for result in results),
+        'backends': sorted({result['backend'] for result in results}),
+        'utterances': len(utterances),
+        'cached': all(result['cached'] for result in results),
+    }
+
+
+def open_stream(sample_rate: int = SAMPLE_RATE, language: str = 'ar') -> ASRStream:
+    """
+    Open an incremental recognizer
+
+    Uses the first configured backend that can stream; otherwise audio is
+    buffered and transcribed by the regular backend chain on finish.
+    """
+    for backend in get_backends():
+        if backend.supports_streaming:
+            return backend.create_stream(sample_rate, language)
+    return BufferedStream(sample_rate, language)
@@ -0,0 +1,238 @@
+"""
+In-memory audio ingest for voice uploads
+
+Uploads are decoded straight into a mono 16 kHz 16-bit PCM NumPy buffer.
+WAV is parsed in-process; compressed formats (webm/opus, mp3, m4a) are piped
+through ffmpeg. Containers that need seeking (MP4/M4A with the index at the
+end) are handed to ffmpeg through an anonymous in-memory file, so nothing is
+written to the media tree and nothing is left behind on any code path.
+"""
+import io
+import os
+import asyncio
+import wave
+import shutil
+import logging
+import subprocess
+from typing import Union
+import numpy as np
+from .asr import SAMPLE_RATE
+from .uploads import seekable_source
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_TIMEOUT = 120  # seconds
+
+
+class AudioDecodeError(Exception):
+    """Raised when an upload cannot be decoded to PCM"""
+
+
+def read_upload(upload) -> bytes:
+    """Read an UploadedFile (or bytes) into memory chunk by chunk"""
+    if isinstance(upload, (bytes, bytearray)):
+        return bytes(upload)
+    upload.seek(0)
+    return b''.join(upload.chunks())
+
+
+def _is_wav(data: bytes) -> bool:
+    return data[:4] == b'RIFF' and data[8:12] == b'WAVE'
+
+
+def _is_iso_media(data: bytes) -> bool:
+    # MP4/M4A/MOV: 'ftyp' box right after the first box size
+    return data[4:8] == b'ftyp'
+
+
+def _resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    if source_rate == target_rate or not len(samples):
+        return samples
+    duration = len(samples) / source_rate
+    target_length = int(round(duration * target_rate))
+    positions = np.linspace(0, len(samples) - 1, target_length)
+    return np.interp(positions, np.arange(len(samples)), samples)
+
+
+class StreamingResampler:
+    """
+    Linear-interpolation resampler for audio that arrives in chunks
+
+    Output sample ``n`` is always taken at input position ``n * source_rate /
+    target_rate`` counted from the start of the stream, and the input samples
+    around the next position are carried over, so chunk boundaries neither
+    add clicks nor shift the timing the way resampling each chunk on its own
+    does.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int):
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.pending_start = 0  # stream index of pending[0]
+        self.produced = 0       # output samples emitted so far
+
+    def feed(self, samples: np.ndarray) -> np.ndarray:
+        """Resample the next chunk; returns the output samples it completes"""
+        if self.source_rate == self.target_rate:
+            return samples
+        self.pending = np.concatenate([self.pending, samples.astype(np.float32)])
+        last = self.pending_start + len(self.pending) - 1
+        if last < 0:
+            return np.zeros(0, dtype=np.float32)
+        # Every output sample whose position is covered by the input received so far
+        end = last * self.target_rate // self.source_rate + 1
+        positions = np.arange(self.produced, end) * self.source_rate / self.target_rate
+        output = np.interp(positions - self.pending_start, np.arange(len(self.pending)), self.pending)
+        self.produced = end
+        # Keep the sample at or before the next output position
+        keep_from = min(end * self.source_rate // self.target_rate - self.pending_start, len(self.pending))
+        if keep_from > 0:
+            self.pending = self.pending[keep_from:]
+            self.pending_start += keep_from
+        return output
+
+
+def decode_wav(data: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode 8/16/32-bit PCM WAV bytes to mono int16 at ``sample_rate``
+
+    Raises:
+        AudioDecodeError: If the WAV is not plain PCM
+    """
+    try:
+        with wave.open(io.BytesIO(data)) as wav_file:
+            channels = wav_file.getnchannels()
+            sample_width = wav_file.getsampwidth()
+            source_rate = wav_file.getframerate()
+            frames = wav_file.readframes(wav_file.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise AudioDecodeError(f'Invalid WAV file: {e}')
+
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) * 256
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32)
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 65536
+    else:
+        raise AudioDecodeError(f'Unsupported WAV sample width: {sample_width}')
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    samples = _resample(samples, source_rate, sample_rate)
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+def _run_ffmpeg(input_arg: str, stdin_data: Union[bytes, None], sample_rate: int) -> bytes:
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        raise AudioDecodeError('ffmpeg is not installed')
+
+    command = [ffmpeg, '-hide_banner', '-loglevel', 'error']
+    if stdin_data is None:
+        command.append('-nostdin')
+    command += [
+        '-i', input_arg,
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', '1', '-ar', str(sample_rate),
+        'pipe:1',
+    ]
+    try:
+        completed = subprocess.run(
+            command,
+            input=stdin_data,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=FFMPEG_TIMEOUT,
+            check=False,
+        )
+    except subprocess.TimeoutExpired:
+        raise AudioDecodeError('Audio decoding timed out')
+
+    if completed.returncode != 0:
+        raise AudioDecodeError(completed.stderr.decode('utf-8', 'replace').strip() or 'ffmpeg failed')
+    return completed.stdout
+
+
+def decode_audio(upload, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an uploaded voice note to mono int16 PCM at ``sample_rate``
+
+    Args:
+        upload: Django UploadedFile or raw bytes (wav, webm/opus, ogg, mp3, m4a)
+        sample_rate: Target sample rate
+
+    Returns:
+        1-D int16 NumPy array
+
+    Raises:
+        AudioDecodeError: If the audio cannot be decoded
+    """
+    data = read_upload(upload)
+    if not data:
+        raise AudioDecodeError('Audio file is empty')
+
+    if _is_wav(data):
+        try:
+            return decode_wav(data, sample_rate)
+        except AudioDecodeError as e:
+            # Compressed WAV variants are left to ffmpeg
+            logger.debug(f"Falling back to ffmpeg for WAV: {str(e)}")
+
+    if _is_iso_media(data):
+        # The moov index may sit at the end of the file, so ffmpeg needs to seek
+        with seekable_source(data) as path:
+            pcm = _run_ffmpeg(path, None, sample_rate)
+    else:
+        pcm = _run_ffmpeg('pipe:0', data, sample_rate)
+
+    return np.frombuffer(pcm, dtype='<i2')
+
+
+class StreamingDecoder:
+    """
+    Incrementally decode a compressed audio stream (webm/opus, ogg) to PCM
+
+    Chunks written with ``feed`` are piped into a long-running ffmpeg
+    process whose PCM output is read back with ``read`` as soon as it is
+    produced. Probing is kept minimal so the first words decode immediately.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.process = None
+
+    async def start(self):
+        ffmpeg = shutil.which('ffmpeg')
+        if not ffmpeg:
+            raise AudioDecodeError('ffmpeg is not installed')
+        self.process = await asyncio.create_subprocess_exec(
+            ffmpeg, '-hide_banner', '-loglevel', 'error',
+            '-probesize', '4096', '-analyzeduration', '0', '-fflags', 'nobuffer',
+            '-i', 'pipe:0',
+            '-f', 's16le', '-acodec', 'pcm_s16le',
+            '-ac', '1', '-ar', str(self.sample_rate),
+            'pipe:1',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    async def feed(self, data: bytes):
+        self.process.stdin.write(data)
+        await self.process.stdin.drain()
+
+    async def read(self, size: int = 8000) -> bytes:
+        """Read decoded PCM; returns b'' once the stream has ended"""
+        return await self.process.stdout.read(size)
+
+    async def close(self):
+        """Signal end of input; remaining PCM can still be read"""
+        if self.process and self.process.stdin and not self.process.stdin.is_closing():
+            self.process.stdin.close()
+
+    async def terminate(self):
+        if self.process and self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
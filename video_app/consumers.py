@@ -7,8 +7,16 @@ import logging
 import uuid
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from .models import GestureSession, HandGesture, SystemLog
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q, Subquery
+from .log_sink import get_log_sink
+from .models import GestureSession, HandGesture
+from .notifications import results_group
+from .utils import log_system_event, invalidate_session_data, session_data_cache_key, session_data_version
 # Lazy imports to avoid loading heavy libraries during startup
 # from .video_processing import process_gesture_video_async
 
@@ -21,6 +29,7 @@ class GestureConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.session_id = self.scope['url_route']['kwargs']['session_id']
         self.session_group_name = f'gesture_session_{self.session_id}'
+        self.voice_stream = None
         
         # Join session group
         await self.channel_layer.group_add(
@@ -47,9 +56,18 @@ class GestureConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
         
+        if self.voice_stream:
+            await self.voice_stream.abort()
+            self.voice_stream = None
+        
         await self.log_system_event('INFO', f'WebSocket disconnected from session {self.session_id}')
     
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
+        if bytes_data is not None:
+            # Binary frames carry audio for the active voice stream
+            await self.handle_voice_chunk(bytes_data)
+            return
+        
         try:
             data = json.loads(text_data)
             message_type = data.get('type')
@@ -60,6 +78,10 @@ class GestureConsumer(AsyncWebsocketConsumer):
                 await self.handle_text_to_sign(data)
             elif message_type == 'voice_to_sign':
                 await self.handle_voice_to_sign(data)
+            elif message_type == 'voice_stream_start':
+                await self.handle_voice_stream_start(data)
+            elif message_type == 'voice_stream_end':
+                await self.handle_voice_stream_end(data)
             elif message_type == 'ping':
                 await self.send(text_data=json.dumps({'type': 'pong'}))
             else:
@@ -158,20 +180,17 @@ class GestureConsumer(AsyncWebsocketConsumer):
                 'message': 'Converting text to sign language...'
             }))
             
-            # Import and process text to sign
+            # Queue the conversion; the render job runner pushes the result to the session group
             from .video_processing import process_text_to_sign_async
             result = await process_text_to_sign_async(text, self.session_id)
             
             if result['success']:
-                await self.channel_layer.group_send(
-                    self.session_group_name,
-                    {
-                        'type': 'text_to_sign_result',
-                        'input_text': text,
-                        'video_url': result.get('video_url'),
-                        'conversion_id': result.get('conversion_id')
-                    }
-                )
+                await self.send(text_data=json.dumps({
+                    'type': 'processing_status',
+                    'status': 'queued',
+                    'message': 'Text queued for conversion',
+                    'conversion_id': result.get('conversion_id')
+                }))
             else:
                 await self.send(text_data=json.dumps({
                     'type': 'error',
@@ -230,6 +249,125 @@ class GestureConsumer(AsyncWebsocketConsumer):
                 'message': 'Failed to process voice to sign conversion'
             }))
     
+    async def handle_voice_stream_start(self, data):
+        """Start an incremental voice-to-sign stream fed by binary frames"""
+        from .voice_stream import VoiceStream
+        
+        if self.voice_stream:
+            await self.voice_stream.abort()
+        
+        stream_id = str(uuid.uuid4())
+        
+        async def on_words(words):
+            await self.push_voice_words(stream_id, stream, words)
+        
+        stream = VoiceStream(
+            on_words,
+            input_format=data.get('format', 'webm'),
+            sample_rate=int(data.get('sample_rate', 16000)),
+            language=data.get('language', 'ar')
+        )
+        try:
+            await stream.start()
+        except Exception as e:
+            logger.error(f"Error starting voice stream: {str(e)}")
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': 'Failed to start voice stream'
+            }))
+            return
+        
+        self.voice_stream = stream
+        self.voice_stream_id = stream_id
+        await self.send(text_data=json.dumps({
+            'type': 'processing_status',
+            'status': 'streaming',
+            'message': 'Listening...',
+            'conversion_id': stream_id
+        }))
+    
+    async def handle_voice_chunk(self, chunk):
+        """Feed one binary audio frame to the active voice stream"""
+        from .voice_stream import VoiceStreamError
+        
+        if not self.voice_stream:
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': 'No voice stream started'
+            }))
+            return
+        
+        try:
+            await self.voice_stream.feed(chunk)
+        except VoiceStreamError as e:
+            await self.voice_stream.abort()
+            self.voice_stream = None
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': str(e)
+            }))
+        except Exception as e:
+            logger.error(f"Error handling voice chunk: {str(e)}")
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': 'Failed to process voice stream'
+            }))
+    
+    async def handle_voice_stream_end(self, data):
+        """Flush the voice stream and push the full-sentence render"""
+        stream, self.voice_stream = self.voice_stream, None
+        if not stream:
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': 'No voice stream started'
+            }))
+            return
+        
+        try:
+            transcript = await stream.finish()
+            render = None
+            if transcript:
+                from .rendering import render_text
+                loop = asyncio.get_running_loop()
+                render = await loop.run_in_executor(None, render_text, transcript)
+            
+            await self.channel_layer.group_send(
+                self.session_group_name,
+                {
+                    'type': 'voice_to_sign_result',
+                    'partial': False,
+                    'transcribed_text': transcript,
+                    'video_url': render['url'] if render else None,
+                    'conversion_id': self.voice_stream_id
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error finishing voice stream: {str(e)}")
+            await stream.abort()
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': 'Failed to process voice stream'
+            }))
+    
+    async def push_voice_words(self, stream_id, stream, words):
+        """Resolve newly finalized words against the sign catalog and push them"""
+        from .rendering import render_word
+        loop = asyncio.get_running_loop()
+        
+        for word in words:
+            video = await loop.run_in_executor(None, render_word, word)
+            await self.channel_layer.group_send(
+                self.session_group_name,
+                {
+                    'type': 'voice_to_sign_result',
+                    'partial': True,
+                    'word': word,
+                    'transcribed_text': ' '.join(stream.words),
+                    'video_url': video['url'] if video else None,
+                    'conversion_id': stream_id
+                }
+            )
+    
     # WebSocket event handlers
     async def gesture_result(self, event):
         """Send gesture recognition result to WebSocket"""
@@ -254,64 +392,102 @@ class GestureConsumer(AsyncWebsocketConsumer):
         """Send voice-to-sign result to WebSocket"""
         await self.send(text_data=json.dumps({
             'type': 'voice_to_sign_result',
+            'partial': event.get('partial', False),
+            'word': event.get('word'),
             'transcribed_text': event['transcribed_text'],
             'video_url': event['video_url'],
             'conversion_id': event['conversion_id']
         }))
     
+    async def conversion_failed(self, event):
+        """Send a failed background conversion to WebSocket"""
+        await self.send(text_data=json.dumps({
+            'type': 'error',
+            'conversion_type': event['conversion_type'],
+            'conversion_id': event['conversion_id'],
+            'message': event['error']
+        }))
+    
     # Database operations
     @database_sync_to_async
     def get_session_data(self):
-        """Get session data from database"""
+        """
+        Get session data, served from a short-lived cache
+        
+        Session fields and the ten most recent gestures come from one query:
+        the session LEFT JOINed to those of its gestures whose id is in the
+        top-ten subquery (a session without gestures yields one row of NULLs).
+        The cache key carries the session's data version, which save_gesture
+        bumps, so a payload read before a new gesture is never served after it.
+        """
+        cache_key = session_data_cache_key(self.session_id, session_data_version(self.session_id))
+        session_data = cache.get(cache_key)
+        if session_data is not None:
+            return session_data
+        
         try:
-            session = GestureSession.objects.get(id=self.session_id)
-            gestures = HandGesture.objects.filter(session=session).order_by('-created_at')[:10]
-            
-            return {
-                'session_id': str(session.id),
-                'session_name': session.session_name,
-                'created_at': session.created_at.isoformat(),
-                'recent_gestures': [
-                    {
-                        'id': str(gesture.id),
-                        'gesture_type': gesture.gesture_type,
-                        'confidence': gesture.confidence_score,
-                        'created_at': gesture.created_at.isoformat()
-                    }
-                    for gesture in gestures
-                ]
-            }
-        except GestureSession.DoesNotExist:
+            recent_ids = HandGesture.objects.filter(session_id=self.session_id).order_by('-created_at').values('id')[:10]
+            rows = list(
+                GestureSession.objects.filter(id=self.session_id)
+                .filter(Q(gestures__isnull=True) | Q(gestures__id__in=Subquery(recent_ids)))
+                .values(
+                    'id', 'session_name', 'created_at',
+                    'gestures__id', 'gestures__gesture_type', 'gestures__confidence_score', 'gestures__created_at'
+                )
+                .order_by('-gestures__created_at')
+            )
+        except ValidationError:
+            rows = []  # Not a UUID
+        
+        if not rows:
+            # Not cached: the session may be created a moment later
             return {'error': 'Session not found'}
+
+        session_data = {
+            'session_id': str(rows[0]['id']),
+            'session_name': rows[0]['session_name'],
+            'created_at': rows[0]['created_at'].isoformat(),
+            'recent_gestures': [
+                {
+                    'id': str(row['gestures__id']),
+                    'gesture_type': row['gestures__gesture_type'],
+                    'confidence': row['gestures__confidence_score'],
+                    'created_at': row['gestures__created_at'].isoformat()
+                }
+                for row in rows if row['gestures__id'] is not None
+            ]
+        }
+        cache.set(cache_key, session_data, getattr(settings, 'SESSION_DATA_CACHE_TIMEOUT', 10))
+        return session_data
     
     @database_sync_to_async
     def save_gesture(self, result):
         """Save gesture result to database"""
         try:
-            session = GestureSession.objects.get(id=self.session_id)
-            gesture = HandGesture.objects.create(
-                session=session,
-                gesture_type=result['gesture_type'],
-                confidence_score=result['confidence']
-            )
+            # Insert by session id; the foreign key constraint rejects unknown sessions.
+            # The stats rollups are updated by post_save; commit them with the row.
+            with transaction.atomic():
+                gesture = HandGesture.objects.create(
+                    session_id=self.session_id,
+                    gesture_type=result['gesture_type'],
+                    confidence_score=result['confidence']
+                )
+            invalidate_session_data([self.session_id])
             return gesture
         except Exception as e:
             logger.error(f"Error saving gesture: {str(e)}")
             raise
     
-    @database_sync_to_async
-    def log_system_event(self, level, message):
-        """Log system event to database"""
-        try:
-            session = GestureSession.objects.get(id=self.session_id)
-            SystemLog.objects.create(
-                level=level,
-                message=message,
-                module='WebSocket Consumer',
-                session=session
+    async def log_system_event(self, level, message):
+        """Queue a system event for the buffered SystemLog sink"""
+        # Attached by id: no session lookup, and no database work on the event loop
+        if get_log_sink() is not None:
+            log_system_event(level, message, 'WebSocket Consumer', session_id=self.session_id)
+        else:
+            # With the sink disabled the event is written synchronously, off the loop
+            await database_sync_to_async(log_system_event)(
+                level, message, 'WebSocket Consumer', session_id=self.session_id
             )
-        except Exception as e:
-            logger.error(f"Error logging system event: {str(e)}")
     
 
 
@@ -369,3 +545,35 @@ class GestureStreamConsumer(AsyncWebsocketConsumer):
             'type': 'stream_update',
             'data': event['data']
         }))
+
+
+class ResultConsumer(AsyncWebsocketConsumer):
+    """WebSocket push of legacy gesture and text results for the browser session"""
+    
+    async def connect(self):
+        session = self.scope.get('session')
+        if session is None or not session.session_key:
+            # No session cookie yet; the client should use results/events/ or poll
+            await self.close()
+            return
+        
+        self.results_group_name = results_group(session.session_key)
+        await self.channel_layer.group_add(
+            self.results_group_name,
+            self.channel_name
+        )
+        await self.accept()
+    
+    async def disconnect(self, close_code):
+        if hasattr(self, 'results_group_name'):
+            await self.channel_layer.group_discard(
+                self.results_group_name,
+                self.channel_name
+            )
+    
+    async def result_ready(self, event):
+        """Send a gesture or text result to WebSocket"""
+        await self.send(text_data=json.dumps({
+            'type': f"{event['result']['kind']}_result",
+            **event['result']
+        }))
@@ -0,0 +1,48 @@
+"""
+Per-connection database setup
+
+SQLite keeps journal mode, synchronous level and busy timeout per
+connection (WAL persists in the file, the others do not), so
+``settings.SQLITE_PRAGMAS`` is applied from the ``connection_created``
+signal each time Django opens one.
+"""
+import logging
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+def get_sqlite_pragmas() -> dict:
+    return getattr(settings, 'SQLITE_PRAGMAS', {})
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created receiver applying settings.SQLITE_PRAGMAS"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_sqlite_pragmas()
+    if not pragmas:
+        return
+    # Use the raw DB-API connection; Django's cursor() would re-enter connection setup
+    cursor = connection.connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    except Exception as e:
+        logger.error(f"Failed to apply SQLite PRAGMAs: {str(e)}")
+    finally:
+        cursor.close()
+
+
+def describe_connection(connection) -> dict:
+    """Effective connection settings, for diagnostics and benchmarks"""
+    info = {
+        'vendor': connection.vendor,
+        'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+        'conn_health_checks': connection.settings_dict.get('CONN_HEALTH_CHECKS'),
+    }
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for name in get_sqlite_pragmas():
+                cursor.execute(f'PRAGMA {name}')
+                info[name] = cursor.fetchone()[0]
+    return info
@@ -0,0 +1,260 @@
+"""
+Render job queue for TextToSign and VoiceToSign conversions
+
+Conversion rows double as the job queue: the API views create them as
+``pending`` and a runner claims them with a conditional UPDATE (plus
+``SELECT ... FOR UPDATE SKIP LOCKED`` where the database supports it), so any
+number of runner processes can share the table without rendering a row
+twice. Finished conversions are pushed to the session's channel group.
+"""
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import List, Optional
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import connection, transaction, close_old_connections
+from django.utils import timezone
+from .models import GestureSession, TextToSign, VoiceToSign
+from .rendering import render_text
+
+logger = logging.getLogger(__name__)
+
+# Status a job moves into when it is claimed by a runner
+CLAIM_STATUS = {
+    TextToSign: 'processing',
+    VoiceToSign: 'transcribing',
+}
+
+
+def enqueue_text_to_sign(text: str, session_id: str) -> TextToSign:
+    """
+    Queue a text-to-sign conversion for the job runner
+
+    Args:
+        text: Text to convert
+        session_id: Owning session ID
+
+    Returns:
+        The pending TextToSign row
+    """
+    session = GestureSession.objects.get(id=session_id)
+    return TextToSign.objects.create(
+        session=session,
+        input_text=text,
+        processing_status='pending'
+    )
+
+
+def claim_jobs(model, limit: int) -> List:
+    """
+    Claim up to ``limit`` pending rows of a conversion model
+
+    A row is only returned when this call flipped it out of ``pending``,
+    so concurrent runners never receive the same row.
+
+    Args:
+        model: TextToSign or VoiceToSign
+        limit: Maximum number of rows to claim
+
+    Returns:
+        List of claimed primary keys, oldest first
+    """
+    if limit <= 0:
+        return []
+
+    pending = model.objects.filter(processing_status='pending').order_by('created_at')
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        candidates = list(pending.values_list('pk', flat=True)[:limit])
+
+        claimed = []
+        for pk in candidates:
+            updated = model.objects.filter(pk=pk, processing_status='pending').update(
+                processing_status=CLAIM_STATUS[model], claimed_at=timezone.now()
+            )
+            if updated:
+                claimed.append(pk)
+    return claimed
+
+
+def requeue_stale_jobs(max_age_minutes: int = 30) -> int:
+    """
+    Return jobs abandoned by a crashed runner to the queue
+
+    A row counts as stale once it is still in progress more than
+    ``max_age_minutes`` after it was claimed or last reached a new stage.
+
+    Returns:
+        Number of rows requeued
+    """
+    cutoff = timezone.now() - timedelta(minutes=max_age_minutes)
+    requeued = 0
+    for model, status in CLAIM_STATUS.items():
+        requeued += model.objects.filter(
+            processing_status__in=[status, 'processing'],
+            claimed_at__lt=cutoff
+        ).update(processing_status='pending', claimed_at=None)
+    return requeued
+
+
+def notify_session(session_id, event: dict):
+    """
+    Push an event to a session's WebSocket group
+
+    Args:
+        session_id: Session ID
+        event: Channel layer event (must include ``type``)
+    """
+    try:
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        async_to_sync(channel_layer.group_send)(f'gesture_session_{session_id}', event)
+    except Exception as e:
+        logger.error(f"Failed to notify session {session_id}: {str(e)}")
+
+
+def _finish(conversion, render: Optional[dict]):
+    if render:
+        conversion.output_video.name = render['name']
+        conversion.processing_status = 'completed'
+    else:
+        conversion.processing_status = 'failed'
+    conversion.completed_at = timezone.now()
+
+
+def _notify_failed(conversion, kind: str, error: str):
+    notify_session(conversion.session_id, {
+        'type': 'conversion_failed',
+        'conversion_type': kind,
+        'conversion_id': str(conversion.id),
+        'error': error
+    })
+
+
+def run_text_to_sign_job(pk) -> bool:
+    """
+    Render a claimed TextToSign row
+
+    Returns:
+        True if the conversion completed
+    """
+    conversion = TextToSign.objects.get(pk=pk)
+    try:
+        render = render_text(conversion.input_text)
+    except Exception as e:
+        logger.error(f"Error rendering text conversion {pk}: {str(e)}")
+        render = None
+
+    _finish(conversion, render)
+    conversion.save(update_fields=['output_video', 'processing_status', 'completed_at'])
+
+    if not render:
+        _notify_failed(conversion, 'text_to_sign', 'Failed to convert text to sign')
+        return False
+
+    notify_session(conversion.session_id, {
+        'type': 'text_to_sign_result',
+        'input_text': conversion.input_text,
+        'video_url': render['url'],
+        'conversion_id': str(conversion.id)
+    })
+    return True
+
+
+def run_voice_to_sign_job(pk) -> bool:
+    """
+    Transcribe and render a claimed VoiceToSign row
+
+    Returns:
+        True if the conversion completed
+    """
+    conversion = VoiceToSign.objects.get(pk=pk)
+    render = None
+    try:
+        from .video_processing import transcribe_audio_file
+        conversion.transcribed_text = transcribe_audio_file(conversion.audio_file.path)
+        conversion.processing_status = 'processing'
+        # Transcription can be slow; restart the stale clock for the render stage
+        conversion.claimed_at = timezone.now()
+        conversion.save(update_fields=['transcribed_text', 'processing_status', 'claimed_at'])
+        render = render_text(conversion.transcribed_text)
+    except Exception as e:
+        logger.error(f"Error processing voice conversion {pk}: {str(e)}")
+
+    _finish(conversion, render)
+    conversion.save(update_fields=['transcribed_text', 'output_video', 'processing_status', 'completed_at'])
+
+    if not render:
+        _notify_failed(conversion, 'voice_to_sign', 'Failed to convert voice to sign')
+        return False
+
+    notify_session(conversion.session_id, {
+        'type': 'voice_to_sign_result',
+        'transcribed_text': conversion.transcribed_text,
+        'video_url': render['url'],
+        'conversion_id': str(conversion.id)
+    })
+    return True
+
+
+JOB_HANDLERS = {
+    TextToSign: run_text_to_sign_job,
+    VoiceToSign: run_voice_to_sign_job,
+}
+
+
+class JobRunner:
+    """Polls the conversion tables and renders claimed rows in a thread pool"""
+
+    def __init__(self, workers: int = 2, poll_interval: float = 1.0):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='render-job')
+        self.in_flight = set()
+
+    def _run(self, handler, pk):
+        try:
+            handler(pk)
+        except Exception as e:
+            logger.error(f"Render job {pk} crashed: {str(e)}")
+        finally:
+            close_old_connections()
+
+    def poll(self) -> int:
+        """
+        Claim as many jobs as there are idle workers and submit them
+
+        Returns:
+            Number of jobs submitted
+        """
+        self.in_flight = {future for future in self.in_flight if not future.done()}
+        submitted = 0
+        for model, handler in JOB_HANDLERS.items():
+            free = self.workers - len(self.in_flight)
+            for pk in claim_jobs(model, free):
+                self.in_flight.add(self.executor.submit(self._run, handler, pk))
+                submitted += 1
+        return submitted
+
+    def run_forever(self):
+        """Poll until interrupted, sleeping only when there was nothing to do"""
+        try:
+            while True:
+                if not self.poll():
+                    time.sleep(self.poll_interval)
+        finally:
+            self.shutdown()
+
+    def drain(self):
+        """Process every currently pending job, then return"""
+        while self.poll() or self.in_flight:
+            for future in list(self.in_flight):
+                future.result()
+            self.in_flight.clear()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
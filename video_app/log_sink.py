@@ -0,0 +1,208 @@
+"""
+Buffered SystemLog writer
+
+Events are queued in memory and a background thread writes them with one
+``bulk_create`` per batch, when the batch is full or the flush interval
+has passed. Callers never wait on the database: when the queue is full the
+overflow policy either drops the new event, drops the oldest queued event,
+or blocks for a bounded time. Blocking never happens on a running event
+loop; there 'block' behaves like 'drop_new'. Sessions are attached by id,
+without loading the GestureSession row.
+
+``created_at`` is ``auto_now_add``, so stored timestamps are the flush
+time, at most FLUSH_INTERVAL after the event.
+"""
+import os
+import time
+import asyncio
+import uuid
+import queue
+import atexit
+import logging
+import threading
+from typing import Optional
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_SINK = {
+    'ENABLED': True,          # False writes every event synchronously
+    'BATCH_SIZE': 100,        # flush when this many events are queued
+    'FLUSH_INTERVAL': 2.0,    # seconds, flush at least this often
+    'MAX_QUEUE': 10000,       # events held in memory before the overflow policy applies
+    'OVERFLOW': 'drop_new',   # 'drop_new', 'drop_old' or 'block'
+    'BLOCK_TIMEOUT': 0.1,     # seconds a 'block' producer waits before dropping
+}
+
+OVERFLOW_POLICIES = ('drop_new', 'drop_old', 'block')
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def coerce_session_id(session_id) -> Optional[uuid.UUID]:
+    """GestureSession primary key from a UUID or its string form; None if it is not one"""
+    if session_id is None or isinstance(session_id, uuid.UUID):
+        return session_id
+    try:
+        return uuid.UUID(str(session_id))
+    except ValueError:
+        return None
+
+
+class SystemLogSink:
+    """Queue of pending SystemLog rows flushed in batches by a daemon thread"""
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 2.0, max_queue: int = 10000,
+                 overflow: str = 'drop_new', block_timeout: float = 0.1):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.written = 0
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Forked workers inherit the object but not the thread
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.Queue(maxsize=self.queue.maxsize)
+            self._thread = threading.Thread(target=self._run, name='systemlog-sink', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def emit(self, level: str, message: str, module: str, session_id=None):
+        """
+        Queue an event for writing
+
+        Args:
+            level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+            message: Log message
+            module: Module name
+            session_id: Optional GestureSession primary key; dropped if it is not a UUID
+        """
+        from .models import SystemLog
+        self._ensure_started()
+        # An invalid id would fail bulk_create validation for the whole batch
+        entry = SystemLog(level=level, message=message, module=module,
+                          session_id=coerce_session_id(session_id))
+
+        try:
+            if self.overflow == 'block' and not _in_event_loop():
+                self.queue.put(entry, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(entry)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == 'drop_old':
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(entry)
+            except (queue.Empty, queue.Full):
+                pass
+        self._record_drop()
+
+    def _record_drop(self):
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(f"SystemLog queue full, {self.dropped} events dropped so far")
+
+    def _drain(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        from .models import SystemLog
+        if not batch:
+            return
+        try:
+            try:
+                SystemLog.objects.bulk_create(batch, batch_size=self.batch_size)
+            except IntegrityError:
+                # An event referenced a session that does not exist; keep the event without it
+                self._detach_unknown_sessions(batch)
+                SystemLog.objects.bulk_create(batch, batch_size=self.batch_size)
+            self.written += len(batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} system log events: {str(e)}")
+        finally:
+            close_old_connections()
+
+    def _detach_unknown_sessions(self, batch):
+        from .models import GestureSession
+        session_ids = {entry.session_id for entry in batch if entry.session_id}
+        existing = {
+            str(pk) for pk in GestureSession.objects.filter(pk__in=session_ids).values_list('pk', flat=True)
+        }
+        for entry in batch:
+            if entry.session_id and str(entry.session_id) not in existing:
+                entry.session_id = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            # Collect until the batch is full or the oldest event has waited long enough
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with self._flush_lock:
+                self._write(batch)
+
+    def flush(self):
+        """Write everything queued so far from the calling thread"""
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    break
+                self._write(batch)
+
+
+_sink: Optional[SystemLogSink] = None
+
+
+def get_log_sink() -> Optional[SystemLogSink]:
+    """Process-wide sink configured from settings.LOG_SINK, or None if disabled"""
+    global _sink
+    config = {**DEFAULT_LOG_SINK, **getattr(settings, 'LOG_SINK', {})}
+    if not config['ENABLED']:
+        return None
+    if _sink is None:
+        _sink = SystemLogSink(
+            batch_size=config['BATCH_SIZE'],
+            flush_interval=config['FLUSH_INTERVAL'],
+            max_queue=config['MAX_QUEUE'],
+            overflow=config['OVERFLOW'],
+            block_timeout=config['BLOCK_TIMEOUT'],
+        )
+        atexit.register(_sink.flush)
+    return _sink
@@ -0,0 +1,106 @@
+"""
+Management command to benchmark the configured database with the app's own write patterns
+
+Several threads concurrently insert gestures (as GestureConsumer.save_gesture
+does), create sessions, write system logs and read a session's recent
+gestures. Compare profiles by running it under each, e.g.
+``DB_ENGINE=postgresql python manage.py bench_db``.
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, connections
+from video_app.db import describe_connection
+from video_app.models import GestureSession, HandGesture, SystemLog
+
+BENCH_NAME = 'bench_db'
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[int(fraction * (len(sorted_values) - 1))]
+
+
+class Command(BaseCommand):
+    help = 'Measure concurrent write and read throughput of the configured database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent workers')
+        parser.add_argument('--operations', type=int, default=250, help='Operations per worker and workload')
+        parser.add_argument('--keep', action='store_true', help='Keep the rows created by the benchmark')
+
+    def handle(self, *args, **options):
+        threads, operations = options['threads'], options['operations']
+        info = ', '.join(f'{key}={value}' for key, value in describe_connection(connection).items())
+        self.stdout.write(f"Database: {info}")
+        self.stdout.write(f"{threads} threads x {operations} operations per workload\n")
+
+        session = GestureSession.objects.create(session_name=BENCH_NAME, is_active=False)
+        gesture_types = [value for value, label in HandGesture.GESTURE_TYPES]
+
+        workloads = [
+            ('gesture insert', lambda i: HandGesture.objects.create(
+                session=session, gesture_type=gesture_types[i % len(gesture_types)], confidence_score=0.9
+            )),
+            ('session create', lambda i: GestureSession.objects.create(
+                session_name=f'{BENCH_NAME} {i}', is_active=False
+            )),
+            ('log insert', lambda i: SystemLog.objects.create(
+                level='DEBUG', message=f'{BENCH_NAME} {i}', module=BENCH_NAME, session_id=session.pk
+            )),
+            ('recent gestures', lambda i: list(
+                HandGesture.objects.filter(session=session).order_by('-created_at')[:10]
+            )),
+        ]
+
+        try:
+            self.stdout.write(f"{'workload':<16}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+            for name, operation in workloads:
+                result = self.run_workload(operation, threads, operations)
+                self.stdout.write(
+                    f"{name:<16}{result['throughput']:>10.1f}{result['p50']:>10.2f}"
+                    f"{result['p95']:>10.2f}{result['p99']:>10.2f}{result['errors']:>8}"
+                )
+        finally:
+            if not options['keep']:
+                SystemLog.objects.filter(module=BENCH_NAME).delete()
+                GestureSession.objects.filter(session_name__startswith=BENCH_NAME).delete()
+
+    def run_workload(self, operation, threads, operations):
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(worker_index):
+            local_latencies, local_errors = [], 0
+            try:
+                for i in range(operations):
+                    started = time.perf_counter()
+                    try:
+                        operation(worker_index * operations + i)
+                    except DatabaseError:
+                        # e.g. "database is locked" once busy_timeout is exceeded
+                        local_errors += 1
+                        continue
+                    local_latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                connections.close_all()
+            with lock:
+                latencies.extend(local_latencies)
+                errors.append(local_errors)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(worker, range(threads)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'throughput': len(latencies) / elapsed if elapsed else 0.0,
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+            'errors': sum(errors),
+        }
@@ -0,0 +1,52 @@
+"""
+Management command to garbage-collect temporary and rendered media files
+"""
+import time
+from django.core.management.base import BaseCommand
+from video_app.storage_gc import collect_garbage
+from video_app.utils import format_file_size
+
+
+class Command(BaseCommand):
+    help = 'Delete expired temp, upload and render files according to MEDIA_GC_POLICIES'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir',
+            action='append',
+            dest='directories',
+            help='Only collect this policy directory (repeatable)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be deleted without deleting anything',
+        )
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=None,
+            metavar='SECONDS',
+            help='Keep running, collecting every SECONDS',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.collect(options)
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
+
+    def collect(self, options):
+        reports = collect_garbage(options['directories'], dry_run=options['dry_run'])
+        total = 0
+        for report in reports:
+            total += report['bytes_reclaimed']
+            self.stdout.write(
+                f"{report['directory']}: {report['files_deleted']}/{report['files_scanned']} files "
+                f"({report['files_referenced']} in use), "
+                f"{format_file_size(report['bytes_reclaimed'])} reclaimed, "
+                f"{format_file_size(report['bytes_kept'])} kept"
+            )
+        verb = 'Would reclaim' if options['dry_run'] else 'Reclaimed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {format_file_size(total)}'))
@@ -0,0 +1,54 @@
+"""
+Management command to manage monthly partitions of SystemLog and HandGesture on PostgreSQL
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from video_app.partitioning import (
+    PARTITIONABLE_MODELS, convert_to_partitioned, ensure_partitions, is_partitioned, list_partitions
+)
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly partitions, or convert tables to partitioned tables with --convert'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='models',
+            choices=PARTITIONABLE_MODELS,
+            help='Only handle this model (repeatable)',
+        )
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Rebuild unpartitioned tables as partitioned tables (locks and copies the table)',
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=2,
+            help='Months of empty partitions to keep ready',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'postgresql':
+            raise CommandError('Table partitioning is only supported on PostgreSQL')
+
+        for model_name in options['models'] or PARTITIONABLE_MODELS:
+            model = apps.get_model('video_app', model_name)
+            if not is_partitioned(model, using):
+                if not options['convert']:
+                    self.stdout.write(f"{model_name}: not partitioned (use --convert)")
+                    continue
+                copied = convert_to_partitioned(model, using, options['months_ahead'])
+                self.stdout.write(self.style.SUCCESS(f"{model_name}: converted, {copied} rows copied"))
+            created = ensure_partitions(model, using, options['months_ahead'])
+            partitions = list_partitions(model, using)
+            span = f"{partitions[0][1]:%Y-%m} to {partitions[-1][1]:%Y-%m}" if partitions else 'none'
+            self.stdout.write(self.style.SUCCESS(
+                f"{model_name}: {len(partitions)} monthly partitions ({span}), {created} created"
+            ))
@@ -0,0 +1,73 @@
+"""
+Management command to apply the DATA_RETENTION policies to SystemLog and HandGesture
+"""
+import time
+from django.core.management.base import BaseCommand
+from video_app.retention import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Archive and delete system logs and gestures older than their DATA_RETENTION age'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='models',
+            help='Only purge this model, e.g. SystemLog (repeatable)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count expired rows without deleting anything',
+        )
+        parser.add_argument(
+            '--no-archive',
+            action='store_false',
+            dest='archive',
+            default=None,
+            help='Delete without archiving, whatever the policy says',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Rows per delete transaction (default RETENTION_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches',
+        )
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=None,
+            metavar='SECONDS',
+            help='Keep running, purging every SECONDS',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.purge(options)
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
+
+    def purge(self, options):
+        reports = purge_expired(
+            models=options['models'],
+            dry_run=options['dry_run'],
+            archive=options['archive'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+        )
+        verb = 'would delete' if options['dry_run'] else 'deleted'
+        for report in reports:
+            line = f"{report['model']}: {verb} {report['deleted']} rows created before {report['cutoff']:%Y-%m-%d %H:%M}"
+            if report['partitions_dropped']:
+                line += f", dropped {report['partitions_dropped']} monthly partitions"
+            if report['archive']:
+                line += f", archived to {report['archive']}"
+            self.stdout.write(self.style.SUCCESS(line))
@@ -0,0 +1,22 @@
+"""
+Management command to recreate the full-text search index from the model tables
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from video_app.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for sessions and conversions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to rebuild')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows inserted per round trip')
+
+    def handle(self, *args, **options):
+        counts = rebuild_search_index(using=options['database'], batch_size=options['batch_size'])
+        if not counts:
+            self.stdout.write(self.style.WARNING('Full-text search is not available on this database'))
+            return
+        summary = ', '.join(f'{count} {doc_type}' for doc_type, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Indexed {summary} documents'))
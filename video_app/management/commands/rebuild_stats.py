@@ -0,0 +1,15 @@
+"""
+Management command to recompute the statistics rollups from the base tables
+"""
+from django.core.management.base import BaseCommand
+from video_app.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild gesture and session statistics rollups'
+
+    def handle(self, *args, **options):
+        result = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {result['gesture_rows']} gesture and {result['session_rows']} session rollup rows"
+        ))
@@ -0,0 +1,53 @@
+"""
+Management command to run the text/voice-to-sign render job queue
+"""
+from django.core.management.base import BaseCommand
+from video_app.jobs import JobRunner, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = 'Process pending TextToSign and VoiceToSign conversions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Number of render worker threads',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the queue is empty',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the jobs that are currently pending and exit',
+        )
+        parser.add_argument(
+            '--requeue-stale',
+            type=int,
+            default=None,
+            metavar='MINUTES',
+            help='Requeue in-progress jobs older than MINUTES before starting',
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_stale'] is not None:
+            requeued = requeue_stale_jobs(options['requeue_stale'])
+            self.stdout.write(f'Requeued {requeued} stale jobs')
+
+        runner = JobRunner(workers=options['workers'], poll_interval=options['poll_interval'])
+        if options['once']:
+            runner.drain()
+            runner.shutdown()
+            self.stdout.write(self.style.SUCCESS('Pending jobs processed'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"Render job runner started with {options['workers']} workers"))
+        try:
+            runner.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Render job runner stopped')
@@ -60,6 +60,7 @@ class Command(BaseCommand):
             'media/voice_to_sign',
             'media/voice_files',
             'media/temp',
+            'media/renders',
         ]
         
         for directory in directories:
@@ -0,0 +1,171 @@
+"""
+Management command to move existing media files into the sharded layout
+"""
+import os
+import json
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from video_app.rendering import RENDER_DIR, PLAYLIST_DIR, CATALOG_DIR
+from video_app.utils import sharded_name, sharded_directory, SHARD_WIDTH
+
+# Per-session upload directories: <base>/<session_id>/...
+SESSION_DIRS = ('gesture_videos', 'voice_files', 'sessions')
+
+# Files in MEDIA_ROOT referenced by fixed URLs, never moved into the catalog
+RESERVED_ROOT_FILES = {
+    'background.mp4', 'hand gesture.mp4', 'concatenated_video.mp4',
+    'video1.mp4', 'video2.mp4', 'video3.mp4', 'video4.mp4',
+}
+
+
+def is_shard_dir(name):
+    """Top-level shard directories are SHARD_WIDTH hex characters"""
+    return len(name) == SHARD_WIDTH and all(c in '0123456789abcdef' for c in name)
+
+
+class Command(BaseCommand):
+    help = 'Move media files into hash-sharded directories and update FileField paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--catalog',
+            action='store_true',
+            help='Also move sign catalog clips from MEDIA_ROOT into the sharded catalog',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows per bulk update (default: 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be moved without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.moved = {}
+
+        self.shard_flat_files(RENDER_DIR, '.mp4')
+        self.shard_flat_files(PLAYLIST_DIR, '.json')
+        for base in SESSION_DIRS:
+            self.shard_session_dirs(base)
+        if options['catalog']:
+            self.shard_catalog()
+
+        self.stdout.write(f'{len(self.moved)} files {"to move" if self.dry_run else "moved"}')
+        if self.dry_run or not self.moved:
+            return
+
+        self.rewrite_playlists()
+        updated = self.update_file_fields(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} file references'))
+
+    def media_path(self, name):
+        return os.path.join(settings.MEDIA_ROOT, name)
+
+    def move(self, old_name, new_name):
+        self.moved[old_name] = new_name
+        if self.dry_run:
+            return
+        new_path = self.media_path(new_name)
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        os.replace(self.media_path(old_name), new_path)
+
+    def shard_flat_files(self, base, extension):
+        """Move <base>/<file> to <base>/<prefix>/<file>"""
+        directory = self.media_path(base)
+        if not os.path.isdir(directory):
+            return
+        with os.scandir(directory) as entries:
+            names = [
+                entry.name for entry in entries
+                if entry.is_file() and entry.name.endswith(extension) and '.partial' not in entry.name
+            ]
+        for name in names:
+            self.move(f'{base}/{name}', sharded_name(base, name))
+
+    def shard_session_dirs(self, base):
+        """Move <base>/<session_id>/... to <base>/<prefix>/<session_id>/..."""
+        directory = self.media_path(base)
+        if not os.path.isdir(directory):
+            return
+        with os.scandir(directory) as entries:
+            keys = [
+                entry.name for entry in entries
+                if entry.is_dir() and not is_shard_dir(entry.name)
+                # Date-based upload_to directories (YYYY/) are already spread out
+                and not (len(entry.name) == 4 and entry.name.isdigit())
+            ]
+        for key in keys:
+            old_dir = f'{base}/{key}'
+            new_dir = sharded_directory(base, key)
+            for root, _, files in os.walk(self.media_path(old_dir)):
+                relative_root = os.path.relpath(root, self.media_path(old_dir)).replace(os.sep, '/')
+                for name in files:
+                    suffix = name if relative_root == '.' else f'{relative_root}/{name}'
+                    self.move(f'{old_dir}/{suffix}', f'{new_dir}/{suffix}')
+            if not self.dry_run:
+                for root, dirs, files in os.walk(self.media_path(old_dir), topdown=False):
+                    if not os.listdir(root):
+                        os.rmdir(root)
+
+    def shard_catalog(self):
+        """Move catalog clips from MEDIA_ROOT into catalog/<prefix>/<word>.mp4"""
+        with os.scandir(settings.MEDIA_ROOT) as entries:
+            names = [
+                entry.name for entry in entries
+                if entry.is_file() and entry.name.endswith('.mp4')
+                and not entry.name.startswith('[') and entry.name not in RESERVED_ROOT_FILES
+            ]
+        for name in names:
+            self.move(name, sharded_name(CATALOG_DIR, name))
+
+    def rewrite_playlists(self):
+        """Point stored playlist plans at the moved segment and clip files"""
+        for old_name, new_name in self.moved.items():
+            if not new_name.startswith(PLAYLIST_DIR + '/'):
+                continue
+            path = self.media_path(new_name)
+            with open(path, encoding='utf-8') as f:
+                plan = json.load(f)
+            for segment in plan['segments']:
+                segment['name'] = self.moved.get(segment['name'], segment['name'])
+                segment['clips'] = [self.moved.get(clip, clip) for clip in segment['clips']]
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(plan, f, ensure_ascii=False)
+
+    def update_file_fields(self, batch_size):
+        """Rewrite FileField values of every video_app model in bulk"""
+        updated = 0
+        for model in apps.get_app_config('video_app').get_models():
+            fields = [field.name for field in model._meta.get_fields() if isinstance(field, models.FileField)]
+            if not fields:
+                continue
+
+            pending = []
+            for instance in model.objects.only('pk', *fields).iterator(chunk_size=batch_size):
+                changed = False
+                for field in fields:
+                    name = getattr(instance, field).name
+                    if name in self.moved:
+                        setattr(instance, field, self.moved[name])
+                        changed = True
+                if changed:
+                    pending.append(instance)
+                if len(pending) >= batch_size:
+                    updated += self.flush(model, pending, fields)
+                    pending = []
+            updated += self.flush(model, pending, fields)
+        return updated
+
+    def flush(self, model, instances, fields):
+        if not instances:
+            return 0
+        with transaction.atomic():
+            model.objects.bulk_update(instances, fields)
+        return len(instances)
@@ -0,0 +1,228 @@
+"""
+Media file serving with byte ranges, validators and sendfile offload
+
+Browsers seek in <video> elements with ``Range`` requests, so serving a
+byte range instead of the whole file lets playback start immediately. Every
+response carries an ``ETag``; content-addressed renders are additionally
+marked immutable. When a front server is configured
+(``MEDIA_SENDFILE_BACKEND``), Django only checks the request and hands the
+file transfer to it with ``X-Sendfile`` or ``X-Accel-Redirect``.
+
+The sign catalog and renders are public. User uploads and their outputs are
+served only to the owner of the session they belong to and to staff; other
+requests get a 404 so the file's existence is not disclosed.
+"""
+import os
+import re
+import mimetypes
+import logging
+from typing import Optional, Tuple
+from urllib.parse import quote
+from django.conf import settings
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from .models import HandGesture, TextToSign, VoiceToSign
+from .rendering import RENDER_DIR
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Storage prefixes whose file names are content hashes
+IMMUTABLE_PREFIXES = (RENDER_DIR + '/',)
+
+# Storage prefixes of user files -> (model, FileField) that owns them
+PRIVATE_PREFIXES = {
+    'gesture_videos/': (HandGesture, 'video_file'),
+    'processed_videos/': (HandGesture, 'processed_video'),
+    'text_to_sign/': (TextToSign, 'output_video'),
+    'voice_files/': (VoiceToSign, 'audio_file'),
+    'voice_to_sign/': (VoiceToSign, 'output_video'),
+}
+
+# Work directories that are never served
+HIDDEN_PREFIXES = ('temp/',)
+
+
+def make_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range`` header
+
+    Args:
+        header: Header value, e.g. 'bytes=0-1023', 'bytes=500-' or 'bytes=-500'
+        size: File size in bytes
+
+    Returns:
+        Inclusive (start, end) or None when the header is malformed or asks
+        for several ranges (the whole file is served then)
+
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if not length:
+            raise ValueError('Empty suffix range')
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+
+def _read_range(path: str, start: int, length: int):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _not_modified(request, etag: str, mtime: float) -> bool:
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags or f'W/{etag}' in tags
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and int(mtime) <= if_modified_since
+
+
+def _sendfile_response(path: str, name: str) -> Optional[HttpResponse]:
+    """Hand the transfer to the front server when one is configured"""
+    backend = getattr(settings, 'MEDIA_SENDFILE_BACKEND', None)
+    if backend == 'xsendfile':
+        # Apache mod_xsendfile / lighttpd take the filesystem path
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return response
+    if backend == 'nginx':
+        # Must match an `internal` location aliased to MEDIA_ROOT
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/') + quote(name)
+        return response
+    if backend:
+        logger.error(f"Unknown MEDIA_SENDFILE_BACKEND: {backend}")
+    return None
+
+
+def private_owner_model(path: str):
+    """(model, field name) owning a private storage name, or None for public files"""
+    for prefix, owner in PRIVATE_PREFIXES.items():
+        if path.startswith(prefix):
+            return owner
+    return None
+
+
+def can_access(request, path: str) -> bool:
+    """Whether the requesting user may read a storage name"""
+    if path.startswith(HIDDEN_PREFIXES):
+        return False
+    owner = private_owner_model(path)
+    if owner is None:
+        return True
+    user = request.user
+    if not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    model, field = owner
+    return model.objects.filter(**{field: path, 'session__user': user}).exists()
+
+
+def serve_media(request, path):
+    """
+    Serve a file from MEDIA_ROOT, checking access to user files first
+
+    Args:
+        request: Django request object
+        path: Storage name relative to MEDIA_ROOT
+    """
+    path = os.path.normpath(path).replace(os.sep, '/')
+    if not can_access(request, path):
+        raise Http404('Media file not found')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (ValueError, OSError):
+        raise Http404('Media file not found')
+    if not os.path.isfile(full_path):
+        raise Http404('Media file not found')
+
+    etag = make_etag(stat)
+    immutable = path.startswith(IMMUTABLE_PREFIXES)
+    # Shared caches must not hand one user's files to another
+    visibility = 'private' if private_owner_model(path) else 'public'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': IMMUTABLE_CACHE_CONTROL if immutable else (
+            f"{visibility}, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 3600)}"
+        ),
+    }
+
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    response = _sendfile_response(full_path, path)
+    if response is None:
+        response = _file_response(request, full_path, stat.st_size, etag, content_type)
+    else:
+        response['Content-Type'] = content_type
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def _file_response(request, full_path: str, size: int, etag: str, content_type: str) -> HttpResponse:
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                _read_range(full_path, start, length), status=206, content_type=content_type
+            )
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            return response
+
+    return FileResponse(open(full_path, 'rb'), content_type=content_type)
@@ -4,61 +4,101 @@ Custom middleware for logging, security, and error handling
 import logging
 import time
 import uuid
-from django.utils.deprecation import MiddlewareMixin
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.http import JsonResponse
 from django.core.exceptions import PermissionDenied
 from django.conf import settings
 import json
+from .ratelimit import get_rate_limiter
+from .screening import get_screener
+from .utils import get_client_ip
 
 logger = logging.getLogger(__name__)
 
 
-class SecurityMiddleware(MiddlewareMixin):
-    """Middleware for security enhancements"""
+class AsyncCapableMiddleware:
+    """
+    Base for middleware that runs natively in both sync and async stacks
+    
+    Unlike MiddlewareMixin, the async path calls aprocess_request and
+    process_response directly on the event loop instead of moving them to a
+    thread. aprocess_request defaults to process_request, so subclasses whose
+    process_request can block (database, cache or request body access) must
+    override aprocess_request and offload that part.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.process_request(request)
+        if response is None:
+            response = self.get_response(request)
+        return self.process_response(request, response)
+    
+    async def __acall__(self, request):
+        response = await self.aprocess_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return self.process_response(request, response)
     
     def process_request(self, request):
-        # Add security headers
+        return None
+    
+    async def aprocess_request(self, request):
+        return self.process_request(request)
+    
+    def process_response(self, request, response):
+        return response
+
+
+class SecurityMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware for security enhancements
+    
+    Installed after RateLimitMiddleware, so throttled clients never get their
+    bodies read for screening.
+    """
+    
+    def add_headers(self, request):
         request.META['HTTP_X_CONTENT_TYPE_OPTIONS'] = 'nosniff'
         request.META['HTTP_X_FRAME_OPTIONS'] = 'DENY'
         request.META['HTTP_X_XSS_PROTECTION'] = '1; mode=block'
-        
-        # Generate request ID for tracking
-        request.request_id = str(uuid.uuid4())
-        
-        # Log suspicious activity
-        if self.is_suspicious_request(request):
-            logger.warning(f"Suspicious request detected: {request.request_id} - {request.META.get('REMOTE_ADDR')}")
-    
-    def is_suspicious_request(self, request):
-        """Check for suspicious request patterns"""
-        suspicious_patterns = [
-            'script', 'javascript:', 'vbscript:', 'onload=', 'onerror=',
-            '../', '..\\', 'cmd.exe', 'powershell', 'eval('
-        ]
-        
-        # Check URL
-        url_lower = request.get_full_path().lower()
-        if any(pattern in url_lower for pattern in suspicious_patterns):
-            return True
-        
-        # Check POST data
-        if request.method == 'POST':
-            try:
-                post_data = str(request.POST)
-                if any(pattern in post_data.lower() for pattern in suspicious_patterns):
-                    return True
-            except:
-                pass
-        
-        return False
+    
+    def process_request(self, request):
+        self.add_headers(request)
+        self.log_suspicious(request, get_screener().screen(request))
+    
+    async def aprocess_request(self, request):
+        self.add_headers(request)
+        screener = get_screener()
+        # The URL is screened on the loop; reading the body blocks, so it goes to a thread
+        pattern = screener.screen_url(request)
+        if not pattern and screener.reads_body(request):
+            pattern = await sync_to_async(screener.screen_body, thread_sensitive=False)(request)
+        self.log_suspicious(request, pattern)
+    
+    def log_suspicious(self, request, pattern):
+        if pattern:
+            logger.warning(f"Suspicious request detected: {request.request_id} - {request.META.get('REMOTE_ADDR')} - {pattern!r}")
 
 
-class LoggingMiddleware(MiddlewareMixin):
+class LoggingMiddleware(AsyncCapableMiddleware):
     """Middleware for request/response logging"""
     
     def process_request(self, request):
         request.start_time = time.time()
         
+        # Generate request ID for tracking
+        request.request_id = str(uuid.uuid4())
+        
         # Log request details
         logger.info(f"Request started: {request.request_id} - {request.method} {request.get_full_path()}")
     
@@ -99,35 +139,21 @@ class LoggingMiddleware(MiddlewareMixin):
             }, status=500)
 
 
-class RateLimitMiddleware(MiddlewareMixin):
-    """Simple rate limiting middleware"""
-    
-    def __init__(self, get_response):
-        super().__init__(get_response)
-        self.requests = {}
-        self.max_requests = 100  # requests per minute
-        self.window_size = 60  # seconds
+class RateLimitMiddleware(AsyncCapableMiddleware):
+    """Per-client, per-route rate limiting (see video_app.ratelimit)"""
     
     def process_request(self, request):
-        client_ip = request.META.get('REMOTE_ADDR')
-        current_time = time.time()
-        
-        # Clean old entries
-        self.clean_old_entries(current_time)
-        
-        # Check rate limit
-        if client_ip in self.requests:
-            if len(self.requests[client_ip]) >= self.max_requests:
-                logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-                return JsonResponse({'error': 'Rate limit exceeded'}, status=429)
-            self.requests[client_ip].append(current_time)
-        else:
-            self.requests[client_ip] = [current_time]
-    
-    def clean_old_entries(self, current_time):
-        """Remove entries older than window_size"""
-        cutoff_time = current_time - self.window_size
-        for ip in list(self.requests.keys()):
-            self.requests[ip] = [t for t in self.requests[ip] if t > cutoff_time]
-            if not self.requests[ip]:
-                del self.requests[ip]
+        client_ip = get_client_ip(request)
+        return self.limit_response(client_ip, request, get_rate_limiter().hit(client_ip, request.path))
+    
+    async def aprocess_request(self, request):
+        client_ip = get_client_ip(request)
+        return self.limit_response(client_ip, request, await get_rate_limiter().ahit(client_ip, request.path))
+    
+    def limit_response(self, client_ip, request, result):
+        if not result['allowed']:
+            logger.warning(f"Rate limit exceeded for IP: {client_ip} on {request.path}")
+            response = JsonResponse({'error': 'Rate limit exceeded'}, status=429)
+            response['Retry-After'] = str(result['retry_after'])
+            return response
+        return None
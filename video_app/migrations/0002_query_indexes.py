@@ -0,0 +1,51 @@
+# Generated by Django 4.2.13 on 2026-10-19 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('video_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gesturesession',
+            index=models.Index(
+                condition=models.Q(('is_active', True)),
+                fields=['user', '-created_at', '-id'],
+                name='session_user_active_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='handgesture',
+            index=models.Index(fields=['session', '-created_at', '-id'], name='gesture_session_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='handgesture',
+            index=models.Index(fields=['-created_at', '-id'], name='gesture_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='texttosign',
+            index=models.Index(fields=['processing_status', 'created_at'], name='text_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voicetosign',
+            index=models.Index(fields=['processing_status', 'created_at'], name='voice_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['level', '-created_at'], name='systemlog_level_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['module', '-created_at'], name='systemlog_module_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['-created_at'], name='systemlog_created_idx'),
+        ),
+    ]
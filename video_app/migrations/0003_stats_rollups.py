@@ -0,0 +1,56 @@
+# Generated by Django 4.2.13 on 2026-10-19 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_app', '0002_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GestureHourlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('gesture_type', models.CharField(max_length=50)),
+                ('gesture_count', models.PositiveIntegerField(default=0)),
+                ('confidence_sum', models.FloatField(default=0.0)),
+            ],
+            options={
+                'verbose_name': 'Gesture Hourly Stats',
+                'verbose_name_plural': 'Gesture Hourly Stats',
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SessionHourlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(unique=True)),
+                ('sessions_created', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Session Hourly Stats',
+                'verbose_name_plural': 'Session Hourly Stats',
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatsCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Stats Counter',
+                'verbose_name_plural': 'Stats Counters',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='gesturehourlystats',
+            constraint=models.UniqueConstraint(fields=('hour', 'gesture_type'), name='gesture_stats_hour_type_uniq'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.13 on 2026-10-19 11:30
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # Vendor-specific DDL (FTS5 / tsvector) that the model layer cannot express
+    from video_app.search import rebuild_search_index
+    rebuild_search_index(using=schema_editor.connection.alias, apps=apps)
+
+
+def drop_search_index(apps, schema_editor):
+    from video_app.search import drop_search_table
+    drop_search_table(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_app', '0003_stats_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.13 on 2026-10-19 14:41
+
+from django.db import migrations, models
+
+
+def backfill_claimed_at(apps, schema_editor):
+    # Jobs already in progress get their creation time so requeue_stale_jobs still sees them
+    for model_name in ('TextToSign', 'VoiceToSign'):
+        model = apps.get_model('video_app', model_name)
+        model.objects.filter(
+            processing_status__in=['processing', 'transcribing']
+        ).update(claimed_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_app', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='texttosign',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voicetosign',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_claimed_at, migrations.RunPython.noop),
+    ]
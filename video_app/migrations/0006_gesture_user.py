@@ -0,0 +1,35 @@
+# Generated by Django 4.2.13 on 2026-10-19 15:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_gesture_user(apps, schema_editor):
+    # Existing gestures take the owner of their session, as HandGesture.save does
+    HandGesture = apps.get_model('video_app', 'HandGesture')
+    GestureSession = apps.get_model('video_app', 'GestureSession')
+    HandGesture.objects.update(
+        user_id=models.Subquery(GestureSession.objects.filter(pk=models.OuterRef('session_id')).values('user_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('video_app', '0005_job_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='handgesture',
+            name='user',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='gestures', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_gesture_user, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='handgesture',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='gesture_user_created_idx'),
+        ),
+    ]
@@ -20,6 +20,15 @@ class GestureSession(models.Model):
         ordering = ['-created_at']
         verbose_name = "Gesture Session"
         verbose_name_plural = "Gesture Sessions"
+        indexes = [
+            # SessionListView: user's active sessions, keyset pages newest first. Partial on
+            # is_active because SQLite cannot use a bare boolean column as an index prefix.
+            models.Index(
+                fields=['user', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='session_user_active_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"Session {self.session_name} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
@@ -36,6 +45,10 @@ class HandGesture(models.Model):
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     session = models.ForeignKey(GestureSession, on_delete=models.CASCADE, related_name='gestures')
+    # Copy of session.user, set on save, so a user's gestures are one index range
+    # instead of a join over every session of the user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, editable=False,
+                             db_index=False, related_name='gestures')
     gesture_type = models.CharField(max_length=50, choices=GESTURE_TYPES)
     confidence_score = models.FloatField(default=0.0)
     video_file = models.FileField(
@@ -56,9 +69,25 @@ class HandGesture(models.Model):
         ordering = ['-created_at']
         verbose_name = "Hand Gesture"
         verbose_name_plural = "Hand Gestures"
+        indexes = [
+            # Recent gestures of a session (WebSocket connect, session detail)
+            models.Index(fields=['session', '-created_at', '-id'], name='gesture_session_created_idx'),
+            # Date ranges across all users
+            models.Index(fields=['-created_at', '-id'], name='gesture_created_idx'),
+            # GestureListView keyset pages and date ranges of one user
+            models.Index(fields=['user', '-created_at', '-id'], name='gesture_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.gesture_type} - {self.confidence_score:.2f}"
+    
+    def save(self, *args, **kwargs):
+        if self.user_id is None and self.session_id is not None:
+            if HandGesture.session.is_cached(self):
+                self.user_id = self.session.user_id
+            else:
+                self.user_id = GestureSession.objects.filter(pk=self.session_id).values_list('user_id', flat=True).first()
+        super().save(*args, **kwargs)
 
 
 class TextToSign(models.Model):
@@ -83,12 +112,18 @@ class TextToSign(models.Model):
         default='pending'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set when a render job runner claims the row and on each stage it reaches
+    claimed_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Text to Sign Conversion"
         verbose_name_plural = "Text to Sign Conversions"
+        indexes = [
+            # Render job runner: oldest pending conversions first
+            models.Index(fields=['processing_status', 'created_at'], name='text_status_created_idx'),
+        ]
     
     def __str__(self):
         return f"Text: {self.input_text[:50]}... - {self.processing_status}"
@@ -121,12 +156,18 @@ class VoiceToSign(models.Model):
         default='pending'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set when a render job runner claims the row and on each stage it reaches
+    claimed_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Voice to Sign Conversion"
         verbose_name_plural = "Voice to Sign Conversions"
+        indexes = [
+            # Render job runner: oldest pending conversions first
+            models.Index(fields=['processing_status', 'created_at'], name='voice_status_created_idx'),
+        ]
     
     def __str__(self):
         return f"Voice: {self.audio_file.name} - {self.processing_status}"
@@ -153,6 +194,57 @@ class SystemLog(models.Model):
         ordering = ['-created_at']
         verbose_name = "System Log"
         verbose_name_plural = "System Logs"
+        indexes = [
+            models.Index(fields=['level', '-created_at'], name='systemlog_level_created_idx'),
+            models.Index(fields=['module', '-created_at'], name='systemlog_module_created_idx'),
+            models.Index(fields=['-created_at'], name='systemlog_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.level} - {self.module} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
+
+
+class GestureHourlyStats(models.Model):
+    """Hourly rollup of recognized gestures per gesture type"""
+    hour = models.DateTimeField()
+    gesture_type = models.CharField(max_length=50)
+    gesture_count = models.PositiveIntegerField(default=0)
+    confidence_sum = models.FloatField(default=0.0)
+    
+    class Meta:
+        ordering = ['-hour']
+        verbose_name = "Gesture Hourly Stats"
+        verbose_name_plural = "Gesture Hourly Stats"
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'gesture_type'], name='gesture_stats_hour_type_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.gesture_type} - {self.hour.strftime('%Y-%m-%d %H:00')} - {self.gesture_count}"
+
+
+class SessionHourlyStats(models.Model):
+    """Hourly rollup of created sessions"""
+    hour = models.DateTimeField(unique=True)
+    sessions_created = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-hour']
+        verbose_name = "Session Hourly Stats"
+        verbose_name_plural = "Session Hourly Stats"
+    
+    def __str__(self):
+        return f"{self.hour.strftime('%Y-%m-%d %H:00')} - {self.sessions_created}"
+
+
+class StatsCounter(models.Model):
+    """Named running total maintained alongside the rollups (e.g. active sessions)"""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Stats Counter"
+        verbose_name_plural = "Stats Counters"
+    
+    def __str__(self):
+        return f"{self.name} = {self.value}"
@@ -0,0 +1,149 @@
+"""
+Push notifications for legacy gesture and text results
+
+Results produced by the upload views are pushed to every connection of the
+same browser session as soon as they are ready, over Server-Sent Events
+(``results/events/``) or a WebSocket (``ws/results/``). Both subscribe to a
+channel layer group derived from the Django session key, so a result
+published by any worker process reaches the client. Results are also kept
+in the session's ResultStore for page renders and the ``detect_refresh``
+compatibility shims. The event stream needs ASGI and a channel layer;
+without them it answers 503 and points clients at the polling shims.
+"""
+import json
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from .result_store import get_result_store
+
+logger = logging.getLogger(__name__)
+
+RESULT_KINDS = ('gesture', 'text')
+KEEPALIVE_SECONDS = 15
+
+
+def results_group(session_key: str) -> str:
+    """Channel layer group for one browser session"""
+    return f'results_{session_key}'
+
+
+def ensure_session_key(request) -> str:
+    """Return the request's session key, creating the session if needed"""
+    if not request.session.session_key:
+        # Mark the session modified so the middleware sends its cookie
+        request.session['has_results'] = True
+        request.session.save()
+    return request.session.session_key
+
+
+def publish_result(request, kind: str, text: str, videosrc: Optional[str] = None):
+    """
+    Record a result for the request's session and push it to subscribers
+
+    Args:
+        request: Django request object that produced the result
+        kind: 'gesture' or 'text'
+        text: Recognized or translated text
+        videosrc: Absolute URL of the sign video, if any
+    """
+    payload = {'kind': kind, 'text': text, 'videosrc': videosrc}
+    session_key = ensure_session_key(request)
+    get_result_store().add(session_key, kind, payload)
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            results_group(session_key),
+            {'type': 'result_ready', 'result': payload}
+        )
+    except Exception as e:
+        # Polling shims still see the result through the result store
+        logger.error(f"Error pushing {kind} result: {str(e)}")
+
+
+def pop_pending_result(request, kind: str) -> Optional[Dict[str, Any]]:
+    """Take the unread result of a kind for the polling shims"""
+    return get_result_store().pop_pending(request.session.session_key, kind)
+
+
+async def apop_pending_result(request, kind: str) -> Optional[Dict[str, Any]]:
+    """Async variant of pop_pending_result() for async views"""
+    # session_key comes from the cookie; it does not load the session from the database
+    return await get_result_store().apop_pending(request.session.session_key, kind)
+
+
+def recent_results(request, kind: str) -> List[Dict[str, Any]]:
+    """Latest results of a kind for this session, oldest first"""
+    return get_result_store().recent(request.session.session_key, kind)
+
+
+def last_result(request, kind: str) -> Optional[Dict[str, Any]]:
+    """Most recent result of a kind for this session, read or not"""
+    return get_result_store().latest(request.session.session_key, kind)
+
+
+def _sse_message(result: Dict[str, Any]) -> str:
+    return f"event: {result['kind']}\ndata: {json.dumps(result, ensure_ascii=False)}\n\n"
+
+
+async def _event_stream(session_key: str, pending, channel_layer):
+    channel_name = await channel_layer.new_channel()
+    group = results_group(session_key)
+    await channel_layer.group_add(group, channel_name)
+    try:
+        yield 'retry: 3000\n\n'
+        # Results that were ready before the client subscribed
+        for result in pending:
+            yield _sse_message(result)
+        while True:
+            try:
+                message = await asyncio.wait_for(channel_layer.receive(channel_name), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield ': keepalive\n\n'
+                continue
+            if message.get('type') == 'result_ready':
+                yield _sse_message(message['result'])
+    finally:
+        await channel_layer.group_discard(group, channel_name)
+
+
+def _subscribe(request):
+    session_key = ensure_session_key(request)
+    pending = [pop_pending_result(request, kind) for kind in RESULT_KINDS]
+    return session_key, [result for result in pending if result]
+
+
+def _streaming_unavailable(reason: str) -> JsonResponse:
+    response = JsonResponse({
+        'success': False,
+        'error': reason,
+        'poll': {kind: reverse(f'video_app:{name}') for kind, name in
+                 (('gesture', 'detect_refresh'), ('text', 'detect_refresh_txt'))},
+    }, status=503)
+    response['Retry-After'] = '60'
+    return response
+
+
+async def result_events(request):
+    """Server-Sent Events stream of gesture and text results for this session"""
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the open stream would hold a worker thread for its whole life
+        return _streaming_unavailable('Result streaming requires the ASGI server')
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return _streaming_unavailable('Result streaming is not configured')
+    session_key, pending = await sync_to_async(_subscribe)(request)
+    response = StreamingHttpResponse(
+        _event_stream(session_key, pending, channel_layer), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
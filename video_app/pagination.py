@@ -0,0 +1,185 @@
+"""
+Keyset (cursor) pagination for newest-first lists
+
+Pages are selected with ``WHERE (created_at, id) < cursor ORDER BY
+created_at DESC, id DESC LIMIT n`` instead of OFFSET, and no COUNT(*) is
+needed to paginate. A page is an index range scan of its own size only
+when an index starts with the list's equality filters followed by
+``(created_at, id)``; a filter through a join (``session__user``) makes
+the database collect and sort every matching row on each page instead,
+which is why HandGesture carries its owner. Totals, where wanted, come
+from ``approximate_count``.
+"""
+import json
+import base64
+import binascii
+from typing import Any, Dict, List, Optional, Tuple
+from django.db import connections
+from django.db.models import Q
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(obj) -> str:
+    raw = f'{obj.created_at.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, pk_field=None) -> Tuple[Any, Any]:
+    """
+    Decode a cursor into (created_at, pk)
+
+    Args:
+        cursor: Value of the after/before query parameter
+        pk_field: Primary key field used to validate the pk half
+
+    Raises:
+        Http404: If the cursor is malformed or tampered with
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, pk = raw.split('|', 1)
+        created_at = parse_datetime(created_at)
+        if pk_field is not None:
+            pk = pk_field.to_python(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError, ValidationError):
+        created_at = None
+    if created_at is None:
+        raise Http404('Invalid page cursor')
+    return created_at, pk
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated list
+
+    Supports the parts of Django's Page API that do not depend on page
+    numbers (iteration, has_next/has_previous, paginator); links are built
+    from ``next_cursor`` and ``previous_cursor`` instead of page numbers.
+    """
+
+    def __init__(self, object_list: List[Any], has_next: bool, has_previous: bool, paginator=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = encode_cursor(object_list[-1]) if has_next and object_list else None
+        self.previous_cursor = encode_cursor(object_list[0]) if has_previous and object_list else None
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Paginate a queryset newest first on (created_at, pk)"""
+
+    def __init__(self, queryset, per_page: int):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    # The plain created_at bound lets the index seek to the cursor; the OR alone
+    # is only applied as a filter while walking the index from its start
+
+    def _older(self, created_at, pk, inclusive: bool = False):
+        same_time = Q(pk__lte=pk) if inclusive else Q(pk__lt=pk)
+        return self.queryset.filter(created_at__lte=created_at).filter(Q(created_at__lt=created_at) | same_time)
+
+    def _newer(self, created_at, pk):
+        return self.queryset.filter(created_at__gte=created_at).filter(Q(created_at__gt=created_at) | Q(pk__gt=pk))
+
+    def page(self, after: Optional[str] = None, before: Optional[str] = None) -> KeysetPage:
+        """
+        Fetch the page following ``after`` or preceding ``before`` (first page if neither)
+
+        Args:
+            after: Cursor of the last item of the previous page
+            before: Cursor of the first item of the next page
+
+        Raises:
+            Http404: If a cursor is invalid
+        """
+        pk_field = self.queryset.model._meta.pk
+        if before:
+            created_at, pk = decode_cursor(before, pk_field)
+            rows = list(self._newer(created_at, pk).order_by('created_at', 'pk')[:self.per_page + 1])
+            if not rows:
+                return self.page()
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            # Anything at or before the cursor row follows this page
+            has_next = self._older(created_at, pk, inclusive=True).exists()
+            return KeysetPage(rows, has_next=has_next, has_previous=has_previous, paginator=self)
+
+        queryset = self.queryset
+        if after:
+            created_at, pk = decode_cursor(after, pk_field)
+            queryset = self._older(created_at, pk)
+        rows = list(queryset.order_by('-created_at', '-pk')[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], has_next=has_next, has_previous=bool(after), paginator=self)
+
+
+def approximate_count(queryset, cap: int = 1000) -> Dict[str, Any]:
+    """
+    Cheap row count for display
+
+    On PostgreSQL the planner's row estimate is used; elsewhere rows are
+    counted up to ``cap`` only.
+
+    Returns:
+        Dictionary with count and exact (False when estimated or capped)
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return {'count': int(plan[0]['Plan']['Plan Rows']), 'exact': False}
+
+    count = queryset.order_by()[:cap + 1].count()
+    return {'count': min(count, cap), 'exact': count <= cap}
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin replacing OFFSET pagination with keyset pagination
+
+    Pages are addressed with ``?after=<cursor>`` / ``?before=<cursor>``;
+    ``page_obj.next_cursor`` and ``page_obj.previous_cursor`` build the links
+    and ``page_query`` carries the other query parameters (filters) along.
+    The approximate total is only computed for the first page; set
+    ``count_cap`` to None to skip it entirely.
+    """
+    count_cap = 1000
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size)
+        page = paginator.page(after=self.request.GET.get('after'), before=self.request.GET.get('before'))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        params = self.request.GET.copy()
+        params.pop('after', None)
+        params.pop('before', None)
+        context['page_query'] = params.urlencode()
+        paging = 'after' in self.request.GET or 'before' in self.request.GET
+        if self.count_cap is not None and not paging:
+            context['approximate_count'] = approximate_count(self.object_list, self.count_cap)
+        return context
@@ -0,0 +1,163 @@
+"""
+Monthly range partitioning of time-ordered tables on PostgreSQL
+
+A partitioned table is split on ``created_at`` into one partition per
+calendar month (UTC), named ``<table>_pYYYY_MM``, plus a default partition
+that catches rows outside the prepared months. Expired months are removed
+with DETACH + DROP instead of row-by-row DELETEs, and the composite indexes
+declared on the model are created on the parent so every partition has them.
+
+PostgreSQL requires the partition key in the primary key, so a converted
+table's primary key becomes ``(id, created_at)``; ids stay unique UUIDs.
+"""
+import logging
+from datetime import datetime, timezone as dt_timezone
+from typing import List, Tuple
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import ForeignKey
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PARTITIONABLE_MODELS = ('SystemLog', 'HandGesture')
+
+
+def month_start(value: datetime) -> datetime:
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(model, month: datetime) -> str:
+    return f"{model._meta.db_table}_p{month:%Y_%m}"
+
+
+def is_partitioned(model, using: str = DEFAULT_DB_ALIAS) -> bool:
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s",
+            [model._meta.db_table]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(model, using: str = DEFAULT_DB_ALIAS) -> List[Tuple[str, datetime]]:
+    """Monthly partitions of a table as (name, first day of month), oldest first"""
+    prefix = f"{model._meta.db_table}_p"
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s",
+            [model._meta.db_table]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        if not name.startswith(prefix):
+            continue
+        try:
+            month = datetime.strptime(name[len(prefix):], '%Y_%m').replace(tzinfo=dt_timezone.utc)
+        except ValueError:
+            continue
+        partitions.append((name, month))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def ensure_partitions(model, using: str = DEFAULT_DB_ALIAS, months_ahead: int = 2, start: datetime = None) -> int:
+    """
+    Create monthly partitions from ``start`` (default: this month) through ``months_ahead`` months ahead
+
+    Returns:
+        Number of partitions created
+    """
+    table = model._meta.db_table
+    month = month_start(start or timezone.now())
+    last = add_months(month_start(timezone.now()), months_ahead)
+    existing = {name for name, _ in list_partitions(model, using)}
+    created = 0
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+        while month <= last:
+            name = partition_name(model, month)
+            if name not in existing:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                )
+                created += 1
+            month = add_months(month, 1)
+    return created
+
+
+def expired_partitions(model, cutoff: datetime, using: str = DEFAULT_DB_ALIAS) -> List[Tuple[str, datetime]]:
+    """Partitions whose whole month lies before ``cutoff``"""
+    return [
+        (name, month) for name, month in list_partitions(model, using)
+        if add_months(month, 1) <= cutoff
+    ]
+
+
+def drop_partition(model, name: str, using: str = DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {model._meta.db_table} DETACH PARTITION {name}")
+        cursor.execute(f"DROP TABLE {name}")
+    logger.info(f"Dropped partition {name}")
+
+
+def convert_to_partitioned(model, using: str = DEFAULT_DB_ALIAS, months_ahead: int = 2) -> int:
+    """
+    Rebuild a table as a monthly-partitioned table, copying all rows
+
+    Runs in one transaction and holds an exclusive lock on the table while
+    the rows are copied; schedule it in a maintenance window for big tables.
+
+    Returns:
+        Number of rows copied
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        raise ValueError(f"Partitioning requires PostgreSQL, not {connection.vendor}")
+    table = model._meta.db_table
+    old_table = f"{table}_unpartitioned"
+
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+            cursor.execute(f"SELECT min(created_at) FROM {table}")
+            oldest = cursor.fetchone()[0]
+            cursor.execute(f"ALTER TABLE {table} RENAME TO {old_table}")
+            cursor.execute(
+                f"CREATE TABLE {table} (LIKE {old_table} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+            )
+            cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)")
+
+        ensure_partitions(model, using, months_ahead, start=oldest)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {table} SELECT * FROM {old_table}")
+            copied = cursor.rowcount
+            # Frees the old index and constraint names for the new table
+            cursor.execute(f"DROP TABLE {old_table}")
+
+        with connection.schema_editor() as editor:
+            # Same names and definitions as the schema editor's own, so later
+            # migrations that alter or drop these foreign keys still find them
+            for field in model._meta.concrete_fields:
+                if isinstance(field, ForeignKey) and field.db_constraint:
+                    for statement in editor._field_indexes_sql(model, field):
+                        editor.execute(statement)
+                    editor.execute(editor._create_fk_sql(model, field, "_fk_%(to_table)s_%(to_column)s"))
+            for index in model._meta.indexes:
+                editor.add_index(model, index)
+
+    logger.info(f"Converted {table} to monthly partitions ({copied} rows)")
+    return copied
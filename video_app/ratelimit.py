@@ -0,0 +1,181 @@
+"""
+Sliding-window-counter rate limiting
+
+Each client gets one counter per fixed window; the request rate is
+estimated from the current window plus the previous window weighted by how
+much of it still overlaps the sliding window. Every check is a constant
+number of operations whatever the traffic. Counters live either in process
+memory (expired windows are dropped lazily) or in the Django cache, where
+atomic increments make the limit shared between worker processes.
+"""
+import re
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_LIMITS = {
+    'default': {'limit': 100, 'window': 60},
+    # First matching path prefix (or 'pattern' regex) wins; each route has its own counters
+    'routes': [
+        {'prefix': '/stream-upload/', 'limit': 10, 'window': 60},
+        {'prefix': '/upload/', 'limit': 10, 'window': 60},
+        {'prefix': '/upload_voice/', 'limit': 20, 'window': 60},
+        {'prefix': '/stream-voice-to-sign/', 'limit': 20, 'window': 60},
+        {'prefix': '/voice-to-sign/', 'limit': 20, 'window': 60},
+        {'pattern': r'^/api/sessions/[^/]+/voice-to-sign/', 'limit': 20, 'window': 60},
+        {'pattern': r'^/api/sessions/[^/]+/text-to-sign/', 'limit': 30, 'window': 60},
+        {'pattern': r'^/api/sessions/[^/]+/gestures/', 'limit': 60, 'window': 60},
+    ],
+}
+
+
+class LocalBackend:
+    """In-process counters guarded by a lock"""
+
+    def __init__(self, sweep_interval: float = 60):
+        self._lock = threading.Lock()
+        # key -> [window index, current count, previous count]
+        self._windows: Dict[str, List[int]] = {}
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def increment(self, key: str, window_index: int, window: int) -> Tuple[int, int]:
+        with self._lock:
+            self._maybe_sweep(window_index)
+            entry = self._windows.get(key)
+            if entry is None or entry[0] < window_index - 1:
+                entry = self._windows[key] = [window_index, 0, 0]
+            elif entry[0] == window_index - 1:
+                entry[:] = [window_index, 0, entry[1]]
+            entry[1] += 1
+            return entry[1], entry[2]
+
+    async def aincrement(self, key: str, window_index: int, window: int) -> Tuple[int, int]:
+        # Only a lock held for a few dict operations, safe to take on the event loop
+        return self.increment(key, window_index, window)
+
+    def _maybe_sweep(self, window_index: int):
+        """Drop clients idle for two windows, at most once per sweep interval"""
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self._sweep_interval
+        stale = [key for key, entry in self._windows.items() if entry[0] < window_index - 1]
+        for key in stale:
+            del self._windows[key]
+
+
+class CacheBackend:
+    """Counters in a Django cache, incremented atomically (e.g. Redis INCR)"""
+
+    def __init__(self, cache_alias: str = 'default'):
+        self.cache_alias = cache_alias
+
+    def increment(self, key: str, window_index: int, window: int) -> Tuple[int, int]:
+        cache = caches[self.cache_alias]
+        current_key = f'ratelimit:{key}:{window_index}'
+        # Counters outlive their window so the next one can weight them
+        cache.add(current_key, 0, timeout=window * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(current_key, 1, timeout=window * 2)
+            current = 1
+        previous = cache.get(f'ratelimit:{key}:{window_index - 1}', 0)
+        return current, previous
+
+    async def aincrement(self, key: str, window_index: int, window: int) -> Tuple[int, int]:
+        # One worker-thread hop for add/incr/get instead of one serialized hop per
+        # cache.a*() call; cache clients are thread-safe, so skip the shared sync thread
+        return await sync_to_async(self.increment, thread_sensitive=False)(key, window_index, window)
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'cache': CacheBackend,
+}
+
+
+class RateLimiter:
+    """Per-route sliding window counters"""
+
+    def __init__(self, backend, default: Dict[str, int], routes: List[Dict[str, Any]]):
+        self.backend = backend
+        self.default = default
+        self.routes = routes
+        # Routes with a variable segment (e.g. a session id) match by regex
+        self._patterns = {rule['pattern']: re.compile(rule['pattern']) for rule in routes if 'pattern' in rule}
+
+    def rule_for(self, path: str) -> Tuple[str, Dict[str, Any]]:
+        for rule in self.routes:
+            if 'pattern' in rule:
+                if self._patterns[rule['pattern']].match(path):
+                    return rule['pattern'], rule
+            elif path.startswith(rule['prefix']):
+                return rule['prefix'], rule
+        return 'default', self.default
+
+    def hit(self, client: str, path: str) -> Dict[str, Any]:
+        """
+        Count a request and decide whether it is allowed
+
+        Args:
+            client: Client identifier (IP address)
+            path: Request path used to pick the route limit
+
+        Returns:
+            Dictionary with allowed, limit, remaining and retry_after (seconds)
+        """
+        scope, rule = self.rule_for(path)
+        now = time.time()
+        window_index = int(now // rule['window'])
+        counts = self.backend.increment(f'{scope}:{client}', window_index, rule['window'])
+        return self._decide(rule, now, *counts)
+
+    async def ahit(self, client: str, path: str) -> Dict[str, Any]:
+        """Async variant of hit() for the ASGI middleware path"""
+        scope, rule = self.rule_for(path)
+        now = time.time()
+        window_index = int(now // rule['window'])
+        counts = await self.backend.aincrement(f'{scope}:{client}', window_index, rule['window'])
+        return self._decide(rule, now, *counts)
+
+    def _decide(self, rule: Dict[str, Any], now: float, current: int, previous: int) -> Dict[str, Any]:
+        limit, window = rule['limit'], rule['window']
+        elapsed = (now % window) / window
+        estimated = previous * (1 - elapsed) + current
+        allowed = estimated <= limit
+        return {
+            'allowed': allowed,
+            'limit': limit,
+            'remaining': max(0, int(limit - estimated)),
+            'retry_after': 0 if allowed else max(1, int(window - now % window)),
+        }
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter configured from settings"""
+    global _limiter
+    if _limiter is None:
+        config = getattr(settings, 'RATE_LIMITS', DEFAULT_RATE_LIMITS)
+        backend_name = getattr(settings, 'RATE_LIMIT_BACKEND', 'local')
+        if backend_name == 'cache':
+            backend = CacheBackend(getattr(settings, 'RATE_LIMIT_CACHE', 'default'))
+        else:
+            backend = BACKENDS[backend_name]()
+        _limiter = RateLimiter(
+            backend,
+            config.get('default', DEFAULT_RATE_LIMITS['default']),
+            config.get('routes', []),
+        )
+    return _limiter
@@ -0,0 +1,549 @@
+"""
+Text-to-sign render pipeline
+
+A sentence is resolved into the sequence of sign catalog clips that spell it
+out, and the rendered video is stored under a name derived from the SHA-256
+of that sequence. Identical sentences therefore share a single output file,
+concurrent requests never overwrite each other and every returned URL is
+immutable for the lifetime of the file.
+"""
+import os
+import json
+import math
+import hashlib
+import logging
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import quote
+from typing import Optional, Dict, Any, List
+from django.conf import settings
+from .utils import sharded_name
+
+logger = logging.getLogger(__name__)
+
+# Bump when the render output format changes so stale cached files are not reused
+RENDER_VERSION = '1'
+RENDER_DIR = 'renders'
+PLAYLIST_DIR = f'{RENDER_DIR}/playlists'
+SEGMENT_DIR = f'{RENDER_DIR}/segments'
+# Cache hits refresh a render's mtime at most this often (seconds)
+RENDER_TOUCH_INTERVAL = 3600
+
+# Sign clips in the sharded layout; clips directly in MEDIA_ROOT are still found
+CATALOG_DIR = 'catalog'
+
+_flat_catalog = None
+
+# Striped locks keep concurrent renders of the same key in one process from
+# duplicating work without growing a lock per key forever
+_render_locks = [threading.Lock() for _ in range(64)]
+
+
+def _flat_catalog_index() -> Dict[str, str]:
+    """
+    Map clip names to files for catalog clips kept directly in MEDIA_ROOT
+
+    The directory is scanned once and rescanned only when its mtime changes
+    (a file was added, removed or renamed), instead of on every lookup.
+    """
+    global _flat_catalog
+    try:
+        mtime = os.stat(settings.MEDIA_ROOT).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    if _flat_catalog is None or _flat_catalog[0] != mtime:
+        index = {}
+        with os.scandir(settings.MEDIA_ROOT) as entries:
+            for entry in entries:
+                if entry.name.endswith('.mp4') and entry.is_file():
+                    index[entry.name[:-4]] = entry.path
+        _flat_catalog = (mtime, index)
+    return _flat_catalog[1]
+
+
+def search_video(text: str) -> Optional[str]:
+    """
+    Search the sign catalog for a clip named after the given text
+
+    Clips in the sharded catalog (catalog/<prefix>/<text>.mp4) are found
+    with a single stat; clips still stored flat in MEDIA_ROOT are looked up
+    in a cached index.
+
+    Args:
+        text: Word or letter to look up
+
+    Returns:
+        Absolute path of the clip or None if not found
+    """
+    video_path = os.path.join(settings.MEDIA_ROOT, sharded_name(CATALOG_DIR, f'{text}.mp4'))
+    if os.path.isfile(video_path):
+        return video_path
+
+    return _flat_catalog_index().get(text)
+
+
+def resolve_word(word: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve a single word into catalog clips
+
+    Words with their own catalog clip map to it directly, any other word is
+    fingerspelled letter by letter. Letters without a clip are skipped.
+
+    Args:
+        word: Word to resolve
+
+    Returns:
+        Token dictionary or None if nothing in the catalog matches
+    """
+    video_filename = search_video(word)
+    if video_filename:
+        return {'word': word, 'clips': [video_filename], 'fingerspelled': False}
+
+    letters_videos = []
+    for letter in word:
+        letter_filename = search_video(letter)
+        if letter_filename:
+            letters_videos.append(letter_filename)
+
+    if letters_videos:
+        return {'word': word, 'clips': letters_videos, 'fingerspelled': True}
+    return None
+
+
+def resolve_tokens(input_text: str) -> List[Dict[str, Any]]:
+    """
+    Resolve a sentence into its sequence of catalog tokens
+
+    Args:
+        input_text: Sentence to convert
+
+    Returns:
+        List of token dictionaries in playback order
+    """
+    tokens = []
+    for word in input_text.split():
+        token = resolve_word(word)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def render_key(clip_paths: List[str]) -> str:
+    """
+    Build the content key for a sequence of catalog clips
+
+    The key covers each clip's media-relative name, size and modification
+    time, so replacing a catalog clip invalidates every render using it.
+
+    Args:
+        clip_paths: Absolute clip paths in playback order
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(f'v{RENDER_VERSION}'.encode('utf-8'))
+    for clip_path in clip_paths:
+        stat = os.stat(clip_path)
+        name = os.path.relpath(clip_path, settings.MEDIA_ROOT)
+        digest.update(f'\n{name}\0{stat.st_size}\0{stat.st_mtime_ns}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def render_name(key: str) -> str:
+    """Storage name (relative to MEDIA_ROOT) of the render for a key"""
+    return sharded_name(RENDER_DIR, f'{key}.mp4')
+
+
+def _get_render_lock(key: str) -> threading.Lock:
+    return _render_locks[int(key[:8], 16) % len(_render_locks)]
+
+
+def _render_result(key: str, cached: bool) -> Dict[str, Any]:
+    name = render_name(key)
+    return {
+        'key': key,
+        'name': name,
+        'path': os.path.join(settings.MEDIA_ROOT, name),
+        'url': settings.MEDIA_URL + name,
+        'cached': cached,
+    }
+
+
+def _touch_render(path: str) -> bool:
+    """
+    Check a cached render exists and bump its mtime (at most hourly) so the
+    storage GC evicts least recently used renders first
+    """
+    try:
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return False
+    now = time.time()
+    if now - mtime > RENDER_TOUCH_INTERVAL:
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+    return True
+
+
+def render_clips(clip_paths: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Concatenate catalog clips into a content-addressed render
+
+    The video is written to a private partial file and atomically renamed
+    into place, so readers never see a half-written render and two workers
+    rendering the same key simply race to publish identical bytes.
+
+    Args:
+        clip_paths: Absolute clip paths in playback order
+
+    Returns:
+        Render dictionary (key, name, path, url, cached) or None on failure
+    """
+    if not clip_paths:
+        return None
+
+    key = render_key(clip_paths)
+    result = _render_result(key, cached=True)
+    if _touch_render(result['path']):
+        return result
+
+    with _get_render_lock(key):
+        if os.path.exists(result['path']):
+            return result
+
+        os.makedirs(os.path.dirname(result['path']), exist_ok=True)
+        # VideoWriter picks the container from the extension, so keep .mp4 last
+        partial_path = f"{result['path'][:-4]}.{uuid.uuid4().hex[:8]}.partial.mp4"
+        try:
+            from .video_processing import concatenate_videos
+            concatenate_videos(clip_paths, partial_path)
+            os.replace(partial_path, result['path'])
+        except Exception as e:
+            logger.error(f"Error rendering {key}: {str(e)}")
+            return None
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    logger.info(f"Rendered {result['name']} from {len(clip_paths)} clips")
+    return _render_result(key, cached=False)
+
+
+def render_word(word: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve a single word to a playable video
+
+    Catalog words use their clip directly; fingerspelled words are rendered
+    to a content-addressed file.
+
+    Args:
+        word: Word to convert
+
+    Returns:
+        Dictionary with word, url and fingerspelled flag, or None
+    """
+    token = resolve_word(word)
+    if not token:
+        return None
+    if token['fingerspelled']:
+        render = render_clips(token['clips'])
+        if not render:
+            return None
+        url = render['url']
+    else:
+        url = settings.MEDIA_URL + quote(os.path.relpath(token['clips'][0], settings.MEDIA_ROOT).replace(os.sep, '/'))
+    return {'word': word, 'url': url, 'fingerspelled': token['fingerspelled']}
+
+
+def render_text(input_text: str) -> Optional[Dict[str, Any]]:
+    """
+    Render a sentence to a sign language video
+
+    Args:
+        input_text: Sentence to convert
+
+    Returns:
+        Render dictionary or None if no word could be resolved
+    """
+    tokens = resolve_tokens(input_text)
+    clip_paths = [clip for token in tokens for clip in token['clips']]
+    return render_clips(clip_paths)
+
+
+# Progressive playback
+#
+# Instead of waiting for the whole sentence, clients can fetch a playlist of
+# per-word segments: catalog words point straight at their clip, and
+# fingerspelled words point at a per-word render that is produced in the
+# background. The playlist only lists the ready prefix of the sentence, so a
+# player can start on the first word while later words are still rendering.
+# HLS players only get MPEG-TS copies of the MP4 segments (see hls_segment).
+
+_segment_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='segment-render')
+_scheduled_segments = set()
+_scheduled_segments_lock = threading.Lock()
+# Durations of the most recently played segments, so long-lived workers stay bounded
+SEGMENT_DURATION_CACHE_SIZE = 1024
+REMUX_TIMEOUT = 60  # seconds
+
+
+def _media_name(path: str) -> str:
+    return os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+
+
+def plan_segments(input_text: str) -> List[Dict[str, Any]]:
+    """
+    Plan one playback segment per resolved word
+
+    Args:
+        input_text: Sentence to convert
+
+    Returns:
+        List of segment dictionaries (word, name, clips) in playback order
+    """
+    segments = []
+    for token in resolve_tokens(input_text):
+        if token['fingerspelled']:
+            name = render_name(render_key(token['clips']))
+        else:
+            name = _media_name(token['clips'][0])
+        segments.append({
+            'word': token['word'],
+            'name': name,
+            'clips': [_media_name(clip) for clip in token['clips']],
+            'fingerspelled': token['fingerspelled'],
+        })
+    return segments
+
+
+def playlist_name(key: str) -> str:
+    """Storage name (relative to MEDIA_ROOT) of the plan for a playlist key"""
+    return sharded_name(PLAYLIST_DIR, f'{key}.json')
+
+
+def _schedule_segment(segment: Dict[str, Any]):
+    """Render a fingerspelled segment in the background unless already queued"""
+    with _scheduled_segments_lock:
+        if segment['name'] in _scheduled_segments:
+            return
+        _scheduled_segments.add(segment['name'])
+
+    def run():
+        try:
+            render_clips([os.path.join(settings.MEDIA_ROOT, clip) for clip in segment['clips']])
+        finally:
+            with _scheduled_segments_lock:
+                _scheduled_segments.discard(segment['name'])
+
+    _segment_executor.submit(run)
+
+
+def _segment_ready(segment: Dict[str, Any]) -> bool:
+    return os.path.exists(os.path.join(settings.MEDIA_ROOT, segment['name']))
+
+
+def _schedule_pending(segments: List[Dict[str, Any]]):
+    # Submitted in playback order so the earliest missing word renders first
+    for segment in segments:
+        if segment['fingerspelled'] and not _segment_ready(segment):
+            _schedule_segment(segment)
+
+
+def start_playlist(input_text: str) -> Optional[Dict[str, Any]]:
+    """
+    Plan a sentence for progressive playback and start rendering its segments
+
+    The plan is stored under a key derived from its segment names, so any
+    worker process can serve (and finish) the playlist afterwards.
+
+    Args:
+        input_text: Sentence to convert
+
+    Returns:
+        Playlist dictionary or None if no word could be resolved
+    """
+    segments = plan_segments(input_text)
+    if not segments:
+        return None
+
+    key = hashlib.sha256('\n'.join(segment['name'] for segment in segments).encode('utf-8')).hexdigest()
+    plan_path = os.path.join(settings.MEDIA_ROOT, playlist_name(key))
+    if not os.path.exists(plan_path):
+        os.makedirs(os.path.dirname(plan_path), exist_ok=True)
+        partial_path = f'{plan_path}.{uuid.uuid4().hex[:8]}.partial'
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            json.dump({'text': input_text, 'segments': segments}, f, ensure_ascii=False)
+        os.replace(partial_path, plan_path)
+
+    _schedule_pending(segments)
+    return load_playlist(key)
+
+
+def load_playlist(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a playlist plan together with the readiness of each segment
+
+    Missing fingerspelled segments are (re)scheduled, which lets a worker
+    that did not create the plan finish it.
+
+    Args:
+        key: Playlist key
+
+    Returns:
+        Playlist dictionary (key, text, segments, complete) or None if unknown
+    """
+    plan_path = os.path.join(settings.MEDIA_ROOT, playlist_name(key))
+    try:
+        with open(plan_path, encoding='utf-8') as f:
+            plan = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    segments = plan['segments']
+    _schedule_pending(segments)
+    for segment in segments:
+        segment['ready'] = _segment_ready(segment)
+        segment['url'] = settings.MEDIA_URL + quote(segment['name'])
+
+    return {
+        'key': key,
+        'text': plan['text'],
+        'segments': segments,
+        'complete': all(segment['ready'] for segment in segments),
+    }
+
+
+def _probe_duration(name: str) -> float:
+    from .video_processing import get_video_duration
+    return get_video_duration(os.path.join(settings.MEDIA_ROOT, name))
+
+
+@lru_cache(maxsize=SEGMENT_DURATION_CACHE_SIZE)
+def _known_duration(name: str) -> float:
+    duration = _probe_duration(name)
+    if not duration:
+        # lru_cache does not keep exceptions, so a failed probe is retried next time
+        raise ValueError(f'Could not read the duration of {name}')
+    return duration
+
+
+def segment_duration(name: str) -> Optional[float]:
+    """Duration in seconds of a ready segment, cached per process; None if it cannot be read"""
+    try:
+        return _known_duration(name)
+    except ValueError:
+        return None
+
+
+def hls_segment_name(key: str) -> str:
+    """Storage name (relative to MEDIA_ROOT) of the MPEG-TS copy of a segment"""
+    return sharded_name(SEGMENT_DIR, f'{key}.ts')
+
+
+def hls_segment(name: str) -> Optional[str]:
+    """
+    MPEG-TS copy of a ready MP4 segment, for HLS players
+
+    Version 3 playlists can only list MPEG-TS segments, so every catalog clip
+    or per-word render is remuxed once (the streams are copied, not
+    re-encoded) into a file keyed like a render, which follows changes to
+    the source clip.
+
+    Args:
+        name: Storage name of the MP4 segment
+
+    Returns:
+        Storage name of the MPEG-TS segment or None on failure
+    """
+    source = os.path.join(settings.MEDIA_ROOT, name)
+    try:
+        key = render_key([source])
+    except OSError:
+        return None
+    ts_name = hls_segment_name(key)
+    ts_path = os.path.join(settings.MEDIA_ROOT, ts_name)
+    if _touch_render(ts_path):
+        return ts_name
+
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        logger.error('ffmpeg is not installed, HLS segments cannot be produced')
+        return None
+
+    with _get_render_lock(key):
+        if os.path.exists(ts_path):
+            return ts_name
+        os.makedirs(os.path.dirname(ts_path), exist_ok=True)
+        partial_path = f'{ts_path}.{uuid.uuid4().hex[:8]}.partial'
+        try:
+            completed = subprocess.run(
+                [ffmpeg, '-hide_banner', '-loglevel', 'error', '-nostdin',
+                 '-i', source, '-map', '0:v', '-c', 'copy', '-f', 'mpegts', partial_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                timeout=REMUX_TIMEOUT,
+                check=False,
+            )
+            if completed.returncode != 0:
+                logger.error(f"Error remuxing {name}: {completed.stderr.decode('utf-8', 'replace').strip()}")
+                return None
+            os.replace(partial_path, ts_path)
+        except subprocess.TimeoutExpired:
+            logger.error(f"Remuxing {name} timed out")
+            return None
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+    return ts_name
+
+
+def build_m3u8(playlist: Dict[str, Any], base_url: str = '') -> str:
+    """
+    Render a playlist as an HLS-style EVENT playlist
+
+    Only the ready prefix of the sentence is listed, as MPEG-TS copies of
+    the MP4 segments; ``#EXT-X-ENDLIST`` is added once every segment is
+    listed, until then players keep polling.
+
+    Args:
+        playlist: Dictionary returned by load_playlist
+        base_url: Absolute URL prefix for segment URIs
+
+    Returns:
+        Playlist text
+    """
+    entries = []
+    for segment in playlist['segments']:
+        if not segment['ready']:
+            break
+        duration = segment_duration(segment['name'])
+        ts_name = hls_segment(segment['name']) if duration else None
+        if not ts_name:
+            # Unplayable for now; later words wait rather than skip it
+            break
+        entries.append((duration, settings.MEDIA_URL + quote(ts_name), segment))
+
+    target_duration = max([math.ceil(duration) for duration, _, _ in entries] or [1])
+    lines = [
+        '#EXTM3U',
+        '#EXT-X-VERSION:3',
+        '#EXT-X-PLAYLIST-TYPE:EVENT',
+        f'#EXT-X-TARGETDURATION:{target_duration}',
+        '#EXT-X-MEDIA-SEQUENCE:0',
+    ]
+    for index, (duration, url, segment) in enumerate(entries):
+        if index:
+            # Catalog clips are encoded independently
+            lines.append('#EXT-X-DISCONTINUITY')
+        lines.append(f"#EXTINF:{duration:.3f},{segment['word']}")
+        lines.append(base_url + url)
+    if len(entries) == len(playlist['segments']):
+        lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines) + '\n'
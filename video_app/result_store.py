@@ -0,0 +1,143 @@
+"""
+Session-scoped store of recent gesture and text results
+
+Each browser session keeps a bounded ring buffer of its latest results per
+kind plus the one result the legacy polling shims have not picked up yet.
+Everything lives in a Django cache (Redis in multi-worker deployments), so
+any worker process can serve any request and reads are single cache hits.
+Writers and pollers of one session and kind serialize on a short lock taken
+with the cache's atomic ``add()``, so concurrent results are not lost.
+"""
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT_STORE = {
+    'CACHE': 'default',
+    'MAX_RESULTS': 20,        # ring buffer size per session and kind
+    'TIMEOUT': 60 * 60 * 24,  # seconds of inactivity before a session's results expire
+    'LOCK_TIMEOUT': 5,        # seconds a crashed holder can block a session's writes
+}
+
+LOCK_POLL_INTERVAL = 0.005  # seconds, doubled up to LOCK_POLL_MAX while waiting
+LOCK_POLL_MAX = 0.05
+
+
+class ResultStore:
+    """Bounded per-session result history on top of a Django cache"""
+
+    def __init__(self, cache_alias: str = 'default', max_results: int = 20, timeout: int = 86400,
+                 lock_timeout: float = 5):
+        self.cache_alias = cache_alias
+        self.max_results = max_results
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _key(self, session_key: str, kind: str, slot: str) -> str:
+        return f'results:{session_key}:{kind}:{slot}'
+
+    @contextmanager
+    def _locked(self, session_key: str, kind: str):
+        """
+        Hold the session's lock for a kind, waiting up to lock_timeout
+
+        Yields True when the lock was taken. The lock expires after
+        lock_timeout, so a holder that dies cannot block the session for good.
+        """
+        lock_key = self._key(session_key, kind, 'lock')
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        interval = LOCK_POLL_INTERVAL
+        while not self.cache.add(lock_key, token, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                yield False
+                return
+            time.sleep(interval)
+            interval = min(interval * 2, LOCK_POLL_MAX)
+        try:
+            yield True
+        finally:
+            # Do not release a lock that expired and was taken by someone else
+            if self.cache.get(lock_key) == token:
+                self.cache.delete(lock_key)
+
+    def add(self, session_key: str, kind: str, result: Dict[str, Any]):
+        """
+        Append a result to the session's ring buffer and mark it unread
+
+        Args:
+            session_key: Django session key
+            kind: Result kind ('gesture' or 'text')
+            result: JSON-serializable result dictionary
+        """
+        recent_key = self._key(session_key, kind, 'recent')
+        with self._locked(session_key, kind) as locked:
+            if not locked:
+                # Better to risk a lost update than to drop this result
+                logger.warning(f"Result store lock timed out for {session_key}:{kind}")
+            recent = self.cache.get(recent_key) or []
+            recent.append(result)
+            self.cache.set_many({
+                recent_key: recent[-self.max_results:],
+                self._key(session_key, kind, 'pending'): result,
+            }, self.timeout)
+
+    def recent(self, session_key: Optional[str], kind: str) -> List[Dict[str, Any]]:
+        """Latest results of a kind, oldest first"""
+        if not session_key:
+            return []
+        return self.cache.get(self._key(session_key, kind, 'recent')) or []
+
+    def latest(self, session_key: Optional[str], kind: str) -> Optional[Dict[str, Any]]:
+        """Most recent result of a kind, read or not"""
+        recent = self.recent(session_key, kind)
+        return recent[-1] if recent else None
+
+    def pop_pending(self, session_key: Optional[str], kind: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the unread result of a kind
+
+        Runs under the session's lock, so concurrent polls from two workers
+        do not both report a result and a result stored by add() between the
+        read and the delete is not lost.
+        """
+        if not session_key:
+            return None
+        pending_key = self._key(session_key, kind, 'pending')
+        with self._locked(session_key, kind) as locked:
+            if not locked:
+                # The poller asks again shortly
+                return None
+            result = self.cache.get(pending_key)
+            if result is not None:
+                self.cache.delete(pending_key)
+            return result
+
+    async def apop_pending(self, session_key: Optional[str], kind: str) -> Optional[Dict[str, Any]]:
+        """Async variant of pop_pending(), in a single worker-thread hop"""
+        if not session_key:
+            return None
+        return await sync_to_async(self.pop_pending, thread_sensitive=False)(session_key, kind)
+
+
+_store = None
+
+
+def get_result_store() -> ResultStore:
+    """Process-wide ResultStore configured from settings.RESULT_STORE"""
+    global _store
+    if _store is None:
+        config = {**DEFAULT_RESULT_STORE, **getattr(settings, 'RESULT_STORE', {})}
+        _store = ResultStore(config['CACHE'], config['MAX_RESULTS'], config['TIMEOUT'], config['LOCK_TIMEOUT'])
+    return _store
@@ -0,0 +1,234 @@
+"""
+Time-based retention for SystemLog and HandGesture
+
+Rows older than each model's ``max_age_days`` (settings.DATA_RETENTION) are
+removed by ``created_at`` in bounded batches, each in its own short
+transaction, so the purge never holds long locks or builds one huge
+DELETE. With ``archive`` enabled every batch is first appended to a gzip
+JSONL file (one gzip member per batch, complete on disk before its rows
+are deleted) or written as a Parquet part file when pyarrow is installed.
+
+On PostgreSQL tables converted to monthly partitions (see
+``partitioning``), months entirely past the cutoff are archived and
+dropped whole; only the boundary month is deleted row by row.
+
+Gestures are deleted without per-row signals; their statistics rollups are
+adjusted once per batch instead, and once the batch has committed their
+video files are deleted and the cached WebSocket data of their sessions is
+invalidated.
+"""
+import os
+import gzip
+import json
+import time
+import uuid
+import logging
+from datetime import timedelta
+from typing import Dict, Any, List, Optional
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.utils import timezone
+from . import partitioning
+from .stats import forget_gestures
+from .utils import invalidate_session_data
+
+logger = logging.getLogger(__name__)
+
+
+def get_retention_policies() -> Dict[str, Dict[str, Any]]:
+    return getattr(settings, 'DATA_RETENTION', {})
+
+
+class ArchiveWriter:
+    """Append batches of rows of one model to an archive created per run"""
+
+    def __init__(self, model_name: str, directory: Optional[str] = None, archive_format: Optional[str] = None):
+        directory = directory or getattr(settings, 'RETENTION_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'archive'))
+        archive_format = archive_format or getattr(settings, 'RETENTION_ARCHIVE_FORMAT', 'jsonl')
+        if archive_format == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                logger.warning("pyarrow is not installed, archiving as gzip JSONL instead of Parquet")
+                archive_format = 'jsonl'
+        self.format = archive_format
+        stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+        base = os.path.join(directory, model_name.lower(), stamp)
+        self.path = base if archive_format == 'parquet' else f'{base}.jsonl.gz'
+        self.parts = 0
+        self.rows = 0
+
+    def write(self, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        if self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            os.makedirs(self.path, exist_ok=True)
+            self.parts += 1
+            table = pa.Table.from_pylist([
+                {key: str(value) if isinstance(value, uuid.UUID) else value for key, value in row.items()}
+                for row in rows
+            ])
+            pq.write_table(table, os.path.join(self.path, f'part-{self.parts:05d}.parquet'))
+        else:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with gzip.open(self.path, 'at', encoding='utf-8') as archive:
+                for row in rows:
+                    archive.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+        self.rows += len(rows)
+
+
+def _forget(model, queryset):
+    # Rows removed without signals must still leave the statistics rollups
+    if model._meta.model_name == 'handgesture':
+        forget_gestures(queryset)
+
+
+def _file_fields(model) -> List[models.FileField]:
+    return [field for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+
+
+def _cleanup_fields(model) -> List[str]:
+    """Columns needed after a delete: stored files and, for gestures, the session"""
+    fields = [field.attname for field in _file_fields(model)]
+    if model._meta.model_name == 'handgesture':
+        fields.append('session_id')
+    return fields
+
+
+def _cleanup(model, rows: List[Dict[str, Any]]):
+    """Delete the files of removed rows and invalidate their sessions' cached data"""
+    for field in _file_fields(model):
+        for row in rows:
+            name = row.get(field.attname)
+            if not name:
+                continue
+            try:
+                field.storage.delete(name)
+            except OSError as e:
+                logger.error(f"Failed to delete {name}: {str(e)}")
+    if model._meta.model_name == 'handgesture':
+        invalidate_session_data(row['session_id'] for row in rows)
+
+
+def _delete(model, queryset) -> int:
+    _forget(model, queryset)
+    # Fast path: no per-row pre/post_delete signals
+    return queryset._raw_delete(queryset.db)
+
+
+def _archive_queryset(queryset, fields, writer: ArchiveWriter, batch_size: int):
+    batch = []
+    for row in queryset.values(*fields).order_by().iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            writer.write(batch)
+            batch = []
+    writer.write(batch)
+
+
+def purge_model(model_name: str, max_age_days: int, archive: bool = False, batch_size: Optional[int] = None,
+                pause: float = 0.0, dry_run: bool = False, using: str = DEFAULT_DB_ALIAS,
+                archive_dir: Optional[str] = None, archive_format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Delete (and optionally archive) rows older than max_age_days
+
+    Args:
+        model_name: Model in video_app with a created_at field
+        max_age_days: Rows created before now minus this many days expire
+        archive: Write expired rows to the archive before deleting them
+        batch_size: Rows per delete transaction (default RETENTION_BATCH_SIZE)
+        pause: Seconds to sleep between batches to leave room for other writers
+        dry_run: Only count the expired rows
+        using: Database alias
+        archive_dir: Override RETENTION_ARCHIVE_DIR
+        archive_format: Override RETENTION_ARCHIVE_FORMAT
+
+    Returns:
+        Report with cutoff, deleted rows, dropped partitions and archive path
+    """
+    model = apps.get_model('video_app', model_name)
+    batch_size = batch_size or getattr(settings, 'RETENTION_BATCH_SIZE', 5000)
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    expired = model.objects.using(using).filter(created_at__lt=cutoff)
+    fields = [field.attname for field in model._meta.concrete_fields]
+    cleanup_fields = _cleanup_fields(model)
+    report = {'model': model_name, 'cutoff': cutoff, 'deleted': 0, 'partitions_dropped': 0, 'archive': None}
+
+    if dry_run:
+        report['deleted'] = expired.count()
+        return report
+
+    writer = ArchiveWriter(model_name, archive_dir, archive_format) if archive else None
+
+    if partitioning.is_partitioned(model, using):
+        partitioning.ensure_partitions(model, using)
+        for name, month in partitioning.expired_partitions(model, cutoff, using):
+            month_rows = model.objects.using(using).filter(
+                created_at__gte=month, created_at__lt=partitioning.add_months(month, 1)
+            )
+            with transaction.atomic(using=using):
+                if writer:
+                    _archive_queryset(month_rows, fields, writer, batch_size)
+                report['deleted'] += month_rows.count()
+                _forget(model, month_rows)
+                cleanup_rows = list(month_rows.values(*cleanup_fields).distinct()) if cleanup_fields else []
+                partitioning.drop_partition(model, name, using)
+                transaction.on_commit(lambda rows=cleanup_rows: _cleanup(model, rows), using=using)
+            report['partitions_dropped'] += 1
+
+    # Without an archive only the columns needed to clean up after the delete are read
+    batch_fields = fields if writer else ['id', *cleanup_fields]
+    while True:
+        with transaction.atomic(using=using):
+            batch = list(expired.order_by('created_at').values(*batch_fields)[:batch_size])
+            if not batch:
+                break
+            if writer:
+                writer.write(batch)
+            report['deleted'] += _delete(model, model.objects.using(using).filter(pk__in=[row['id'] for row in batch]))
+            if cleanup_fields:
+                transaction.on_commit(lambda rows=batch: _cleanup(model, rows), using=using)
+        if pause:
+            time.sleep(pause)
+
+    if writer and writer.rows:
+        report['archive'] = writer.path
+    logger.info(
+        f"Retention for {model_name}: {report['deleted']} rows before {cutoff:%Y-%m-%d} removed, "
+        f"{report['partitions_dropped']} partitions dropped"
+    )
+    return report
+
+
+def purge_expired(models: Optional[List[str]] = None, dry_run: bool = False, archive: Optional[bool] = None,
+                  **options) -> List[Dict[str, Any]]:
+    """
+    Apply every retention policy (or those of ``models``)
+
+    Args:
+        models: Model names to purge, default all configured
+        dry_run: Only count the expired rows
+        archive: Override the per-model archive flag
+        options: Passed on to purge_model
+
+    Returns:
+        One purge_model report per model
+    """
+    reports = []
+    for model_name, policy in get_retention_policies().items():
+        if models and model_name not in models:
+            continue
+        if policy.get('max_age_days') is None:
+            continue
+        reports.append(purge_model(
+            model_name,
+            policy['max_age_days'],
+            archive=policy.get('archive', False) if archive is None else archive,
+            dry_run=dry_run,
+            **options
+        ))
+    return reports
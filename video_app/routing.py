@@ -7,4 +7,5 @@ from . import consumers
 websocket_urlpatterns = [
     re_path(r'ws/gesture-session/(?P<session_id>[0-9a-f-]+)/$', consumers.GestureConsumer.as_asgi()),
     re_path(r'ws/gesture-stream/$', consumers.GestureStreamConsumer.as_asgi()),
+    re_path(r'ws/results/$', consumers.ResultConsumer.as_asgi()),
 ]
@@ -0,0 +1,141 @@
+"""
+Cheap screening of requests for suspicious patterns
+
+All patterns are compiled into one case-insensitive alternation, so a scan
+is a single pass over the input. The URL and small bodies are inspected:
+urlencoded, JSON and plain text as a whole, multipart forms field by field
+with file parts skipped. Bodies over max_body_bytes are never read here, so
+large uploads are streamed by the view alone.
+"""
+import re
+import logging
+from typing import Dict, Any, Iterable, Iterator, Optional
+from urllib.parse import unquote_plus
+from django.conf import settings
+from django.utils.http import parse_header_parameters
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCREENING = {
+    'patterns': [
+        'script', 'javascript:', 'vbscript:', 'onload=', 'onerror=',
+        '../', '..\\', 'cmd.exe', 'powershell', 'eval(',
+    ],
+    'max_body_bytes': 64 * 1024,
+    # Path prefix -> overrides; first match wins
+    'routes': {
+        '/admin/': {'inspect_body': False},
+    },
+}
+
+SCREENED_CONTENT_TYPES = ('application/x-www-form-urlencoded', 'application/json', 'text/plain')
+
+
+def compile_patterns(patterns: Iterable[str]) -> re.Pattern:
+    """Compile literal patterns into one case-insensitive regex"""
+    # Longest first so overlapping literals report the most specific match
+    alternatives = sorted(set(patterns), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(pattern) for pattern in alternatives), re.IGNORECASE)
+
+
+def multipart_text_fields(body: bytes, boundary: str) -> Iterator[str]:
+    """Values of the text fields of a multipart body; file parts are skipped"""
+    if not boundary:
+        return
+    for part in body.split(b'--' + boundary.encode('latin-1')):
+        head, separator, content = part.partition(b'\r\n\r\n')
+        if not separator:
+            continue
+        disposition = ''
+        for line in head.decode('latin-1').split('\r\n'):
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'content-disposition':
+                disposition = value
+        if 'filename' in parse_header_parameters(disposition)[1]:
+            continue
+        if content.endswith(b'\r\n'):
+            content = content[:-2]
+        yield content.decode('utf-8', errors='replace')
+
+
+class RequestScreener:
+    """Flags requests whose URL or small body contains a suspicious pattern"""
+
+    def __init__(self, patterns: Iterable[str], max_body_bytes: int = 64 * 1024,
+                 routes: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.regex = compile_patterns(patterns)
+        self.max_body_bytes = max_body_bytes
+        self.routes = routes or {}
+
+    def route_options(self, path: str) -> Dict[str, Any]:
+        for prefix, options in self.routes.items():
+            if path.startswith(prefix):
+                return options
+        return {}
+
+    def screen(self, request) -> Optional[str]:
+        """
+        Check a request
+
+        Args:
+            request: Django request object
+
+        Returns:
+            The first suspicious pattern found, or None
+        """
+        return self.screen_url(request) or self.screen_body(request)
+
+    def screen_url(self, request) -> Optional[str]:
+        """Check the path and query string; never touches the body"""
+        if not self.route_options(request.path).get('enabled', True):
+            return None
+        match = self.regex.search(unquote_plus(request.get_full_path()))
+        return match.group(0) if match else None
+
+    def reads_body(self, request) -> bool:
+        """Whether screen_body would read the request body"""
+        options = self.route_options(request.path)
+        if not options.get('enabled', True) or not options.get('inspect_body', True):
+            return False
+        if request.method not in ('POST', 'PUT', 'PATCH'):
+            return False
+        content_type = parse_header_parameters(request.META.get('CONTENT_TYPE', ''))[0]
+        if content_type not in SCREENED_CONTENT_TYPES and content_type != 'multipart/form-data':
+            return False
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return False
+        return 0 < content_length <= self.max_body_bytes
+
+    def screen_body(self, request) -> Optional[str]:
+        """
+        Check a small body; large bodies and unscreened types are not read
+
+        Reading the body blocks, so async callers run this in a thread.
+        """
+        if not self.reads_body(request):
+            return None
+        content_type, params = parse_header_parameters(request.META.get('CONTENT_TYPE', ''))
+        # request.body is cached, so the view can still read POST/FILES afterwards
+        if content_type == 'multipart/form-data':
+            texts = multipart_text_fields(request.body, params.get('boundary', ''))
+        else:
+            texts = [unquote_plus(request.body.decode('utf-8', errors='replace'))]
+        for text in texts:
+            match = self.regex.search(text)
+            if match:
+                return match.group(0)
+        return None
+
+
+_screener = None
+
+
+def get_screener() -> RequestScreener:
+    """Process-wide screener configured from settings.SECURITY_SCREENING"""
+    global _screener
+    if _screener is None:
+        config = {**DEFAULT_SCREENING, **getattr(settings, 'SECURITY_SCREENING', {})}
+        _screener = RequestScreener(config['patterns'], config['max_body_bytes'], config['routes'])
+    return _screener
@@ -0,0 +1,320 @@
+"""
+Full-text search over session names and conversion texts
+
+Documents live in a separate index instead of being matched with
+``LIKE '%...%'`` against the model tables: an FTS5 virtual table on SQLite
+(plus a small side table mapping UUID primary keys to FTS rowids), or a
+table with a generated, GIN-indexed tsvector column on PostgreSQL. Signals
+keep the index in step with writes and ``rebuild_search_index`` refills it.
+
+Text is normalized before indexing and before querying: Arabic diacritics
+and tatweel are removed, alef, teh marbuta and alef maksura forms are
+unified and case is folded, so "السَّلام" and "السلام" match each other.
+Matching is by whole tokens or token prefixes, not arbitrary substrings.
+On other databases, or before the index exists, callers fall back to
+``icontains``.
+"""
+import re
+import logging
+from typing import Dict, List, Optional
+from django.apps import apps as global_apps
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'video_app_search'
+SEARCH_DOC_TABLE = 'video_app_search_doc'
+SEARCH_VENDORS = ('sqlite', 'postgresql')
+
+# doc_type -> (model name, indexed text field)
+SEARCH_DOCUMENTS = {
+    'session': ('GestureSession', 'session_name'),
+    'text': ('TextToSign', 'input_text'),
+    'voice': ('VoiceToSign', 'transcribed_text'),
+}
+
+# Harakat, tanween, shadda, sukun, superscript alef and Quranic annotation marks
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]')
+ARABIC_TATWEEL = '\u0640'
+ARABIC_LETTER_FORMS = str.maketrans({
+    '\u0623': '\u0627', '\u0625': '\u0627', '\u0622': '\u0627', '\u0671': '\u0627',  # أ إ آ ٱ -> ا
+    '\u0629': '\u0647',  # ة -> ه
+    '\u0649': '\u064a',  # ى -> ي
+})
+TOKEN_PATTERN = re.compile(r'\w+')
+
+_available: Dict[str, bool] = {}
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Strip tashkeel and tatweel, unify letter forms and fold case"""
+    if not text:
+        return ''
+    text = ARABIC_DIACRITICS.sub('', text).replace(ARABIC_TATWEEL, '')
+    return text.translate(ARABIC_LETTER_FORMS).casefold()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+
+def search_available(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """Whether the search index exists on this database"""
+    if using not in _available:
+        connection = connections[using]
+        if connection.vendor not in SEARCH_VENDORS:
+            _available[using] = False
+        elif SEARCH_TABLE in connection.introspection.table_names():
+            _available[using] = True
+        else:
+            # Not remembered: another process may migrate the table in at any time
+            return False
+    return _available[using]
+
+
+def create_search_table(connection) -> bool:
+    """
+    Create the search index tables if missing
+
+    Returns:
+        False if this database cannot host the index (other vendors, SQLite without FTS5)
+    """
+    _available.clear()
+    if connection.vendor not in SEARCH_VENDORS:
+        logger.info(f"Full-text search not supported on {connection.vendor}, using icontains")
+        return False
+    try:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+                    "doc_type varchar(20) NOT NULL, "
+                    "object_id uuid NOT NULL, "
+                    "body text NOT NULL, "
+                    "document tsvector GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED, "
+                    "PRIMARY KEY (doc_type, object_id))"
+                )
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx "
+                    f"ON {SEARCH_TABLE} USING gin (document)"
+                )
+            else:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {SEARCH_DOC_TABLE} ("
+                    "id INTEGER PRIMARY KEY, "
+                    "doc_type varchar(20) NOT NULL, "
+                    "object_id char(32) NOT NULL, "
+                    "UNIQUE (doc_type, object_id))"
+                )
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(body, tokenize='unicode61')"
+                )
+    except DatabaseError as e:
+        logger.warning(f"Could not create the full-text search index, using icontains: {str(e)}")
+        return False
+    return True
+
+
+def drop_search_table(connection):
+    _available.clear()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_DOC_TABLE}')
+
+
+def _write_document(cursor, connection, doc_type: str, object_id, body: str):
+    if connection.vendor == 'postgresql':
+        if body:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (doc_type, object_id, body) VALUES (%s, %s, %s) "
+                "ON CONFLICT (doc_type, object_id) DO UPDATE SET body = EXCLUDED.body",
+                [doc_type, object_id, body]
+            )
+        else:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE doc_type = %s AND object_id = %s', [doc_type, object_id]
+            )
+        return
+
+    # Start with a write to a plain table: a transaction that reads first
+    # cannot be upgraded once another connection has committed, and fails with
+    # "database is locked" without waiting for busy_timeout. The UPDATE takes
+    # the write lock even when it matches nothing.
+    if body:
+        cursor.execute(
+            f'INSERT OR IGNORE INTO {SEARCH_DOC_TABLE} (doc_type, object_id) VALUES (%s, %s)',
+            [doc_type, object_id]
+        )
+    else:
+        cursor.execute(
+            f'UPDATE {SEARCH_DOC_TABLE} SET doc_type = doc_type WHERE doc_type = %s AND object_id = %s',
+            [doc_type, object_id]
+        )
+    cursor.execute(
+        f'SELECT id FROM {SEARCH_DOC_TABLE} WHERE doc_type = %s AND object_id = %s', [doc_type, object_id]
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return
+    cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [row[0]])
+    if not body:
+        cursor.execute(f'DELETE FROM {SEARCH_DOC_TABLE} WHERE id = %s', [row[0]])
+        return
+    cursor.execute(f'INSERT INTO {SEARCH_TABLE} (rowid, body) VALUES (%s, %s)', [row[0], body])
+
+
+def _doc_type_of(model) -> Optional[str]:
+    for doc_type, (model_name, field) in SEARCH_DOCUMENTS.items():
+        if model._meta.app_label == 'video_app' and model.__name__ == model_name:
+            return doc_type
+    return None
+
+
+def index_instance(instance, using: str = DEFAULT_DB_ALIAS, remove: bool = False, update_fields=None):
+    """
+    Add, refresh or remove one object's document
+
+    Index failures are logged rather than raised so they never fail the
+    write that triggered them; ``rebuild_search_index`` repairs the index.
+
+    Args:
+        instance: GestureSession, TextToSign or VoiceToSign instance
+        using: Database alias the instance was written to
+        remove: Remove the document (object deleted)
+        update_fields: Fields of a partial save; skipped if the text field is not among them
+    """
+    doc_type = _doc_type_of(type(instance))
+    if doc_type is None or not search_available(using):
+        return
+    field = SEARCH_DOCUMENTS[doc_type][1]
+    if update_fields is not None and field not in update_fields:
+        return
+
+    connection = connections[using]
+    object_id = instance._meta.pk.get_db_prep_value(instance.pk, connection)
+    body = '' if remove else ' '.join(tokenize(getattr(instance, field)))
+    try:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            _write_document(cursor, connection, doc_type, object_id, body)
+    except DatabaseError as e:
+        logger.error(f"Failed to update search index for {doc_type} {instance.pk}: {str(e)}")
+
+
+def _match_subquery(doc_type: str, query: str, using: str) -> Optional[RawSQL]:
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    if connections[using].vendor == 'postgresql':
+        return RawSQL(
+            f"SELECT object_id FROM {SEARCH_TABLE} "
+            "WHERE doc_type = %s AND document @@ to_tsquery('simple', %s)",
+            (doc_type, ' & '.join(f'{token}:*' for token in tokens))
+        )
+    return RawSQL(
+        f"SELECT d.object_id FROM {SEARCH_TABLE} "
+        f"JOIN {SEARCH_DOC_TABLE} d ON d.id = {SEARCH_TABLE}.rowid "
+        f"WHERE {SEARCH_TABLE} MATCH %s AND d.doc_type = %s",
+        (' '.join(f'"{token}"*' for token in tokens), doc_type)
+    )
+
+
+def search_q(doc_type: str, query: str, using: str = DEFAULT_DB_ALIAS, prefix: str = '') -> Q:
+    """
+    Filter matching objects whose indexed text contains every query term
+
+    Args:
+        doc_type: Key of SEARCH_DOCUMENTS
+        query: User search text
+        using: Database alias of the queryset being filtered
+        prefix: Relation path to the searched model, e.g. 'session__'
+
+    Returns:
+        Q object usable in filter(), falling back to icontains without an index
+    """
+    field = SEARCH_DOCUMENTS[doc_type][1]
+    subquery = _match_subquery(doc_type, query, using) if search_available(using) else None
+    if subquery is None:
+        return Q(**{f'{prefix}{field}__icontains': query})
+    return Q(**{f'{prefix}pk__in': subquery})
+
+
+def gesture_type_q(query: str) -> Q:
+    """Match gesture types against the (small, fixed) list of choices instead of scanning rows"""
+    from .models import HandGesture
+    needle = normalize_text(query).strip()
+    types = [value for value, label in HandGesture.GESTURE_TYPES if needle and needle in normalize_text(label)]
+    return Q(gesture_type__in=types)
+
+
+def search_gestures(queryset, query: str):
+    """Gestures whose type or session name matches query"""
+    return queryset.filter(
+        gesture_type_q(query) | search_q('session', query, queryset.db, prefix='session__')
+    )
+
+
+def rebuild_search_index(using: str = DEFAULT_DB_ALIAS, apps=global_apps, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Recreate every document from the model tables
+
+    Args:
+        using: Database alias
+        apps: App registry (the historical one when called from a migration)
+        batch_size: Rows read and inserted per round trip
+
+    Returns:
+        Number of documents indexed per doc_type
+    """
+    connection = connections[using]
+    if not create_search_table(connection):
+        return {}
+
+    counts = {}
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {SEARCH_DOC_TABLE}')
+        next_rowid = 1
+
+        for doc_type, (model_name, field) in SEARCH_DOCUMENTS.items():
+            model = apps.get_model('video_app', model_name)
+            rows = model._default_manager.using(using).exclude(**{f'{field}__isnull': True}).values_list(
+                'pk', field
+            ).order_by().iterator(chunk_size=batch_size)
+            counts[doc_type] = 0
+            batch = []
+            for pk, text in rows:
+                body = ' '.join(tokenize(text))
+                if body:
+                    batch.append((model._meta.pk.get_db_prep_value(pk, connection), body))
+                if len(batch) >= batch_size:
+                    next_rowid = _insert_batch(cursor, connection, doc_type, batch, next_rowid)
+                    counts[doc_type] += len(batch)
+                    batch = []
+            if batch:
+                next_rowid = _insert_batch(cursor, connection, doc_type, batch, next_rowid)
+                counts[doc_type] += len(batch)
+    return counts
+
+
+def _insert_batch(cursor, connection, doc_type: str, batch, next_rowid: int) -> int:
+    if connection.vendor == 'postgresql':
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (doc_type, object_id, body) VALUES (%s, %s, %s)',
+            [(doc_type, object_id, body) for object_id, body in batch]
+        )
+        return next_rowid
+
+    rowids = range(next_rowid, next_rowid + len(batch))
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_DOC_TABLE} (id, doc_type, object_id) VALUES (%s, %s, %s)',
+        [(rowid, doc_type, object_id) for rowid, (object_id, body) in zip(rowids, batch)]
+    )
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, body) VALUES (%s, %s)',
+        [(rowid, body) for rowid, (object_id, body) in zip(rowids, batch)]
+    )
+    return next_rowid + len(batch)
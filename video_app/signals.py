@@ -0,0 +1,64 @@
+"""
+Signal handlers keeping the statistics rollups and the search index in step with writes
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import GestureSession, HandGesture, TextToSign, VoiceToSign
+from .search import index_instance
+from .stats import ACTIVE_SESSIONS, adjust_counter, record_gesture, record_session
+
+
+@receiver(post_save, sender=HandGesture)
+def gesture_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_gesture(instance)
+
+
+@receiver(post_delete, sender=HandGesture)
+def gesture_deleted(sender, instance, **kwargs):
+    record_gesture(instance, sign=-1)
+
+
+@receiver(pre_save, sender=GestureSession)
+def session_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Remember the stored is_active so post_save can tell whether it flipped
+    instance._was_active = None
+    if raw or instance._state.adding or (update_fields is not None and 'is_active' not in update_fields):
+        return
+    instance._was_active = GestureSession.objects.filter(pk=instance.pk).values_list(
+        'is_active', flat=True
+    ).first()
+
+
+@receiver(post_save, sender=GestureSession)
+def session_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        record_session(instance)
+        if instance.is_active:
+            adjust_counter(ACTIVE_SESSIONS, 1)
+    elif instance._was_active is not None and instance._was_active != instance.is_active:
+        adjust_counter(ACTIVE_SESSIONS, 1 if instance.is_active else -1)
+
+
+@receiver(post_delete, sender=GestureSession)
+def session_deleted(sender, instance, **kwargs):
+    record_session(instance, sign=-1)
+    if instance.is_active:
+        adjust_counter(ACTIVE_SESSIONS, -1)
+
+
+@receiver(post_save, sender=GestureSession)
+@receiver(post_save, sender=TextToSign)
+@receiver(post_save, sender=VoiceToSign)
+def searchable_saved(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    if not raw:
+        index_instance(instance, using=using, update_fields=update_fields)
+
+
+@receiver(post_delete, sender=GestureSession)
+@receiver(post_delete, sender=TextToSign)
+@receiver(post_delete, sender=VoiceToSign)
+def searchable_deleted(sender, instance, using=None, **kwargs):
+    index_instance(instance, using=using, remove=True)
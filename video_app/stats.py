@@ -0,0 +1,169 @@
+"""
+Incrementally maintained usage statistics
+
+HandGesture and GestureSession writes update small rollup tables (per hour
+and gesture type counts and confidence sums, sessions created per hour and
+a running active-session counter) with F() increments from post_save and
+post_delete handlers, so reading the dashboard numbers only touches the
+rollups and never scans the base tables.
+
+The handlers run immediately after the base-row write. The app's write
+sites (GestureConsumer.save_gesture, SessionCreateView) wrap both in
+transaction.atomic(); a write made under plain autocommit commits the row
+first, so a crash in between leaves the rollups behind. Queryset
+``update()``/``bulk_create()`` and raw deletes bypass the signals entirely,
+including ``.update(is_active=...)`` and the active-session counter.
+``rebuild_stats`` recomputes the rollups from scratch if they ever drift.
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, Any
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from .models import GestureSession, HandGesture, GestureHourlyStats, SessionHourlyStats, StatsCounter
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_SESSIONS = 'active_sessions'
+STATS_CACHE_KEY = 'stats:system'
+
+
+def truncate_hour(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _increment(model, lookup: Dict[str, Any], **deltas):
+    """Add deltas to a rollup row with F() expressions, creating the row on first use"""
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    if any(delta < 0 for delta in deltas.values()):
+        # Nothing recorded for this bucket (rows older than the rollup); rebuild_stats fixes it
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another writer created the row first
+        model.objects.filter(**lookup).update(**updates)
+
+
+def record_gesture(gesture: HandGesture, sign: int = 1):
+    """Count a created (sign=1) or deleted (sign=-1) gesture in its hourly bucket"""
+    _increment(
+        GestureHourlyStats,
+        {'hour': truncate_hour(gesture.created_at), 'gesture_type': gesture.gesture_type},
+        gesture_count=sign,
+        confidence_sum=sign * gesture.confidence_score,
+    )
+
+
+def record_session(session: GestureSession, sign: int = 1):
+    """Count a created (sign=1) or deleted (sign=-1) session in its hourly bucket"""
+    _increment(SessionHourlyStats, {'hour': truncate_hour(session.created_at)}, sessions_created=sign)
+
+
+def adjust_counter(name: str, delta: int):
+    _increment(StatsCounter, {'name': name}, value=delta)
+
+
+def forget_gestures(queryset):
+    """Subtract gestures that are about to be deleted in bulk (bypassing signals) from the rollups"""
+    rows = queryset.annotate(hour=TruncHour('created_at')).values('hour', 'gesture_type').annotate(
+        count=Count('id'), confidence=Sum('confidence_score')
+    ).order_by()
+    for row in rows:
+        _increment(
+            GestureHourlyStats,
+            {'hour': row['hour'], 'gesture_type': row['gesture_type']},
+            gesture_count=-row['count'],
+            confidence_sum=-(row['confidence'] or 0.0),
+        )
+
+
+def compute_stats() -> Dict[str, Any]:
+    """Read the dashboard statistics from the rollup tables"""
+    since = truncate_hour(timezone.now() - timedelta(hours=24))
+
+    gesture_totals = GestureHourlyStats.objects.aggregate(
+        count=Sum('gesture_count'), confidence=Sum('confidence_sum')
+    )
+    total_gestures = gesture_totals['count'] or 0
+    by_type = GestureHourlyStats.objects.values('gesture_type').annotate(
+        count=Sum('gesture_count'), confidence=Sum('confidence_sum')
+    ).filter(count__gt=0).order_by('gesture_type')
+
+    return {
+        'total_sessions': SessionHourlyStats.objects.aggregate(total=Sum('sessions_created'))['total'] or 0,
+        'active_sessions': StatsCounter.objects.filter(name=ACTIVE_SESSIONS).values_list('value', flat=True).first() or 0,
+        'sessions_last_24h': SessionHourlyStats.objects.filter(hour__gte=since).aggregate(
+            total=Sum('sessions_created'))['total'] or 0,
+        'total_gestures': total_gestures,
+        'gestures_last_24h': GestureHourlyStats.objects.filter(hour__gte=since).aggregate(
+            total=Sum('gesture_count'))['total'] or 0,
+        'avg_confidence': round((gesture_totals['confidence'] or 0) / total_gestures, 4) if total_gestures else 0,
+        'gestures_by_type': {
+            row['gesture_type']: {
+                'count': row['count'],
+                'avg_confidence': round(row['confidence'] / row['count'], 4) if row['count'] else 0,
+            }
+            for row in by_type
+        },
+        'system_uptime': 'N/A',
+    }
+
+
+def get_stats(use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Dashboard statistics, cached for STATS_CACHE_TIMEOUT seconds
+
+    Args:
+        use_cache: Set to False to read the rollups directly
+    """
+    if use_cache:
+        stats = cache.get(STATS_CACHE_KEY)
+        if stats is not None:
+            return stats
+    stats = compute_stats()
+    cache.set(STATS_CACHE_KEY, stats, getattr(settings, 'STATS_CACHE_TIMEOUT', 30))
+    return stats
+
+
+@transaction.atomic
+def rebuild_stats() -> Dict[str, int]:
+    """
+    Recompute every rollup from the base tables
+
+    Returns:
+        Number of rollup rows written per table
+    """
+    GestureHourlyStats.objects.all().delete()
+    gesture_rows = [
+        GestureHourlyStats(
+            hour=row['hour'], gesture_type=row['gesture_type'],
+            gesture_count=row['count'], confidence_sum=row['confidence'] or 0.0
+        )
+        for row in HandGesture.objects.annotate(hour=TruncHour('created_at'))
+        .values('hour', 'gesture_type')
+        .annotate(count=Count('id'), confidence=Sum('confidence_score'))
+        .order_by()
+    ]
+    GestureHourlyStats.objects.bulk_create(gesture_rows, batch_size=1000)
+
+    SessionHourlyStats.objects.all().delete()
+    session_rows = [
+        SessionHourlyStats(hour=row['hour'], sessions_created=row['count'])
+        for row in GestureSession.objects.annotate(hour=TruncHour('created_at'))
+        .values('hour').annotate(count=Count('id')).order_by()
+    ]
+    SessionHourlyStats.objects.bulk_create(session_rows, batch_size=1000)
+
+    StatsCounter.objects.update_or_create(
+        name=ACTIVE_SESSIONS, defaults={'value': GestureSession.objects.filter(is_active=True).count()}
+    )
+    cache.delete(STATS_CACHE_KEY)
+    return {'gesture_rows': len(gesture_rows), 'session_rows': len(session_rows)}
@@ -0,0 +1,188 @@
+"""
+Media storage garbage collector
+
+Walks the media tree with ``os.scandir`` and applies per-directory policies:
+files older than ``max_age_hours`` are deleted, then the oldest files are
+evicted until the directory fits in ``max_bytes``. Files still referenced by
+a model FileField are never deleted; once retention removes their rows they
+expire like any other file. Deletions happen in batches with a short pause
+between them so a large cleanup does not starve request I/O.
+
+Policies come from ``settings.MEDIA_GC_POLICIES``; run the collector with
+``manage.py cleanup_media`` from cron or a scheduler.
+"""
+import os
+import time
+import fnmatch
+import logging
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_BATCH_PAUSE = 0.05  # seconds
+
+
+def get_gc_policies() -> Dict[str, Dict[str, Any]]:
+    return getattr(settings, 'MEDIA_GC_POLICIES', {})
+
+
+def referenced_files(directory: str) -> Set[str]:
+    """
+    Absolute paths of files under a directory that a video_app FileField points to
+
+    Args:
+        directory: Directory relative to MEDIA_ROOT ('' for all of it)
+    """
+    prefix = f'{directory}/' if directory else ''
+    referenced = set()
+    for model in apps.get_app_config('video_app').get_models():
+        for field in model._meta.concrete_fields:
+            if not isinstance(field, models.FileField):
+                continue
+            names = model._default_manager.filter(
+                **{f'{field.name}__startswith': prefix}
+            ).exclude(**{field.name: ''}).values_list(field.name, flat=True)
+            referenced.update(
+                os.path.normpath(os.path.join(settings.MEDIA_ROOT, name)) for name in names.iterator()
+            )
+    return referenced
+
+
+def scan_files(directory: str, pattern: Optional[str] = None,
+               recursive: bool = True) -> Iterator[Tuple[str, int, float]]:
+    """
+    Yield (path, size, mtime) for files under a directory
+
+    Args:
+        directory: Absolute directory path
+        pattern: Optional fnmatch pattern applied to file names
+        recursive: Descend into subdirectories
+    """
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        yield from scan_files(entry.path, pattern, recursive)
+                elif entry.is_file(follow_symlinks=False):
+                    if pattern and not fnmatch.fnmatch(entry.name, pattern):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    yield entry.path, stat.st_size, stat.st_mtime
+            except FileNotFoundError:
+                # Removed while we were scanning
+                continue
+
+
+def _remove_empty_dirs(directory: str):
+    """Remove empty subdirectories below (not including) directory"""
+    for root, dirs, files in os.walk(directory, topdown=False):
+        if root != directory and not dirs and not files:
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
+
+
+def _delete_batched(files: List[Tuple[str, int, float]], dry_run: bool,
+                    batch_size: int, batch_pause: float) -> Tuple[int, int]:
+    deleted = reclaimed = 0
+    for index, (path, size, _) in enumerate(files, start=1):
+        if not dry_run:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error(f"Failed to delete {path}: {str(e)}")
+                continue
+            if index % batch_size == 0:
+                time.sleep(batch_pause)
+        deleted += 1
+        reclaimed += size
+    return deleted, reclaimed
+
+
+def collect_directory(directory: str, max_age_hours: Optional[float] = None,
+                      max_bytes: Optional[int] = None, pattern: Optional[str] = None,
+                      recursive: bool = True, dry_run: bool = False,
+                      batch_size: int = DEFAULT_BATCH_SIZE,
+                      batch_pause: float = DEFAULT_BATCH_PAUSE) -> Dict[str, Any]:
+    """
+    Apply an age and size quota to one media directory
+
+    Args:
+        directory: Directory relative to MEDIA_ROOT
+        max_age_hours: Delete files last modified longer ago than this
+        max_bytes: Then evict oldest files until the directory fits
+        pattern: Only consider file names matching this fnmatch pattern
+        recursive: Include subdirectories
+        dry_run: Report what would be deleted without deleting
+
+    Returns:
+        Report with files scanned/referenced/deleted and bytes kept/reclaimed
+    """
+    root = os.path.join(settings.MEDIA_ROOT, directory)
+    referenced = referenced_files(directory)
+    now = time.time()
+    expired, kept, in_use = [], [], []
+    for file_info in scan_files(root, pattern, recursive):
+        if os.path.normpath(file_info[0]) in referenced:
+            in_use.append(file_info)
+        elif max_age_hours is not None and now - file_info[2] > max_age_hours * 3600:
+            expired.append(file_info)
+        else:
+            kept.append(file_info)
+
+    evicted = []
+    # Referenced files count against the quota but are never evicted
+    kept_bytes = sum(size for _, size, _ in kept + in_use)
+    if max_bytes is not None and kept_bytes > max_bytes:
+        kept.sort(key=lambda file_info: file_info[2])
+        while kept and kept_bytes > max_bytes:
+            file_info = kept.pop(0)
+            evicted.append(file_info)
+            kept_bytes -= file_info[1]
+
+    deleted, reclaimed = _delete_batched(expired + evicted, dry_run, batch_size, batch_pause)
+    if deleted and recursive and not dry_run:
+        _remove_empty_dirs(root)
+
+    return {
+        'directory': directory or '.',
+        'files_scanned': len(expired) + len(evicted) + len(kept) + len(in_use),
+        'files_referenced': len(in_use),
+        'files_deleted': deleted,
+        'bytes_reclaimed': reclaimed,
+        'bytes_kept': kept_bytes,
+    }
+
+
+def collect_garbage(directories: Optional[List[str]] = None, dry_run: bool = False) -> List[Dict[str, Any]]:
+    """
+    Run every configured policy (or only those for ``directories``)
+
+    Returns:
+        One report per directory
+    """
+    reports = []
+    for directory, policy in get_gc_policies().items():
+        if directories is not None and directory not in directories:
+            continue
+        report = collect_directory(directory, dry_run=dry_run, **policy)
+        reports.append(report)
+        if report['files_deleted']:
+            logger.info(
+                f"Media GC {report['directory']}: deleted {report['files_deleted']} files, "
+                f"reclaimed {report['bytes_reclaimed']} bytes"
+            )
+    return reports
+
@@ -1,3 +1,1232 @@
-from django.test import TestCase
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from .models import GestureSession, HandGesture, TextToSign, VoiceToSign, SystemLog
 
-# Create your tests here.
+
+class QueryPlanTests(TestCase):
+    """Hot queries must be answered from the composite indexes, not table scans"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('planner', password='planner')
+        cls.sessions = [
+            GestureSession.objects.create(user=cls.user, session_name=f'Session {i}', is_active=i % 2 == 0)
+            for i in range(4)
+        ]
+        HandGesture.objects.bulk_create([
+            HandGesture(session=session, user=cls.user, gesture_type='مهندس', confidence_score=0.9)
+            for session in cls.sessions
+            for _ in range(5)
+        ])
+        SystemLog.objects.bulk_create([
+            SystemLog(level=level, message='test', module=module)
+            for level in ('INFO', 'ERROR')
+            for module in ('WebSocket Consumer', 'FileUtils')
+        ])
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables are cheaper to scan; make the planner show the index it would use
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f'Expected one of {index_names} in query plan:\n{plan}'
+        )
+
+    def test_session_recent_gestures(self):
+        queryset = HandGesture.objects.filter(session=self.sessions[0]).order_by('-created_at')[:10]
+        self.assertUsesIndex(queryset, 'gesture_session_created_idx')
+
+    def gesture_list_queryset(self, **params):
+        from django.test import RequestFactory
+        from .views import GestureListView
+
+        view = GestureListView()
+        view.setup(RequestFactory().get('/gestures/', params))
+        view.request.user = self.user
+        return view.get_queryset()
+
+    def test_gesture_list_by_user_and_date(self):
+        today = timezone.localdate()
+        queryset = self.gesture_list_queryset(
+            date_from=(today - timedelta(days=7)).isoformat(), date_to=today.isoformat()
+        )
+        self.assertEqual(queryset.count(), 20)
+        self.assertUsesIndex(queryset, 'gesture_user_created_idx')
+        self.assertNotIn('TEMP B-TREE', queryset.explain())
+
+    def test_gesture_list_keyset_page(self):
+        from .pagination import KeysetPaginator
+
+        paginator = KeysetPaginator(self.gesture_list_queryset(), 5)
+        cursor = paginator.page().object_list[-1]
+        queryset = paginator._older(cursor.created_at, cursor.pk).order_by('-created_at', '-pk')[:6]
+        self.assertUsesIndex(queryset, 'gesture_user_created_idx')
+        self.assertNotIn('TEMP B-TREE', queryset.explain())
+
+    def test_active_sessions_of_user(self):
+        queryset = GestureSession.objects.filter(user=self.user, is_active=True).order_by('-created_at')
+        self.assertUsesIndex(queryset, 'session_user_active_idx')
+
+    def test_system_log_by_level(self):
+        queryset = SystemLog.objects.filter(level='ERROR').order_by('-created_at')
+        self.assertUsesIndex(queryset, 'systemlog_level_created_idx')
+
+    def test_system_log_by_module_and_date(self):
+        since = timezone.now() - timedelta(days=1)
+        queryset = SystemLog.objects.filter(module='FileUtils', created_at__gte=since).order_by('-created_at')
+        self.assertUsesIndex(queryset, 'systemlog_module_created_idx')
+
+    def test_pending_conversions(self):
+        for model, index_name in ((TextToSign, 'text_status_created_idx'), (VoiceToSign, 'voice_status_created_idx')):
+            with self.subTest(model=model.__name__):
+                queryset = model.objects.filter(processing_status='pending').order_by('created_at')
+                self.assertUsesIndex(queryset, index_name)
+
+
+class StatsRollupTests(TestCase):
+    """Rollups follow gesture and session writes and match a full rebuild"""
+
+    def test_rollups_track_writes(self):
+        from .stats import get_stats, rebuild_stats
+
+        session = GestureSession.objects.create(session_name='Stats')
+        GestureSession.objects.create(session_name='Inactive', is_active=False)
+        HandGesture.objects.create(session=session, gesture_type='مهندس', confidence_score=0.8)
+        gesture = HandGesture.objects.create(session=session, gesture_type='كيف الحال', confidence_score=0.6)
+
+        stats = get_stats(use_cache=False)
+        self.assertEqual(stats['total_sessions'], 2)
+        self.assertEqual(stats['active_sessions'], 1)
+        self.assertEqual(stats['total_gestures'], 2)
+        self.assertAlmostEqual(stats['avg_confidence'], 0.7)
+
+        gesture.delete()
+        session.is_active = False
+        session.save()
+        stats = get_stats(use_cache=False)
+        self.assertEqual(stats['total_gestures'], 1)
+        self.assertEqual(stats['active_sessions'], 0)
+
+        rebuild_stats()
+        self.assertEqual(get_stats(use_cache=False), stats)
+
+
+class SearchIndexTests(TestCase):
+    """The search index follows writes and matches Arabic text regardless of diacritics and letter forms"""
+
+    def test_normalize_text(self):
+        from .search import normalize_text
+        self.assertEqual(normalize_text('السَّلامُ عَلَيْكُم'), 'السلام عليكم')
+        self.assertEqual(normalize_text('إسـلامية'), 'اسلاميه')
+        self.assertEqual(normalize_text('مستشفى Clinic'), 'مستشفي clinic')
+
+    def test_index_tracks_writes(self):
+        from .search import search_q, search_gestures
+
+        session = GestureSession.objects.create(session_name='درسُ الأحد')
+        other = GestureSession.objects.create(session_name='Practice')
+        gesture = HandGesture.objects.create(session=other, gesture_type='مهندس', confidence_score=0.9)
+        text = TextToSign.objects.create(session=session, input_text='مَعَ السَّلامة')
+
+        def sessions(query):
+            return set(GestureSession.objects.filter(search_q('session', query)))
+
+        self.assertEqual(sessions('الاحد'), {session})
+        self.assertEqual(sessions('درس'), {session})
+        self.assertEqual(sessions('prac'), {other})
+        self.assertEqual(set(TextToSign.objects.filter(search_q('text', 'السلامه'))), {text})
+        self.assertEqual(set(search_gestures(HandGesture.objects.all(), 'مُهندس')), {gesture})
+        self.assertEqual(set(search_gestures(HandGesture.objects.all(), 'practice')), {gesture})
+
+        other.session_name = 'Review'
+        other.save()
+        self.assertEqual(sessions('practice'), set())
+        self.assertEqual(sessions('review'), {other})
+
+        session.delete()
+        self.assertEqual(sessions('درس'), set())
+        self.assertEqual(set(TextToSign.objects.filter(search_q('text', 'السلامه'))), set())
+
+    def test_availability_is_rechecked_until_the_table_exists(self):
+        from . import search
+
+        if not search.search_available():
+            self.skipTest(f'No full-text search on {connection.vendor}')
+        search.drop_search_table(connection)
+        self.assertFalse(search.search_available())
+        # Not remembered, so a table created by another process is picked up
+        self.assertNotIn(connection.alias, search._available)
+        search.create_search_table(connection)
+        self.assertTrue(search.search_available())
+
+
+class RetentionTests(TestCase):
+    """Expired rows are archived and deleted in batches, keeping the rollups consistent"""
+
+    def test_purge_archives_and_deletes_expired_logs(self):
+        from .retention import purge_model
+
+        SystemLog.objects.bulk_create([SystemLog(level='INFO', message=f'old {i}', module='test') for i in range(5)])
+        SystemLog.objects.update(created_at=timezone.now() - timedelta(days=40))
+        SystemLog.objects.create(level='INFO', message='recent', module='test')
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            report = purge_model('SystemLog', 30, archive=True, batch_size=2, archive_dir=archive_dir)
+            with gzip.open(report['archive'], 'rt', encoding='utf-8') as archive:
+                archived = [json.loads(line) for line in archive]
+
+        self.assertEqual(report['deleted'], 5)
+        self.assertEqual(sorted(row['message'] for row in archived), [f'old {i}' for i in range(5)])
+        self.assertEqual(list(SystemLog.objects.values_list('message', flat=True)), ['recent'])
+
+    def test_purge_gestures_updates_rollups(self):
+        from .retention import purge_model
+        from .stats import get_stats, rebuild_stats
+
+        session = GestureSession.objects.create(session_name='Retention')
+        old = HandGesture.objects.create(session=session, gesture_type='مهندس', confidence_score=0.5)
+        HandGesture.objects.create(session=session, gesture_type='مهندس', confidence_score=0.9)
+        HandGesture.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=400))
+        rebuild_stats()
+
+        report = purge_model('HandGesture', 365)
+        self.assertEqual(report['deleted'], 1)
+        stats = get_stats(use_cache=False)
+        self.assertEqual(stats['total_gestures'], 1)
+        rebuild_stats()
+        self.assertEqual(get_stats(use_cache=False), stats)
+
+    def test_purge_gestures_removes_files_and_cached_session_data(self):
+        import os
+        from django.core.cache import cache
+        from django.test import override_settings
+        from .retention import purge_model
+        from .utils import session_data_cache_key, session_data_version
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            os.makedirs(os.path.join(media_root, 'gesture_videos'))
+            video_path = os.path.join(media_root, 'gesture_videos', 'old.mp4')
+            open(video_path, 'wb').close()
+            session = GestureSession.objects.create(session_name='Files')
+            old = HandGesture.objects.create(
+                session=session, gesture_type='مهندس', video_file='gesture_videos/old.mp4'
+            )
+            HandGesture.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=400))
+            cached_key = session_data_cache_key(session.pk, session_data_version(session.pk))
+            cache.set(cached_key, {'session_id': str(session.pk)})
+
+            with self.captureOnCommitCallbacks(execute=True):
+                purge_model('HandGesture', 365)
+
+            self.assertFalse(os.path.exists(video_path))
+            self.assertNotEqual(session_data_cache_key(session.pk, session_data_version(session.pk)), cached_key)
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages walk the list in both directions and reject tampered cursors"""
+
+    def test_pages_forward_and_back(self):
+        import base64
+        from django.http import Http404
+        from .pagination import KeysetPaginator, encode_cursor
+
+        for i in range(5):
+            GestureSession.objects.create(session_name=f'Session {i}')
+        paginator = KeysetPaginator(GestureSession.objects.all(), 2)
+        newest_first = list(GestureSession.objects.order_by('-created_at', '-pk'))
+
+        first = paginator.page()
+        self.assertEqual(first.object_list, newest_first[:2])
+        self.assertTrue(first.has_next())
+        self.assertFalse(first.has_previous())
+
+        second = paginator.page(after=first.next_cursor)
+        third = paginator.page(after=second.next_cursor)
+        self.assertEqual(second.object_list, newest_first[2:4])
+        self.assertEqual(third.object_list, newest_first[4:])
+        self.assertFalse(third.has_next())
+
+        back = paginator.page(before=third.previous_cursor)
+        self.assertEqual(back.object_list, newest_first[2:4])
+        self.assertTrue(back.has_next())
+        self.assertTrue(back.has_previous())
+
+        # Nothing is older than a deleted oldest row, so its "newer" page is the last one
+        oldest_cursor = encode_cursor(newest_first[-1])
+        newest_first[-1].delete()
+        self.assertFalse(paginator.page(before=oldest_cursor).has_next())
+
+        tampered = base64.urlsafe_b64encode(b'2026-01-01T00:00:00+00:00|not-a-uuid').decode().rstrip('=')
+        with self.assertRaises(Http404):
+            paginator.page(after=tampered)
+
+
+class RequestScreeningTests(TestCase):
+    """Small multipart text fields are screened, uploaded files and large bodies are not"""
+
+    def test_multipart_text_fields(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import RequestFactory
+        from .screening import RequestScreener
+
+        screener = RequestScreener(['javascript:'], max_body_bytes=1024)
+        factory = RequestFactory()
+
+        request = factory.post('/text-to-sign/', {'text': 'javascript:alert(1)'})
+        self.assertEqual(screener.screen(request), 'javascript:')
+
+        upload = SimpleUploadedFile('clip.webm', b'javascript:' * 10, content_type='video/webm')
+        request = factory.post('/upload/', {'session_id': 'abc', 'video': upload})
+        self.assertIsNone(screener.screen(request))
+        self.assertIn('video', request.FILES)
+
+        # Bodies over max_body_bytes are left to the view unread
+        request = factory.post('/text-to-sign/', {'a': 'x' * 2048, 'b': 'javascript:'})
+        self.assertIsNone(screener.screen(request))
+        self.assertFalse(hasattr(request, '_body'))
+        self.assertFalse(hasattr(request, '_post'))
+
+
+class UploadTests(TestCase):
+    """Uploads are checked by magic bytes, hashed while they stream to storage and decoded without temp files"""
+
+    def test_validate_upload_checks_magic_bytes(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .uploads import AUDIO_KINDS, VIDEO_KINDS, UploadRejected, validate_upload
+
+        webm = SimpleUploadedFile('clip.webm', b'\x1a\x45\xdf\xa3' + b'\x00' * 64)
+        self.assertEqual(validate_upload(webm, VIDEO_KINDS), 'webm')
+        wav = SimpleUploadedFile('voice.wav', b'RIFF\x00\x00\x00\x00WAVEfmt ' + b'\x00' * 64)
+        self.assertEqual(validate_upload(wav, AUDIO_KINDS), 'wav')
+
+        # The extension does not matter, the content does
+        disguised = SimpleUploadedFile('clip.mp4', b'<?php echo 1; ?>' * 4)
+        with self.assertRaisesMessage(UploadRejected, 'Unsupported or corrupted file format'):
+            validate_upload(disguised, VIDEO_KINDS)
+        with self.assertRaisesMessage(UploadRejected, 'Unsupported or corrupted file format'):
+            validate_upload(wav, VIDEO_KINDS)
+        with self.assertRaisesMessage(UploadRejected, 'File is empty'):
+            validate_upload(SimpleUploadedFile('empty.webm', b''), VIDEO_KINDS)
+        with self.assertRaisesMessage(UploadRejected, 'File too large'):
+            validate_upload(webm, VIDEO_KINDS, max_size=16)
+
+    def test_save_upload_hashes_while_streaming(self):
+        import hashlib
+        import os
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import override_settings
+        from .uploads import VIDEO_KINDS, UploadRejected, save_upload
+
+        content = b'\x1a\x45\xdf\xa3' + os.urandom(3 * 64 * 1024)
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            saved = save_upload(SimpleUploadedFile('Clip.WEBM', content), 'gesture_videos', allowed_kinds=VIDEO_KINDS)
+            self.assertEqual(saved['sha256'], hashlib.sha256(content).hexdigest())
+            self.assertEqual((saved['kind'], saved['size']), ('webm', len(content)))
+            self.assertTrue(saved['name'].startswith('gesture_videos/') and saved['name'].endswith('.webm'))
+            with open(os.path.join(media_root, saved['name']), 'rb') as f:
+                self.assertEqual(f.read(), content)
+
+            # Rejected uploads are never written
+            with self.assertRaises(UploadRejected):
+                save_upload(SimpleUploadedFile('x.webm', b'not a video'), 'gesture_videos', allowed_kinds=VIDEO_KINDS)
+            self.assertEqual(len(os.listdir(os.path.join(media_root, 'gesture_videos'))), 1)
+
+    def test_seekable_source_is_released(self):
+        import os
+        import subprocess
+        import sys
+        from unittest import mock
+        from .uploads import seekable_source
+
+        data = os.urandom(200 * 1024)
+        # memfd where available, then the temp file fallback
+        for memfd in (hasattr(os, 'memfd_create'), False):
+            with self.subTest(memfd=memfd), \
+                    mock.patch('video_app.uploads.hasattr', create=True, return_value=memfd):
+                with seekable_source(data) as path:
+                    with open(path, 'rb') as f:
+                        f.seek(-16, os.SEEK_END)
+                        self.assertEqual(f.read(), data[-16:])
+                        f.seek(0)
+                        self.assertEqual(f.read(), data)
+                    # Child processes such as ffmpeg can open the path too
+                    size = subprocess.run(
+                        [sys.executable, '-c', 'import os, sys; print(os.path.getsize(sys.argv[1]))', path],
+                        capture_output=True, text=True, check=True,
+                    ).stdout
+                    self.assertEqual(int(size), len(data))
+                self.assertFalse(os.path.exists(path))
+
+    def test_upload_source_uses_spooled_files_in_place(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+        from .uploads import upload_source
+
+        spooled = TemporaryUploadedFile('clip.webm', 'video/webm', 4, None)
+        spooled.write(b'data')
+        spooled.flush()
+        with upload_source(spooled) as path:
+            self.assertEqual(path, spooled.temporary_file_path())
+        spooled.close()
+
+        for upload in (SimpleUploadedFile('clip.webm', b'data'), b'data'):
+            with upload_source(upload) as path, open(path, 'rb') as f:
+                self.assertEqual(f.read(), b'data')
+
+
+class AsyncMiddlewareTests(TestCase):
+    """Under ASGI the middleware never reads the request body on the event loop"""
+
+    def test_body_is_screened_off_the_loop(self):
+        import asyncio
+        import threading
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from .middleware import SecurityMiddleware
+
+        reads = []
+        request = RequestFactory().post(
+            '/text-to-sign/', '{"text": "javascript:alert(1)"}', content_type='application/json'
+        )
+        request_class = type(request)
+
+        class RecordingRequest(request_class):
+            @property
+            def body(self):
+                reads.append(threading.get_ident())
+                return request_class.body.fget(self)
+
+        request.__class__ = RecordingRequest
+        request.request_id = 'test'
+
+        async def get_response(request):
+            return HttpResponse('ok')
+
+        async def run():
+            middleware = SecurityMiddleware(get_response)
+            return threading.get_ident(), await middleware(request)
+
+        with self.assertLogs('video_app.middleware', 'WARNING') as logs:
+            loop_thread, response = asyncio.run(run())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("'javascript:'", logs.output[0])
+        self.assertTrue(reads)
+        self.assertNotIn(loop_thread, reads)
+
+    def test_async_stack_logs_and_limits(self):
+        import asyncio
+        from unittest import mock
+        from asgiref.sync import iscoroutinefunction
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from .middleware import LoggingMiddleware, RateLimitMiddleware, SecurityMiddleware
+        from .ratelimit import LocalBackend, RateLimiter
+
+        handled = []
+
+        async def get_response(request):
+            handled.append(request.request_id)
+            return HttpResponse('ok')
+
+        # Same order as settings.MIDDLEWARE
+        stack = LoggingMiddleware(RateLimitMiddleware(SecurityMiddleware(get_response)))
+        self.assertTrue(iscoroutinefunction(stack))
+
+        async def run():
+            return [await stack(RequestFactory().get('/sessions/')) for _ in range(3)]
+
+        limiter = RateLimiter(LocalBackend(), {'limit': 2, 'window': 60}, [])
+        with mock.patch('video_app.middleware.get_rate_limiter', return_value=limiter), \
+                self.assertLogs('video_app.middleware', 'INFO') as logs:
+            responses = asyncio.run(run())
+
+        self.assertEqual([response.status_code for response in responses], [200, 200, 429])
+        self.assertEqual(len(handled), 2)
+        self.assertEqual([response['X-Request-ID'] for response in responses[:2]], handled)
+        # Throttled responses still pass back through the logging middleware
+        self.assertTrue(responses[2]['X-Request-ID'])
+        self.assertGreaterEqual(int(responses[2]['Retry-After']), 1)
+        self.assertTrue(any('Rate limit exceeded' in line for line in logs.output))
+
+
+class MediaAccessTests(TestCase):
+    """User uploads are only served to their session's owner and staff"""
+
+    def test_private_prefixes(self):
+        from django.contrib.auth.models import AnonymousUser
+        from django.test import RequestFactory
+        from .media import can_access
+
+        owner = User.objects.create_user('owner')
+        other = User.objects.create_user('other')
+        staff = User.objects.create_user('staff', is_staff=True)
+        session = GestureSession.objects.create(user=owner)
+        VoiceToSign.objects.create(session=session, audio_file='voice_files/2026/01/01/a.wav')
+
+        def allowed(user, path):
+            request = RequestFactory().get('/media/' + path)
+            request.user = user
+            return can_access(request, path)
+
+        self.assertTrue(allowed(owner, 'voice_files/2026/01/01/a.wav'))
+        self.assertTrue(allowed(staff, 'voice_files/2026/01/01/a.wav'))
+        self.assertFalse(allowed(other, 'voice_files/2026/01/01/a.wav'))
+        self.assertFalse(allowed(AnonymousUser(), 'voice_files/2026/01/01/a.wav'))
+        self.assertFalse(allowed(staff, 'temp/upload.part'))
+        self.assertTrue(allowed(AnonymousUser(), 'renders/ab/cd.mp4'))
+
+
+class StorageGCTests(TestCase):
+    """Expired files are collected unless a FileField still references them"""
+
+    def test_referenced_files_are_kept(self):
+        import os
+        from django.test import override_settings
+        from .storage_gc import collect_directory
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            os.makedirs(os.path.join(media_root, 'voice_files'))
+            for name in ('pending.wav', 'orphan.wav'):
+                path = os.path.join(media_root, 'voice_files', name)
+                open(path, 'wb').close()
+                os.utime(path, (0, 0))
+            session = GestureSession.objects.create()
+            VoiceToSign.objects.create(session=session, audio_file='voice_files/pending.wav')
+
+            report = collect_directory('voice_files', max_age_hours=1)
+
+            self.assertEqual(report['files_deleted'], 1)
+            self.assertEqual(report['files_referenced'], 1)
+            self.assertEqual(os.listdir(os.path.join(media_root, 'voice_files')), ['pending.wav'])
+
+
+class ShardMediaTests(TestCase):
+    """Media files live under hash-derived prefixes and shard_media moves old flat files there"""
+
+    def test_shard_prefix(self):
+        import hashlib
+        from .utils import SHARD_DEPTH, SHARD_WIDTH, shard_prefix, sharded_directory, sharded_name
+
+        digest = hashlib.md5('abc.mp4'.encode('utf-8')).hexdigest()
+        prefix = shard_prefix('abc.mp4')
+        self.assertEqual(prefix, f'{digest[:2]}/{digest[2:4]}')
+        self.assertEqual([len(part) for part in prefix.split('/')], [SHARD_WIDTH] * SHARD_DEPTH)
+        self.assertEqual(shard_prefix('abc.mp4'), prefix)
+        self.assertNotEqual(shard_prefix('abd.mp4'), prefix)
+        self.assertEqual(sharded_name('renders', 'abc.mp4'), f'renders/{prefix}/abc.mp4')
+        self.assertEqual(sharded_directory('gesture_videos', 'session-1'), f"gesture_videos/{shard_prefix('session-1')}/session-1")
+
+    def test_shard_media_moves_files_and_rewrites_references(self):
+        import os
+        from io import StringIO
+        from django.core.management import call_command
+        from django.test import override_settings
+        from .utils import sharded_directory, sharded_name
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            def write(name, content=b''):
+                path = os.path.join(media_root, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(content)
+
+            write('renders/abc.mp4')
+            write('renders/def.mp4.partial')
+            write('renders/playlists/plan.json', json.dumps({
+                'segments': [{'name': 'renders/abc.mp4', 'clips': ['renders/abc.mp4', 'م.mp4']}],
+            }).encode('utf-8'))
+            write('voice_files/session-1/voice.wav')
+            write('voice_files/2024/01/01/dated.wav')
+            session = GestureSession.objects.create()
+            voice = VoiceToSign.objects.create(session=session, audio_file='voice_files/session-1/voice.wav')
+            dated = VoiceToSign.objects.create(session=session, audio_file='voice_files/2024/01/01/dated.wav')
+
+            dry_run = StringIO()
+            call_command('shard_media', dry_run=True, stdout=dry_run)
+            self.assertIn('3 files to move', dry_run.getvalue())
+            self.assertTrue(os.path.exists(os.path.join(media_root, 'renders/abc.mp4')))
+
+            call_command('shard_media', stdout=StringIO())
+
+            render = sharded_name('renders', 'abc.mp4')
+            voice_name = f"{sharded_directory('voice_files', 'session-1')}/voice.wav"
+            self.assertTrue(os.path.exists(os.path.join(media_root, render)))
+            self.assertTrue(os.path.exists(os.path.join(media_root, voice_name)))
+            self.assertFalse(os.path.exists(os.path.join(media_root, 'voice_files/session-1')))
+            # In-progress renders and date-based upload directories stay where they are
+            self.assertTrue(os.path.exists(os.path.join(media_root, 'renders/def.mp4.partial')))
+            self.assertTrue(os.path.exists(os.path.join(media_root, 'voice_files/2024/01/01/dated.wav')))
+
+            with open(os.path.join(media_root, sharded_name('renders/playlists', 'plan.json')), encoding='utf-8') as f:
+                segment = json.load(f)['segments'][0]
+            self.assertEqual(segment, {'name': render, 'clips': [render, 'م.mp4']})
+
+            voice.refresh_from_db()
+            dated.refresh_from_db()
+            self.assertEqual(voice.audio_file.name, voice_name)
+            self.assertEqual(dated.audio_file.name, 'voice_files/2024/01/01/dated.wav')
+
+
+class RenderCacheTests(TestCase):
+    """Renders are content-addressed, reused, and produced once under concurrency"""
+
+    def setUp(self):
+        import os
+        from django.test import override_settings
+
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.media_root = media_root.name
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.clips = []
+        for letter in ('م', 'ه'):
+            path = os.path.join(self.media_root, f'{letter}.mp4')
+            with open(path, 'wb') as f:
+                f.write(letter.encode('utf-8'))
+            self.clips.append(path)
+
+    def fake_concatenate(self, calls):
+        import time
+
+        def concatenate(clip_paths, output_path):
+            calls.append(list(clip_paths))
+            time.sleep(0.05)
+            with open(output_path, 'wb') as f:
+                f.write(b'video')
+            return output_path
+        return concatenate
+
+    def test_render_key_follows_clips(self):
+        from .rendering import render_key
+
+        key = render_key(self.clips)
+        self.assertEqual(render_key(self.clips), key)
+        self.assertNotEqual(render_key(self.clips[::-1]), key)
+        with open(self.clips[0], 'ab') as f:
+            f.write(b'changed')
+        self.assertNotEqual(render_key(self.clips), key)
+
+    def test_render_is_reused(self):
+        import os
+        from unittest import mock
+        from .rendering import render_clips
+
+        calls = []
+        with mock.patch('video_app.video_processing.concatenate_videos', self.fake_concatenate(calls)):
+            first = render_clips(self.clips)
+            second = render_clips(self.clips)
+
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+        self.assertEqual(first['name'], second['name'])
+        self.assertTrue(first['name'].startswith('renders/') and first['name'].endswith('.mp4'))
+        self.assertTrue(os.path.exists(first['path']))
+
+    def test_concurrent_renders_run_once(self):
+        import threading
+        from unittest import mock
+        from .rendering import render_clips
+
+        calls, results = [], []
+        with mock.patch('video_app.video_processing.concatenate_videos', self.fake_concatenate(calls)):
+            threads = [threading.Thread(target=lambda: results.append(render_clips(self.clips))) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({result['name'] for result in results}), 1)
+
+    def test_failed_render_leaves_nothing_behind(self):
+        import os
+        from unittest import mock
+        from .rendering import render_clips
+
+        with mock.patch('video_app.video_processing.concatenate_videos', side_effect=RuntimeError('codec')):
+            self.assertIsNone(render_clips(self.clips))
+        leftovers = [name for _, _, files in os.walk(os.path.join(self.media_root, 'renders')) for name in files]
+        self.assertEqual(leftovers, [])
+
+
+class ASRBackendTests(TestCase):
+    """Backends are tried in configured order; unavailable or failing ones are skipped"""
+
+    def setUp(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from . import asr
+
+        calls = self.calls = []
+
+        class Unavailable(asr.ASRBackend):
+            name = 'unavailable'
+
+            def is_available(self):
+                return False
+
+        class Broken(asr.ASRBackend):
+            name = 'broken'
+
+            def transcribe(self, pcm, sample_rate, language):
+                calls.append(self.name)
+                raise RuntimeError('engine crashed')
+
+        class Silent(asr.ASRBackend):
+            name = 'silent'
+
+            def transcribe(self, pcm, sample_rate, language):
+                calls.append(self.name)
+                raise asr.NoSpeechError('No speech recognized')
+
+        class Echo(asr.ASRBackend):
+            name = 'echo'
+
+            def transcribe(self, pcm, sample_rate, language):
+                calls.append(self.name)
+                return f'{len(pcm)} bytes'
+
+        cache.clear()
+        for patcher in (
+            mock.patch.dict(asr.BACKEND_CLASSES, {
+                'unavailable': Unavailable, 'broken': Broken, 'silent': Silent, 'echo': Echo,
+            }),
+            mock.patch.object(asr, '_backends', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def use_backends(self, *names):
+        return override_settings(ASR_BACKENDS=list(names))
+
+    def test_falls_back_to_the_next_backend(self):
+        from . import asr
+
+        with self.use_backends('unavailable', 'broken', 'echo'):
+            self.assertEqual([backend.name for backend in asr.get_backends()], ['broken', 'echo'])
+            result = asr.transcribe(b'\x00\x01' * 8)
+            self.assertEqual((result['text'], result['backend'], result['cached']), ('16 bytes', 'echo', False))
+            self.assertTrue(asr.transcribe(b'\x00\x01' * 8)['cached'])
+
+        self.assertEqual(self.calls, ['broken', 'echo'])
+        self.assertGreaterEqual(asr.get_asr_metrics()['broken']['errors'], 1)
+
+    def test_no_speech_ends_the_chain(self):
+        from . import asr
+
+        with self.use_backends('silent', 'echo'):
+            with self.assertRaises(asr.NoSpeechError):
+                asr.transcribe(b'\x00\x02' * 8)
+        self.assertEqual(self.calls, ['silent'])
+
+    def test_every_backend_failing(self):
+        from . import asr
+
+        with self.use_backends('broken'):
+            with self.assertRaisesMessage(asr.TranscriptionError, 'engine crashed'):
+                asr.transcribe(b'\x00\x03' * 8)
+            self.assertIsInstance(asr.open_stream(), asr.BufferedStream)
+
+    def test_whisper_model_must_be_on_disk(self):
+        from unittest import mock
+        from .asr import WhisperBackend
+
+        with mock.patch.object(WhisperBackend, '_model_source', None):
+            with override_settings(ASR_WHISPER_MODEL_PATH='/nonexistent/whisper'):
+                self.assertIsNone(WhisperBackend.model_source())
+            with tempfile.TemporaryDirectory() as model_dir, override_settings(ASR_WHISPER_MODEL_PATH=model_dir):
+                self.assertEqual(WhisperBackend.model_source(), model_dir)
+
+
+class PlaylistTests(TestCase):
+    """Progressive playlists list the ready prefix of a sentence as MPEG-TS segments"""
+
+    def setUp(self):
+        from .rendering import _known_duration
+        _known_duration.cache_clear()
+
+    def test_catalog_words_are_ready_at_once(self):
+        import os
+        from django.test import override_settings
+        from .rendering import CATALOG_DIR, load_playlist, start_playlist
+        from .utils import sharded_name
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            for word in ('مرحبا', 'شكرا'):
+                path = os.path.join(media_root, sharded_name(CATALOG_DIR, f'{word}.mp4'))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, 'wb').close()
+
+            playlist = start_playlist('مرحبا شكرا')
+            self.assertEqual([segment['word'] for segment in playlist['segments']], ['مرحبا', 'شكرا'])
+            self.assertTrue(playlist['complete'])
+            self.assertEqual(load_playlist(playlist['key'])['segments'], playlist['segments'])
+            self.assertIsNone(start_playlist('xyz'))
+
+    def test_m3u8_lists_ts_copies_of_the_ready_prefix(self):
+        from unittest import mock
+        from .rendering import build_m3u8
+
+        playlist = {'complete': False, 'segments': [
+            {'word': word, 'name': f'catalog/00/{word}.mp4', 'ready': ready}
+            for word, ready in (('a', True), ('b', True), ('c', False))
+        ]}
+        with mock.patch('video_app.rendering._probe_duration', return_value=1.5), \
+                mock.patch('video_app.rendering.hls_segment', side_effect=lambda name: name[:-4] + '.ts'):
+            m3u8 = build_m3u8(playlist, 'http://testserver')
+            self.assertIn('#EXT-X-VERSION:3', m3u8)
+            self.assertEqual(m3u8.count('#EXTINF:1.500,'), 2)
+            self.assertEqual(m3u8.count('#EXT-X-DISCONTINUITY'), 1)
+            self.assertIn('http://testserver/media/catalog/00/b.ts', m3u8)
+            self.assertNotIn('.mp4', m3u8)
+            self.assertNotIn('#EXT-X-ENDLIST', m3u8)
+
+            playlist['segments'][2]['ready'] = playlist['complete'] = True
+            self.assertTrue(build_m3u8(playlist).endswith('#EXT-X-ENDLIST\n'))
+
+    def test_failed_duration_probe_is_not_cached(self):
+        from unittest import mock
+        from .rendering import build_m3u8
+
+        playlist = {'complete': True, 'segments': [{'word': 'a', 'name': 'catalog/00/a.mp4', 'ready': True}]}
+        with mock.patch('video_app.rendering._probe_duration', side_effect=[0.0, 2.0]), \
+                mock.patch('video_app.rendering.hls_segment', side_effect=lambda name: name[:-4] + '.ts'):
+            m3u8 = build_m3u8(playlist)
+            self.assertNotIn('#EXTINF', m3u8)
+            self.assertNotIn('#EXT-X-ENDLIST', m3u8)
+            self.assertIn('#EXTINF:2.000,a', build_m3u8(playlist))
+
+
+class JobQueueTests(TestCase):
+    """Stale in-progress jobs are judged by their claim time"""
+
+    def test_requeue_uses_claimed_at(self):
+        from .jobs import claim_jobs, requeue_stale_jobs
+
+        session = GestureSession.objects.create()
+        old = TextToSign.objects.create(session=session, input_text='old')
+        TextToSign.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(hours=2))
+
+        # Created long ago but claimed just now: not stale
+        self.assertEqual(claim_jobs(TextToSign, 1), [old.pk])
+        self.assertEqual(requeue_stale_jobs(30), 0)
+
+        TextToSign.objects.filter(pk=old.pk).update(claimed_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(30), 1)
+        old.refresh_from_db()
+        self.assertEqual(old.processing_status, 'pending')
+        self.assertIsNone(old.claimed_at)
+
+
+class LogSinkTests(TestCase):
+    """One malformed session id does not cost the rest of the batch"""
+
+    def test_invalid_session_id_is_dropped(self):
+        from .log_sink import SystemLogSink, coerce_session_id
+
+        session = GestureSession.objects.create()
+        self.assertIsNone(coerce_session_id('not-a-uuid'))
+        self.assertEqual(coerce_session_id(str(session.pk)), session.pk)
+
+        batch = [
+            SystemLog(level='INFO', message='bad', module='tests', session_id=coerce_session_id('not-a-uuid')),
+            SystemLog(level='INFO', message='good', module='tests', session_id=coerce_session_id(str(session.pk))),
+        ]
+        SystemLogSink()._write(batch)
+        self.assertEqual(SystemLog.objects.filter(module='tests').count(), 2)
+        self.assertEqual(SystemLog.objects.get(message='good').session_id, session.pk)
+
+    def test_block_policy_never_blocks_the_event_loop(self):
+        import asyncio
+        import os
+        import time
+        from .log_sink import SystemLogSink
+
+        sink = SystemLogSink(max_queue=1, overflow='block', block_timeout=5)
+        sink._pid = os.getpid()  # no writer thread, so the queue stays full
+
+        async def emit_twice():
+            sink.emit('INFO', 'first', 'tests')
+            started = time.monotonic()
+            sink.emit('INFO', 'second', 'tests')
+            return time.monotonic() - started
+
+        self.assertLess(asyncio.run(emit_twice()), 1)
+        self.assertEqual(sink.dropped, 1)
+
+
+class ConsumerLogTests(TransactionTestCase):
+    """WebSocket events are still written when the SystemLog sink is disabled"""
+
+    def test_events_are_written_off_the_loop_without_the_sink(self):
+        from asgiref.sync import async_to_sync
+        from django.test import override_settings
+        from .consumers import GestureConsumer
+
+        consumer = GestureConsumer()
+        consumer.session_id = str(GestureSession.objects.create().pk)
+        with override_settings(LOG_SINK={'ENABLED': False}):
+            async_to_sync(consumer.log_system_event)('INFO', 'connected')
+
+        log = SystemLog.objects.get(module='WebSocket Consumer')
+        self.assertEqual(log.message, 'connected')
+        self.assertEqual(str(log.session_id), consumer.session_id)
+
+
+class RollupAtomicityTests(TransactionTestCase):
+    """A write whose rollup update fails is rolled back with it"""
+
+    def test_gesture_is_not_kept_without_its_rollup(self):
+        from unittest import mock
+        from asgiref.sync import async_to_sync
+        from django.db import DatabaseError
+        from .consumers import GestureConsumer
+
+        consumer = GestureConsumer()
+        consumer.session_id = str(GestureSession.objects.create().pk)
+        with mock.patch('video_app.signals.record_gesture', side_effect=DatabaseError('rollup')):
+            with self.assertRaises(DatabaseError):
+                async_to_sync(consumer.save_gesture)({'gesture_type': 'مهندس', 'confidence': 0.9})
+        self.assertFalse(HandGesture.objects.exists())
+
+    def test_session_is_not_kept_without_its_rollup(self):
+        from unittest import mock
+        from django.db import DatabaseError
+
+        user = User.objects.create_user('creator', password='creator')
+        self.client.force_login(user)
+        with mock.patch('video_app.signals.record_session', side_effect=DatabaseError('rollup')):
+            response = self.client.post('/sessions/create/', {'session_name': 'Rolled back'})
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(GestureSession.objects.exists())
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+class ResultNotificationTests(TestCase):
+    """Results reach the SSE stream or the polling shims; SSE refuses to run where it cannot"""
+
+    def session_request(self, path):
+        from importlib import import_module
+        from django.conf import settings
+        from django.test import AsyncRequestFactory
+
+        request = AsyncRequestFactory().get(path)
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+        request.session.create()
+        return request
+
+    def test_polling_shims_pop_each_result_once(self):
+        from asgiref.sync import async_to_sync
+        from .result_store import get_result_store
+        from .views import detect_refresh, detect_refresh_txt
+
+        request = self.session_request('/detect_refresh/')
+        store = get_result_store()
+        store.add(request.session.session_key, 'gesture', {'kind': 'gesture', 'text': 'مهندس', 'videosrc': '/media/a.mp4'})
+        store.add(request.session.session_key, 'text', {'kind': 'text', 'text': 'مرحبا', 'videosrc': None})
+
+        for view, text in ((detect_refresh, 'مهندس'), (detect_refresh_txt, 'مرحبا')):
+            with self.subTest(view=view.__name__):
+                first = json.loads(async_to_sync(view)(request).content)
+                self.assertEqual((first['statue'], first['text']), (True, text))
+                self.assertEqual(json.loads(async_to_sync(view)(request).content), {'statue': False})
+
+    def test_event_stream_delivers_pending_and_published_results(self):
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+        from .notifications import result_events, results_group
+        from .result_store import get_result_store
+
+        request = self.session_request('/results/events/')
+        session_key = request.session.session_key
+        get_result_store().add(session_key, 'text', {'kind': 'text', 'text': 'مرحبا', 'videosrc': None})
+        pushed = {'kind': 'gesture', 'text': 'مهندس', 'videosrc': '/media/a.mp4'}
+
+        async def read_stream():
+            response = await result_events(request)
+            stream = response.streaming_content
+            chunks = [await stream.__anext__(), await stream.__anext__()]
+            await get_channel_layer().group_send(results_group(session_key), {'type': 'result_ready', 'result': pushed})
+            chunks.append(await stream.__anext__())
+            await stream.aclose()
+            return response, [chunk.decode('utf-8') for chunk in chunks]
+
+        with override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}):
+            response, chunks = async_to_sync(read_stream)()
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(chunks[0], 'retry: 3000\n\n')
+        self.assertTrue(chunks[1].startswith('event: text\n') and 'مرحبا' in chunks[1])
+        self.assertTrue(chunks[2].startswith('event: gesture\n') and 'مهندس' in chunks[2])
+
+    def test_event_stream_unavailable(self):
+        from asgiref.sync import async_to_sync
+        from django.test import RequestFactory
+        from .notifications import result_events
+        from .result_store import get_result_store
+
+        # WSGI: the stream would pin a worker thread
+        response = async_to_sync(result_events)(RequestFactory().get('/results/events/'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(json.loads(response.content)['poll']['gesture'], '/detect_refresh/')
+
+        # ASGI without a channel layer; pending results stay for the shims
+        request = self.session_request('/results/events/')
+        get_result_store().add(request.session.session_key, 'text', {'kind': 'text', 'text': 'مرحبا', 'videosrc': None})
+        with override_settings(CHANNEL_LAYERS={}):
+            response = async_to_sync(result_events)(request)
+        self.assertEqual(response.status_code, 503)
+        self.assertIsNotNone(get_result_store().pop_pending(request.session.session_key, 'text'))
+
+
+class SessionDataCacheTests(TestCase):
+    """A gesture write retires cached connect payloads, including ones cached after it"""
+
+    def test_invalidation_bumps_the_version(self):
+        import uuid
+        from django.core.cache import cache
+        from .utils import invalidate_session_data, session_data_cache_key, session_data_version
+
+        session_id = uuid.uuid4()
+        version = session_data_version(session_id)
+        self.assertEqual(session_data_version(session_id), version)
+
+        # A reader that loaded the session before the write caches it afterwards
+        invalidate_session_data([session_id])
+        cache.set(session_data_cache_key(session_id, version), {'recent_gestures': []})
+
+        current = session_data_version(session_id)
+        self.assertNotEqual(current, version)
+        self.assertIsNone(cache.get(session_data_cache_key(session_id, current)))
+
+
+class ResultStoreTests(TestCase):
+    """Concurrent results for one session are all kept"""
+
+    def test_concurrent_add(self):
+        import threading
+        import time
+        from django.core.cache import caches
+        from .result_store import ResultStore
+
+        class SlowReadCache:
+            # Widens the window between reading and writing the ring buffer
+            def __getattr__(self, name):
+                return getattr(caches['default'], name)
+
+            def get(self, key, default=None):
+                value = caches['default'].get(key, default)
+                if key.endswith(':recent'):
+                    time.sleep(0.001)
+                return value
+
+        class SlowResultStore(ResultStore):
+            cache = SlowReadCache()
+
+        store = SlowResultStore(max_results=100)
+        session_key = 'concurrent-session'
+
+        def add_results(worker):
+            for i in range(10):
+                store.add(session_key, 'gesture', {'worker': worker, 'index': i})
+
+        threads = [threading.Thread(target=add_results, args=(worker,)) for worker in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(store.recent(session_key, 'gesture')), 50)
+        self.assertIsNotNone(store.pop_pending(session_key, 'gesture'))
+        self.assertIsNone(store.pop_pending(session_key, 'gesture'))
+
+
+class RateLimitTests(TestCase):
+    """Session API routes have their own limits and forged X-Forwarded-For hops are ignored"""
+
+    def test_route_patterns(self):
+        from .ratelimit import DEFAULT_RATE_LIMITS, LocalBackend, RateLimiter
+
+        limiter = RateLimiter(LocalBackend(), DEFAULT_RATE_LIMITS['default'], DEFAULT_RATE_LIMITS['routes'])
+        scope, rule = limiter.rule_for('/api/sessions/6f1c2f9e-0000-4000-8000-000000000000/gestures/')
+        self.assertEqual(rule['limit'], 60)
+        self.assertEqual(limiter.rule_for('/voice-to-sign/')[1]['limit'], 20)
+        self.assertEqual(limiter.rule_for('/sessions/')[0], 'default')
+
+    def test_client_ip_uses_trusted_hop(self):
+        from django.test import RequestFactory, override_settings
+        from .utils import get_client_ip
+
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.7', REMOTE_ADDR='10.0.0.1')
+        with override_settings(RATE_LIMIT_TRUSTED_PROXIES=0):
+            self.assertEqual(get_client_ip(request), '10.0.0.1')
+        with override_settings(RATE_LIMIT_TRUSTED_PROXIES=1):
+            self.assertEqual(get_client_ip(request), '10.0.0.7')
+        with override_settings(RATE_LIMIT_TRUSTED_PROXIES=2):
+            self.assertEqual(get_client_ip(request), '1.2.3.4')
+
+
+class AudioDecodeTests(TestCase):
+    """Uploads decode in memory: WAV in-process, everything else through an ffmpeg pipe"""
+
+    def wav_bytes(self, frames: bytes, channels: int = 1, sample_width: int = 2, rate: int = 16000) -> bytes:
+        import io
+        import wave
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav_file:
+            wav_file.setnchannels(channels)
+            wav_file.setsampwidth(sample_width)
+            wav_file.setframerate(rate)
+            wav_file.writeframes(frames)
+        return buffer.getvalue()
+
+    def test_decode_wav(self):
+        import numpy as np
+        from .audio import AudioDecodeError, decode_audio, decode_wav
+
+        # Stereo 8 kHz: channels are averaged, then upsampled to 16 kHz
+        stereo = np.array([[1000, 3000]] * 800, dtype='<i2').tobytes()
+        samples = decode_wav(self.wav_bytes(stereo, channels=2, rate=8000))
+        self.assertEqual(samples.dtype, np.int16)
+        self.assertEqual(len(samples), 1600)
+        self.assertTrue(np.all(samples == 2000))
+
+        # 8-bit PCM is unsigned around 128
+        samples = decode_audio(self.wav_bytes(bytes([128, 192] * 10), sample_width=1))
+        self.assertEqual(samples[:2].tolist(), [0, 64 * 256])
+
+        with self.assertRaises(AudioDecodeError):
+            decode_wav(b'RIFF\x00\x00\x00\x00WAVEjunk')
+        with self.assertRaises(AudioDecodeError):
+            decode_audio(b'')
+
+    def test_compressed_audio_is_piped_through_ffmpeg(self):
+        import subprocess
+        from unittest import mock
+        import numpy as np
+        from .audio import AudioDecodeError, decode_audio
+
+        pcm = np.arange(4, dtype='<i2').tobytes()
+        completed = subprocess.CompletedProcess([], 0, stdout=pcm, stderr=b'')
+        webm = b'\x1a\x45\xdf\xa3' + b'\x00' * 60
+        m4a = b'\x00\x00\x00\x20ftypM4A ' + b'\x00' * 60
+
+        with mock.patch('video_app.audio.shutil.which', return_value='/usr/bin/ffmpeg'), \
+                mock.patch('video_app.audio.subprocess.run', return_value=completed) as run:
+            self.assertEqual(decode_audio(webm).tolist(), [0, 1, 2, 3])
+            command = run.call_args.args[0]
+            self.assertEqual(command[command.index('-i') + 1], 'pipe:0')
+            self.assertEqual(run.call_args.kwargs['input'], webm)
+            self.assertEqual(command[command.index('-ar') + 1], '16000')
+
+            # MP4/M4A may keep its index at the end, so ffmpeg gets a seekable path instead of a pipe
+            decode_audio(m4a)
+            command = run.call_args.args[0]
+            self.assertNotEqual(command[command.index('-i') + 1], 'pipe:0')
+            self.assertIsNone(run.call_args.kwargs['input'])
+
+            run.return_value = subprocess.CompletedProcess([], 1, stdout=b'', stderr=b'Invalid data')
+            with self.assertRaisesMessage(AudioDecodeError, 'Invalid data'):
+                decode_audio(webm)
+
+        with mock.patch('video_app.audio.shutil.which', return_value=None):
+            with self.assertRaisesMessage(AudioDecodeError, 'ffmpeg is not installed'):
+                decode_audio(webm)
+
+
+class StreamingAudioTests(TestCase):
+    """Voice input: chunked resampling, split samples and energy-based speech detection"""
+
+    def test_resampler_matches_whole_clip(self):
+        import numpy as np
+        from .audio import StreamingResampler
+
+        samples = (np.sin(np.arange(4800) / 48000 * 2 * np.pi * 440) * 10000).astype(np.int16)
+        expected = np.interp(np.arange(1600) * 3, np.arange(len(samples)), samples)
+
+        resampler = StreamingResampler(48000, 16000)
+        chunks = [resampler.feed(samples[start:start + 333]) for start in range(0, len(samples), 333)]
+        np.testing.assert_allclose(np.concatenate(chunks), expected, atol=0.01)
+
+    def test_odd_byte_is_carried_over(self):
+        from .voice_stream import VoiceStream
+
+        stream = VoiceStream(on_words=None, input_format='pcm16', sample_rate=16000)
+        pcm = bytes(range(10))
+        self.assertEqual(stream._resample_pcm(pcm[:3]) + stream._resample_pcm(pcm[3:]), pcm)
+
+    def test_energy_vad_keeps_continuous_speech(self):
+        from unittest import mock
+        import numpy as np
+        from .vad import speech_mask
+
+        rate = 16000
+        rng = np.random.default_rng(0)
+        speech = (rng.standard_normal(rate) * 3000).astype(np.int16)
+        silence = (rng.standard_normal(rate // 2) * 30).astype(np.int16)
+
+        # The energy fallback, even where webrtcvad is installed
+        with mock.patch('video_app.vad._webrtc_mask', return_value=None):
+            self.assertTrue(speech_mask(speech, rate).all())
+            mask = speech_mask(np.concatenate([silence, speech, silence]), rate)
+        self.assertFalse(mask[:10].any())
+        self.assertTrue(mask[20:40].all())
+
+
+class SQLiteConnectionTests(TestCase):
+    """Every new SQLite connection gets settings.SQLITE_PRAGMAS"""
+
+    def open_connection(self, name):
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+
+        wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': name}, alias='pragma_test')
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_pragmas_applied_on_connect(self):
+        import os
+        from .db import describe_connection
+
+        if connection.vendor != 'sqlite':
+            self.skipTest(f'No PRAGMAs on {connection.vendor}')
+        pragmas = {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 1234}
+        with tempfile.TemporaryDirectory() as directory, override_settings(SQLITE_PRAGMAS=pragmas):
+            info = describe_connection(self.open_connection(os.path.join(directory, 'db.sqlite3')))
+        self.assertEqual(info['journal_mode'], 'wal')
+        self.assertEqual(info['synchronous'], 1)  # NORMAL
+        self.assertEqual(info['busy_timeout'], 1234)
+
+    def test_no_pragmas_leaves_defaults(self):
+        import os
+
+        if connection.vendor != 'sqlite':
+            self.skipTest(f'No PRAGMAs on {connection.vendor}')
+        with tempfile.TemporaryDirectory() as directory, override_settings(SQLITE_PRAGMAS={}):
+            wrapper = self.open_connection(os.path.join(directory, 'db.sqlite3'))
+            with wrapper.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                self.assertEqual(cursor.fetchone()[0], 'delete')
+
+    def test_other_vendors_are_ignored(self):
+        from unittest import mock
+        from .db import configure_sqlite
+
+        other = mock.Mock(vendor='postgresql')
+        configure_sqlite(sender=None, connection=other)
+        other.connection.cursor.assert_not_called()
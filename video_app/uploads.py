@@ -0,0 +1,200 @@
+"""
+Streaming upload handling
+
+Uploads are written to storage chunk by chunk (``UploadedFile.chunks()``)
+while their SHA-256 is computed on the fly, so memory use per upload stays
+bounded by the chunk size whatever the file size. The file type is checked
+against magic bytes before anything is written.
+"""
+import os
+import uuid
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterable, Iterator, Union
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+HEADER_SIZE = 32
+
+VIDEO_KINDS = ('webm', 'isobmff', 'avi')
+AUDIO_KINDS = ('webm', 'ogg', 'wav', 'mp3', 'isobmff')
+
+
+class UploadRejected(Exception):
+    """Raised when an upload fails validation"""
+
+
+def sniff_kind(header: bytes) -> Optional[str]:
+    """
+    Identify a media container from its first bytes
+
+    Args:
+        header: At least the first 12 bytes of the file
+
+    Returns:
+        Container kind (webm, isobmff, avi, wav, ogg, mp3) or None
+    """
+    if header.startswith(b'\x1a\x45\xdf\xa3'):
+        return 'webm'  # EBML: WebM / Matroska
+    if header[4:8] == b'ftyp':
+        return 'isobmff'  # MP4 / MOV / M4A
+    if header.startswith(b'RIFF'):
+        if header[8:12] == b'AVI ':
+            return 'avi'
+        if header[8:12] == b'WAVE':
+            return 'wav'
+    if header.startswith(b'OggS'):
+        return 'ogg'
+    if header.startswith(b'ID3') or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    return None
+
+
+def read_header(upload) -> bytes:
+    """Read the first bytes of an upload and rewind it"""
+    upload.seek(0)
+    header = upload.read(HEADER_SIZE)
+    upload.seek(0)
+    return header
+
+
+class HashingFile(File):
+    """File wrapper that hashes the content as storage consumes its chunks"""
+
+    def __init__(self, upload):
+        super().__init__(upload, name=upload.name)
+        self.upload = upload
+        self.hasher = hashlib.sha256()
+        self.bytes_read = 0
+
+    def chunks(self, chunk_size=None) -> Iterable[bytes]:
+        self.upload.seek(0)
+        for chunk in self.upload.chunks(chunk_size):
+            self.hasher.update(chunk)
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    @property
+    def size(self):
+        return self.upload.size
+
+    def hexdigest(self) -> str:
+        return self.hasher.hexdigest()
+
+
+def validate_upload(upload, allowed_kinds: Optional[Iterable[str]] = None,
+                    max_size: Optional[int] = None) -> Optional[str]:
+    """
+    Validate an upload's size and magic bytes without reading the body
+
+    Returns:
+        Detected container kind
+
+    Raises:
+        UploadRejected: If the upload is empty, too large or of the wrong type
+    """
+    if not upload.size:
+        raise UploadRejected('File is empty')
+    if max_size and upload.size > max_size:
+        raise UploadRejected(f'File too large (max {max_size // (1024 * 1024)}MB)')
+
+    kind = sniff_kind(read_header(upload))
+    if allowed_kinds is not None and kind not in allowed_kinds:
+        raise UploadRejected('Unsupported or corrupted file format')
+    return kind
+
+
+def save_upload(upload, directory: str, filename: Optional[str] = None,
+                allowed_kinds: Optional[Iterable[str]] = None,
+                max_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Validate and stream an upload to storage
+
+    Args:
+        upload: Django UploadedFile
+        directory: Storage directory
+        filename: Optional file name (defaults to a unique name keeping the extension)
+        allowed_kinds: Accepted container kinds (see sniff_kind); None skips the check
+        max_size: Maximum size in bytes
+
+    Returns:
+        Dictionary with the stored name, sha256, kind and size
+
+    Raises:
+        UploadRejected: If validation fails
+    """
+    kind = validate_upload(upload, allowed_kinds, max_size)
+
+    if not filename:
+        extension = os.path.splitext(upload.name)[1].lower()
+        filename = f'{uuid.uuid4().hex}{extension}'
+
+    content = HashingFile(upload)
+    name = default_storage.save(os.path.join(directory, filename), content)
+
+    return {
+        'name': name,
+        'sha256': content.hexdigest(),
+        'kind': kind,
+        'size': content.bytes_read,
+    }
+
+
+@contextmanager
+def seekable_source(data: bytes) -> Iterator[str]:
+    """
+    Expose bytes as a seekable path for decoders and child processes
+
+    Uses a memfd on Linux so the data never touches a disk filesystem and
+    falls back to a private temp file elsewhere. The backing file is always
+    released on exit.
+    """
+    if hasattr(os, 'memfd_create'):
+        fd = os.memfd_create('upload', 0)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            yield f'/proc/{os.getpid()}/fd/{fd}'
+        finally:
+            os.close(fd)
+        return
+
+    temp_file = tempfile.NamedTemporaryFile(delete=False)
+    try:
+        temp_file.write(data)
+        temp_file.close()
+        yield temp_file.name
+    finally:
+        temp_file.close()
+        os.unlink(temp_file.name)
+
+
+@contextmanager
+def upload_source(upload: Union[bytes, Any]) -> Iterator[str]:
+    """
+    Give a decoder (e.g. cv.VideoCapture) a path to an upload's content
+
+    Large uploads that Django already spooled to disk are used in place;
+    in-memory uploads and raw bytes are exposed through ``seekable_source``
+    without writing them to the media tree.
+
+    Args:
+        upload: Django UploadedFile or bytes
+    """
+    if hasattr(upload, 'temporary_file_path'):
+        yield upload.temporary_file_path()
+        return
+
+    if isinstance(upload, (bytes, bytearray, memoryview)):
+        data = bytes(upload)
+    else:
+        upload.seek(0)
+        data = b''.join(upload.chunks())
+
+    with seekable_source(data) as path:
+        yield path
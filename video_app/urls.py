@@ -1,6 +1,7 @@
 # video_app/urls.py
 from django.urls import path, include
 from . import views
+from .notifications import result_events
 
 app_name = 'video_app'
 
@@ -27,11 +28,16 @@ urlpatterns = [
     path('text-to-sign/', views.TextToSignView.as_view(), name='text_to_sign'),
     path('stream-text-to-sign/', views.StreamTextToSignView.as_view(), name='stream_text_to_sign'),
     path('upload_text/', views.StreamTextToSignView.as_view(), name='upload_text'),  # Legacy compatibility
+    path('stream-text-to-sign/playlist/', views.StreamTextToSignPlaylistView.as_view(), name='stream_text_to_sign_playlist'),
+    path('playlists/<slug:key>.m3u8', views.text_to_sign_playlist, name='text_to_sign_playlist'),
     path('voice-to-sign/', views.VoiceToSignView.as_view(), name='voice_to_sign'),
     path('stream-voice-to-sign/', views.StreamVoiceToSignView.as_view(), name='stream_voice_to_sign'),
     path('upload_voice/', views.StreamVoiceToSignView.as_view(), name='upload_voice'),  # Legacy compatibility
     
-    # Legacy refresh detection endpoints
+    # Result push stream (Server-Sent Events)
+    path('results/events/', result_events, name='result_events'),
+    
+    # Legacy refresh detection endpoints (compatibility shims)
     path('detect_refresh/', views.detect_refresh, name='detect_refresh'),
     path('detect_refresh_txt/', views.detect_refresh_txt, name='detect_refresh_txt'),
     
@@ -39,4 +45,5 @@ urlpatterns = [
     path('api/sessions/<uuid:session_id>/gestures/', views.GestureAPIView.as_view(), name='api_gesture'),
     path('api/sessions/<uuid:session_id>/text-to-sign/', views.TextToSignAPIView.as_view(), name='api_text_to_sign'),
     path('api/sessions/<uuid:session_id>/voice-to-sign/', views.VoiceToSignAPIView.as_view(), name='api_voice_to_sign'),
+    path('api/stats/', views.system_stats, name='api_stats'),
 ]
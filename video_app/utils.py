@@ -7,31 +7,42 @@ import hashlib
 import uuid
 from typing import Optional, Dict, Any
 from django.conf import settings
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
+from django.core.cache import cache
 from django.utils import timezone
 from .models import SystemLog, GestureSession
+from .log_sink import coerce_session_id, get_log_sink
 
 logger = logging.getLogger(__name__)
 
 
-def log_system_event(level: str, message: str, module: str, session: Optional[GestureSession] = None):
+def log_system_event(level: str, message: str, module: str, session: Optional[GestureSession] = None,
+                     session_id=None):
     """
     Log system events to database
     
+    Events go through the buffered SystemLog sink and are written in
+    batches by a background thread.
+    
     Args:
         level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         message: Log message
         module: Module name
         session: Optional session reference
+        session_id: Optional session primary key (avoids loading the session)
     """
+    if session is not None:
+        session_id = session.pk
     try:
-        SystemLog.objects.create(
-            level=level,
-            message=message,
-            module=module,
-            session=session
-        )
+        sink = get_log_sink()
+        if sink is not None:
+            sink.emit(level, message, module, session_id=session_id)
+        else:
+            SystemLog.objects.create(
+                level=level,
+                message=message,
+                module=module,
+                session_id=coerce_session_id(session_id)
+            )
     except Exception as e:
         logger.error(f"Failed to log system event: {str(e)}")
 
@@ -97,11 +108,13 @@ def save_uploaded_file(file, directory: str, filename: Optional[str] = None) ->
         Saved file path or None if error
     """
     try:
+        from .uploads import save_upload
+        
         if not filename:
             filename = f"{uuid.uuid4()}_{file.name}"
         
-        file_path = os.path.join(directory, filename)
-        saved_path = default_storage.save(file_path, ContentFile(file.read()))
+        # Streams chunks to storage instead of reading the whole file into memory
+        saved_path = save_upload(file, directory, filename)['name']
         
         log_system_event('INFO', f"File saved: {saved_path}", 'FileUtils')
         return saved_path
@@ -111,41 +124,100 @@ def save_uploaded_file(file, directory: str, filename: Optional[str] = None) ->
         return None
 
 
-def cleanup_old_files(directory: str, max_age_days: int = 7):
+def cleanup_old_files(directory: str, max_age_days: int = 7, dry_run: bool = False) -> Dict[str, Any]:
     """
     Clean up old files from directory
     
     Args:
-        directory: Directory to clean
+        directory: Directory to clean, relative to MEDIA_ROOT
         max_age_days: Maximum age of files in days
+        dry_run: Only report what would be deleted
+        
+    Returns:
+        GC report with files deleted and bytes reclaimed
     """
+    from .storage_gc import collect_directory
     try:
-        from datetime import timedelta
-        cutoff_date = timezone.now() - timedelta(days=max_age_days)
-        
-        # This would need to be implemented based on your storage backend
-        # For now, just log the intention
-        log_system_event('INFO', f"Cleanup requested for directory: {directory}", 'FileUtils')
+        report = collect_directory(directory, max_age_hours=max_age_days * 24, dry_run=dry_run)
+        log_system_event(
+            'INFO',
+            f"Cleanup of {directory}: {report['files_deleted']} files, "
+            f"{format_file_size(report['bytes_reclaimed'])} reclaimed",
+            'FileUtils'
+        )
+        return report
     except Exception as e:
         logger.error(f"Error during file cleanup: {str(e)}")
+        return {'directory': directory, 'files_scanned': 0, 'files_deleted': 0,
+                'bytes_reclaimed': 0, 'bytes_kept': 0, 'error': str(e)}
+
+
+# Lifetime of a session's data version; an expired version only costs a cache miss
+SESSION_DATA_VERSION_TIMEOUT = 60 * 60 * 24
+
+
+def _session_data_version_key(session_id) -> str:
+    return f'gesture_session_data_version:{session_id}'
+
+
+def session_data_version(session_id) -> str:
+    """
+    Current version of a session's cached WebSocket connect payload
+
+    Versions are random tokens rather than counters, so a version that was
+    evicted or expired never comes back and revives an old payload.
+    """
+    key = _session_data_version_key(session_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        # Another worker may have started the version first
+        cache.add(key, version, SESSION_DATA_VERSION_TIMEOUT)
+        version = cache.get(key) or version
+    return version
+
+
+def session_data_cache_key(session_id, version: str) -> str:
+    """Cache key of a session's WebSocket connect payload (GestureConsumer.get_session_data)"""
+    return f'gesture_session_data:{session_id}:{version}'
+
+
+def invalidate_session_data(session_ids):
+    """
+    Retire the cached connect payloads of sessions whose gestures changed
+
+    Bumping the version rather than deleting the payload also covers a reader
+    that loaded the old gestures before the write and caches them after it:
+    that payload lands under the retired version and is never read.
+    """
+    cache.set_many(
+        {_session_data_version_key(session_id): uuid.uuid4().hex for session_id in set(session_ids)},
+        SESSION_DATA_VERSION_TIMEOUT
+    )
 
 
 def get_client_ip(request) -> str:
     """
     Get client IP address from request
     
+    X-Forwarded-For is only trusted as far as settings.RATE_LIMIT_TRUSTED_PROXIES
+    reverse proxies in front of the app append to it: the client is the
+    address the outermost trusted proxy saw. Anything left of that hop was
+    sent by the client and can be forged.
+    
     Args:
         request: Django request object
         
     Returns:
         Client IP address
     """
+    trusted_proxies = getattr(settings, 'RATE_LIMIT_TRUSTED_PROXIES', 0)
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
+    if trusted_proxies and x_forwarded_for:
+        hops = [hop.strip() for hop in x_forwarded_for.split(',') if hop.strip()]
+        if hops:
+            return hops[-min(trusted_proxies, len(hops))]
+    return request.META.get('REMOTE_ADDR')
 
 
 def sanitize_filename(filename: str) -> str:
@@ -195,6 +267,53 @@ def format_file_size(size_bytes: int) -> str:
     return f"{size_bytes:.1f} {size_names[i]}"
 
 
+# Files are spread over SHARD_DEPTH levels of SHARD_WIDTH hex characters
+# taken from a hash of their name, e.g. renders/3f/a2/<key>.mp4, which keeps
+# every directory small no matter how many files the tree holds
+SHARD_DEPTH = 2
+SHARD_WIDTH = 2
+
+
+def shard_prefix(key: str) -> str:
+    """
+    Hash-derived directory prefix for a file or directory name
+    
+    Args:
+        key: Name to shard (file name, session ID, render key)
+        
+    Returns:
+        Prefix such as '3f/a2'
+    """
+    digest = hashlib.md5(str(key).encode('utf-8')).hexdigest()
+    return '/'.join(digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_DEPTH))
+
+
+def sharded_name(base: str, filename: str) -> str:
+    """Storage name of a file in the sharded layout: <base>/<prefix>/<filename>"""
+    return f"{base}/{shard_prefix(filename)}/{filename}"
+
+
+def sharded_directory(base: str, key: str) -> str:
+    """Storage name of a per-key directory in the sharded layout: <base>/<prefix>/<key>"""
+    return f"{base}/{shard_prefix(key)}/{key}"
+
+
+def create_sharded_directory(base: str, key: str) -> str:
+    """
+    Create a per-key directory in the sharded layout
+    
+    Args:
+        base: Top-level media directory (e.g. 'gesture_videos')
+        key: Directory key (e.g. session ID)
+        
+    Returns:
+        Created directory path relative to MEDIA_ROOT
+    """
+    directory = sharded_directory(base, key)
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, directory), exist_ok=True)
+    return directory
+
+
 def create_session_directory(session_id: str) -> str:
     """
     Create directory structure for session files
@@ -208,7 +327,7 @@ def create_session_directory(session_id: str) -> str:
     try:
         from datetime import datetime
         date_path = datetime.now().strftime('%Y/%m/%d')
-        session_dir = os.path.join('sessions', str(session_id), date_path)
+        session_dir = f"{sharded_directory('sessions', str(session_id))}/{date_path}"
         
         # Create directory if it doesn't exist
         full_path = os.path.join(settings.MEDIA_ROOT, session_dir)
@@ -217,7 +336,7 @@ def create_session_directory(session_id: str) -> str:
         return session_dir
     except Exception as e:
         logger.error(f"Error creating session directory: {str(e)}")
-        return f"sessions/{session_id}"
+        return sharded_directory('sessions', str(session_id))
 
 
 def validate_session_access(request, session_id: str) -> bool:
@@ -248,26 +367,15 @@ def get_system_stats() -> Dict[str, Any]:
     """
     Get system statistics
     
+    Read from the incrementally maintained rollups (see video_app.stats)
+    and cached briefly, so no call scans the session or gesture tables.
+    
     Returns:
         Dictionary with system stats
     """
     try:
-        from django.db.models import Count, Avg
-        from datetime import datetime, timedelta
-        
-        now = timezone.now()
-        last_24h = now - timedelta(hours=24)
-        
-        stats = {
-            'total_sessions': GestureSession.objects.count(),
-            'active_sessions': GestureSession.objects.filter(is_active=True).count(),
-            'sessions_last_24h': GestureSession.objects.filter(created_at__gte=last_24h).count(),
-            'total_gestures': 0,  # Would need to import HandGesture
-            'avg_confidence': 0,  # Would need to import HandGesture
-            'system_uptime': 'N/A',  # Would need to implement uptime tracking
-        }
-        
-        return stats
+        from .stats import get_stats
+        return get_stats()
     except Exception as e:
         logger.error(f"Error getting system stats: {str(e)}")
         return {}
@@ -0,0 +1,159 @@
+"""
+Voice activity detection for decoded PCM
+
+Classifies 30 ms frames as speech or silence (WebRTC VAD when the
+``webrtcvad`` package is installed, an adaptive energy threshold otherwise),
+then trims leading/trailing silence and splits long voice notes at pauses
+into utterances that can be transcribed independently.
+"""
+import logging
+from typing import List, Tuple
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 30
+
+DEFAULT_VAD_SETTINGS = {
+    'aggressiveness': 2,          # WebRTC VAD mode, 0 (lenient) to 3 (strict)
+    'energy_margin_db': 10.0,     # dB above the noise floor counted as speech
+    'min_energy_db': -50.0,       # never treat quieter frames as speech
+    'max_noise_floor_db': -40.0,  # louder "floors" are speech, not background noise
+    'min_silence_ms': 500,        # pause length that ends an utterance
+    'min_speech_ms': 150,         # drop blips shorter than this
+    'padding_ms': 200,            # context kept around each utterance
+    'max_utterance_seconds': 15,  # split longer utterances at their quietest point
+}
+
+
+def get_vad_settings() -> dict:
+    return {**DEFAULT_VAD_SETTINGS, **getattr(settings, 'ASR_VAD', {})}
+
+
+def _frames(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    frame_count = len(samples) // frame_length
+    return samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+
+
+def frame_energies(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """RMS level of each frame in dBFS"""
+    frames = _frames(samples, sample_rate * FRAME_MS // 1000).astype(np.float32) / 32768.0
+    if not len(frames):
+        return np.zeros(0, dtype=np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def _webrtc_mask(samples: np.ndarray, sample_rate: int, aggressiveness: int):
+    try:
+        import webrtcvad
+    except ImportError:
+        return None
+    if sample_rate not in (8000, 16000, 32000, 48000):
+        return None
+    vad = webrtcvad.Vad(aggressiveness)
+    frames = _frames(samples.astype('<i2'), sample_rate * FRAME_MS // 1000)
+    return np.array([vad.is_speech(frame.tobytes(), sample_rate) for frame in frames], dtype=bool)
+
+
+def speech_mask(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    Classify each 30 ms frame as speech (True) or silence (False)
+
+    Args:
+        samples: Mono int16 PCM
+        sample_rate: Sample rate of ``samples``
+
+    Returns:
+        Boolean array with one entry per frame
+    """
+    vad_settings = get_vad_settings()
+    mask = _webrtc_mask(samples, sample_rate, vad_settings['aggressiveness'])
+    if mask is not None:
+        return mask
+
+    energies = frame_energies(samples, sample_rate)
+    if not len(energies):
+        return np.zeros(0, dtype=bool)
+    audible = energies > vad_settings['min_energy_db']
+    low, high = np.percentile(energies, [10, 90])
+    if high - low < vad_settings['energy_margin_db']:
+        # No quiet stretch to measure noise against (e.g. speech from start to
+        # end): keep everything audible rather than cut speech as "noise"
+        return audible
+    # The quietest tenth of a clip with little silence is still speech
+    noise_floor = min(low, vad_settings['max_noise_floor_db'])
+    return audible & (energies > noise_floor + vad_settings['energy_margin_db'])
+
+
+def _split_long(start: int, end: int, energies: np.ndarray, max_frames: int) -> List[Tuple[int, int]]:
+    """Split a frame range longer than max_frames at its quietest frames"""
+    ranges = []
+    while end - start > max_frames:
+        # Cut in the quietest frame of the last third of the window
+        search_start = start + (max_frames * 2) // 3
+        search_end = start + max_frames
+        cut = search_start + int(np.argmin(energies[search_start:search_end]))
+        ranges.append((start, cut))
+        start = cut
+    ranges.append((start, end))
+    return ranges
+
+
+def detect_utterances(samples: np.ndarray, sample_rate: int) -> List[Tuple[int, int]]:
+    """
+    Find speech regions separated by pauses
+
+    Args:
+        samples: Mono int16 PCM
+        sample_rate: Sample rate of ``samples``
+
+    Returns:
+        List of (start_sample, end_sample) ranges in order
+    """
+    vad_settings = get_vad_settings()
+    mask = speech_mask(samples, sample_rate)
+    if not mask.any():
+        return []
+
+    min_silence = max(1, vad_settings['min_silence_ms'] // FRAME_MS)
+    min_speech = max(1, vad_settings['min_speech_ms'] // FRAME_MS)
+    padding = vad_settings['padding_ms'] // FRAME_MS
+    max_frames = int(vad_settings['max_utterance_seconds'] * 1000 // FRAME_MS)
+
+    # Group speech frames, bridging pauses shorter than min_silence
+    regions = []
+    speech_frames = np.flatnonzero(mask)
+    region_start = previous = speech_frames[0]
+    for frame in speech_frames[1:]:
+        if frame - previous > min_silence:
+            regions.append((region_start, previous + 1))
+            region_start = frame
+        previous = frame
+    regions.append((region_start, previous + 1))
+
+    energies = frame_energies(samples, sample_rate)
+    frame_length = sample_rate * FRAME_MS // 1000
+    utterances = []
+    for start, end in regions:
+        if end - start < min_speech:
+            continue
+        start = max(0, start - padding)
+        end = min(len(mask), end + padding)
+        for part_start, part_end in _split_long(start, end, energies, max_frames):
+            utterances.append((part_start * frame_length, min(len(samples), part_end * frame_length)))
+    return utterances
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Drop leading and trailing silence (returns an empty array if no speech)"""
+    utterances = detect_utterances(samples, sample_rate)
+    if not utterances:
+        return samples[:0]
+    return samples[utterances[0][0]:utterances[-1][1]]
+
+
+def split_utterances(samples: np.ndarray, sample_rate: int) -> List[np.ndarray]:
+    """Split PCM into speech-only utterances (views into ``samples``)"""
+    return [samples[start:end] for start, end in detect_utterances(samples, sample_rate)]
@@ -222,7 +222,7 @@ def prepare_video(video):
         return None
 
 
-def concatenate_videos(video_filenames):
+def concatenate_videos(video_filenames, output_path=None):
     video_clips = [cv.VideoCapture(filename) for filename in video_filenames]
     
     # Get the width, height, and FPS of the first video
@@ -231,7 +231,8 @@ def concatenate_videos(video_filenames):
     fps = video_clips[0].get(cv.CAP_PROP_FPS)
     
     # Create a VideoWriter object
-    output_path = os.path.join(settings.BASE_DIR, 'media', 'concatenated_video.mp4')
+    if output_path is None:
+        output_path = os.path.join(settings.BASE_DIR, 'media', 'concatenated_video.mp4')
 
     # out = cv.VideoWriter(output_path, cv.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
     out = cv.VideoWriter(output_path, cv.VideoWriter_fourcc(*'H264'), fps, (width, height), False)
@@ -248,38 +249,42 @@ def concatenate_videos(video_filenames):
     out.release()
     return output_path
 
-def concatenate_letters(letters_filenames, file_name):
-    video_clips = [cv.VideoCapture(filename) for filename in letters_filenames]
-    
-    # Get the width, height, and FPS of the first video
-    width = int(video_clips[0].get(cv.CAP_PROP_FRAME_WIDTH))
-    height = int(video_clips[0].get(cv.CAP_PROP_FRAME_HEIGHT))
-    fps = video_clips[0].get(cv.CAP_PROP_FPS)
-    
-    # Create a VideoWriter object
-    output_path = os.path.join(settings.BASE_DIR, 'media', f'{file_name}.mp4')
+def get_video_duration(video_path):
+    """Return the duration of a video in seconds (0.0 if it cannot be read)"""
+    cap = cv.VideoCapture(video_path)
+    try:
+        frame_count = cap.get(cv.CAP_PROP_FRAME_COUNT)
+        fps = cap.get(cv.CAP_PROP_FPS)
+        return float(frame_count / fps) if fps else 0.0
+    finally:
+        cap.release()
 
-    # out = cv.VideoWriter(output_path, cv.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
-    out = cv.VideoWriter(output_path, cv.VideoWriter_fourcc(*'H264'), fps, (width, height), False)
 
-    
-    for clip in video_clips:
-        while True:
-            ret, frame = clip.read()
-            if not ret:
-                break
-            out.write(frame)
-        clip.release()
-    
-    out.release()
-    return output_path
+def transcribe_audio(audio, language="ar"):
+    """
+    Decode an upload (or raw bytes) in memory and transcribe it
+
+    Raises audio.AudioDecodeError for undecodable input, asr.NoSpeechError
+    for an unintelligible recording and asr.TranscriptionError when every
+    backend failed.
+    """
+    from .audio import decode_audio
+    from .asr import transcribe_speech, SAMPLE_RATE
+
+    pcm = decode_audio(audio, SAMPLE_RATE)
+    return transcribe_speech(pcm, SAMPLE_RATE, language)['text']
+
+
+def transcribe_audio_file(audio_path, language="ar"):
+    """Transcribe a stored audio file"""
+    with open(audio_path, 'rb') as audio_file:
+        return transcribe_audio(audio_file.read(), language)
 
 
 # Async wrapper functions for WebSocket compatibility
 import asyncio
-import tempfile
-import uuid
 from typing import Dict, Optional
+from channels.db import database_sync_to_async
 
 async def process_gesture_video_async(video_data: bytes, session_id: str) -> Dict:
     """
@@ -289,26 +294,19 @@ async def process_gesture_video_async(video_data: bytes, session_id: str) -> Dic
         print(f"🔍 [DEBUG] process_gesture_video_async called with session_id: {session_id}")
         print(f"🔍 [DEBUG] Video data size: {len(video_data)} bytes")
         
-        # Save video data to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as temp_file:
-            temp_file.write(video_data)
-            temp_video_path = temp_file.name
+        # JSON messages carry the video base64-encoded (optionally as a data URL)
+        if isinstance(video_data, str):
+            import base64
+            video_data = base64.b64decode(video_data.split(',')[-1])
         
-        print(f"🔍 [DEBUG] Saved video to temporary file: {temp_video_path}")
-        
-        # Process the video using the synchronous function
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, prepare_video, temp_video_path)
+        # Hand the bytes to OpenCV through an in-memory file instead of a temp file
+        from .uploads import upload_source
+        loop = asyncio.get_running_loop()
+        with upload_source(video_data) as video_path:
+            result = await loop.run_in_executor(None, prepare_video, video_path)
         
         print(f"🔍 [DEBUG] prepare_video returned: {result}")
         
-        # Clean up temporary file
-        try:
-            os.unlink(temp_video_path)
-            print(f"🔍 [DEBUG] Cleaned up temporary file: {temp_video_path}")
-        except:
-            pass
-        
         if result:
             return {
                 "success": True,
@@ -326,30 +324,46 @@ async def process_gesture_video_async(video_data: bytes, session_id: str) -> Dic
 async def process_text_to_sign_async(text: str, session_id: str) -> Dict:
     """
     Async wrapper for text-to-sign conversion
+
+    Queues a TextToSign row for the render job runner, which pushes the
+    finished video to the session group once it is ready.
     """
     try:
-        # This would implement the text-to-sign logic
-        # For now, return a placeholder
+        from .jobs import enqueue_text_to_sign
+        conversion = await database_sync_to_async(enqueue_text_to_sign)(text, session_id)
         return {
             "success": True,
-            "video_url": "/media/placeholder_text_to_sign.mp4",
-            "conversion_id": str(uuid.uuid4())
+            "queued": True,
+            "conversion_id": str(conversion.id)
         }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-async def process_voice_to_sign_async(audio_data: bytes, session_id: str) -> Dict:
+async def process_voice_to_sign_async(audio_data, session_id: str) -> Dict:
     """
-    Async wrapper for voice-to-sign conversion
+    Async wrapper for voice-to-sign conversion of a complete recording
+
+    ``audio_data`` is the recording as bytes or a base64 string (JSON
+    messages). Live microphone input should use the binary voice stream.
     """
     try:
-        # This would implement the voice-to-sign logic
-        # For now, return a placeholder
+        import base64
+        from .rendering import render_text
+        
+        if isinstance(audio_data, str):
+            audio_data = base64.b64decode(audio_data.split(',')[-1])
+        
+        loop = asyncio.get_running_loop()
+        transcribed_text = await loop.run_in_executor(None, transcribe_audio, audio_data)
+        render = await loop.run_in_executor(None, render_text, transcribed_text)
+        if not render:
+            return {"success": False, "error": "Failed to process recognized text"}
+        
         return {
             "success": True,
-            "transcribed_text": "Transcribed text placeholder",
-            "video_url": "/media/placeholder_voice_to_sign.mp4",
-            "conversion_id": str(uuid.uuid4())
+            "transcribed_text": transcribed_text,
+            "video_url": render['url'],
+            "conversion_id": render['key']
         }
     except Exception as e:
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        return {"success": False, "error": str(e)}
@@ -1,7 +1,10 @@
 import os
 import logging
 import uuid
+from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import transaction
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse, HttpResponse
 from django.views.generic import TemplateView, FormView, ListView, DetailView, View
@@ -9,26 +12,21 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.urls import reverse_lazy, reverse
 from django.utils import timezone
-from django.db.models import Q
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from .forms import VideoUploadForm, TextInputForm, VoiceUploadForm, SessionForm, GestureSearchForm
 from .models import GestureSession, HandGesture, TextToSign, VoiceToSign, SystemLog
+from .utils import sharded_directory, get_system_stats
+from .pagination import KeysetPaginationMixin
+from .search import search_gestures
+from .uploads import save_upload, validate_upload, upload_source, UploadRejected, VIDEO_KINDS, AUDIO_KINDS
+from .rendering import render_text, start_playlist, load_playlist, build_m3u8
+from .notifications import publish_result, apop_pending_result, recent_results, last_result
 # Lazy imports to avoid loading heavy libraries during startup
 # from .video_processing import process_gesture_video_async, process_text_to_sign_async, process_voice_to_sign_async
 
 logger = logging.getLogger(__name__)
 
-# Global variables to manage recording state (for backward compatibility)
-predicted_texts = []
-Refresh = False
-current_vid = 'background.mp4'
-translated_texts = ''
-Refresh_txt = False
-
-
 # Video path mappings for gesture types
 VIDEO_PATHS = {
     'السلام عليكم': os.path.join(settings.BASE_DIR, 'video_app', 'models', 'video1.mp4'),
@@ -45,6 +43,23 @@ VIDEO_PATHS_MEDIA = {
 }
 
 
+def gesture_video_url(request, text):
+    """Absolute URL of the sample sign video for a recognized gesture, if any"""
+    if text in VIDEO_PATHS and os.path.exists(VIDEO_PATHS[text]):
+        return request.build_absolute_uri(settings.MEDIA_URL + VIDEO_PATHS_MEDIA[text])
+    return None
+
+
+def legacy_result_context(request):
+    """Template context with the session's latest gesture and text results"""
+    text = last_result(request, 'text')
+    return {
+        'predicted_texts': [result['text'] for result in recent_results(request, 'gesture')],
+        'translated_texts': text['text'] if text else '',
+        'video_url': text['videosrc'] if text else None,
+    }
+
+
 class IndexView(TemplateView):
     """Main landing page view"""
     template_name = 'video_app/index.html'
@@ -65,7 +80,7 @@ class AboutView(TemplateView):
         return context
 
 
-class SessionListView(LoginRequiredMixin, ListView):
+class SessionListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """View for listing gesture sessions"""
     model = GestureSession
     template_name = 'video_app/session_list.html'
@@ -96,10 +111,12 @@ class SessionCreateView(LoginRequiredMixin, FormView):
     success_url = reverse_lazy('video_app:session_list')
     
     def form_valid(self, form):
-        session = GestureSession.objects.create(
-            user=self.request.user,
-            session_name=form.cleaned_data['session_name']
-        )
+        # The stats rollups are updated by post_save; commit them with the row
+        with transaction.atomic():
+            session = GestureSession.objects.create(
+                user=self.request.user,
+                session_name=form.cleaned_data['session_name']
+            )
         messages.success(self.request, f'Session "{session.session_name}" created successfully!')
         return redirect('video_app:session_detail', pk=session.pk)
 
@@ -130,16 +147,7 @@ class ResponseView(TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Add global variables for backward compatibility
-        global predicted_texts, translated_texts, current_vid
-        context['predicted_texts'] = predicted_texts
-        context['translated_texts'] = translated_texts
-        context['current_vid'] = current_vid
-        
-        # Add video URL if available
-        if current_vid and current_vid != 'background.mp4':
-            context['video_url'] = self.request.scheme + '://' + self.request.get_host() + '/media/' + current_vid
-        
+        context.update(legacy_result_context(self.request))
         return context
 
 
@@ -149,17 +157,12 @@ class StreamView(TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Add global variables for backward compatibility
-        global predicted_texts, translated_texts, current_vid
-        context['predicted_texts'] = predicted_texts
-        context['translated_texts'] = translated_texts
-        context['current_vid'] = current_vid
+        context.update(legacy_result_context(self.request))
         
-        # Add video URL if available
-        if current_vid and current_vid != 'background.mp4':
-            context['video'] = self.request.scheme + '://' + self.request.get_host() + '/media/' + current_vid
-        else:
-            context['video'] = self.request.scheme + '://' + self.request.get_host() + '/media/' + 'background.mp4'
+        # Show the latest sign video, or the idle background
+        context['video'] = context['video_url'] or self.request.build_absolute_uri(
+            settings.MEDIA_URL + 'background.mp4'
+        )
         
         return context
 
@@ -181,37 +184,25 @@ class VideoUploadView(FormView):
             print(f"   - File size: {video_file.size} bytes")
             print(f"   - Content type: {video_file.content_type}")
             
-            # Save file temporarily
-            file_path = default_storage.save(
-                f'temp/{video_file.name}',
-                ContentFile(video_file.read())
-            )
-            
-            print(f"🔍 [DEBUG] Video saved to: {file_path}")
-            
-            # Get the full path for processing
-            full_path = os.path.join(settings.MEDIA_ROOT, file_path)
-            print(f"🔍 [DEBUG] Full path for processing: {full_path}")
+            validate_upload(video_file, VIDEO_KINDS, max_size=50 * 1024 * 1024)
             
-            # Actually process the video using the working function
+            # Decode straight from the upload, without a copy under media/temp
             from .video_processing import prepare_video
             print(f"🔍 [DEBUG] Starting video processing...")
             
-            result = prepare_video(full_path)
+            with upload_source(video_file) as video_path:
+                result = prepare_video(video_path)
             print(f"🔍 [DEBUG] Video processing result: {result}")
             
             if result:
-                # Update global variables for backward compatibility
-                global predicted_texts, Refresh
-                predicted_texts.append(result)
-                Refresh = True
+                # Push the result to the session's subscribers and polling shims
+                publish_result(self.request, 'gesture', result, gesture_video_url(self.request, result))
                 
                 return JsonResponse({
                     'statue': True,
                     'text': result,
                     'success': True,
-                    'message': 'Video processed successfully',
-                    'file_path': file_path
+                    'message': 'Video processed successfully'
                 })
             else:
                 return JsonResponse({
@@ -221,6 +212,12 @@ class VideoUploadView(FormView):
                     'error': 'No gesture detected'
                 })
             
+        except UploadRejected as e:
+            return JsonResponse({
+                'statue': False,
+                'success': False,
+                'error': str(e)
+            }, status=400)
         except Exception as e:
             print(f"❌ [DEBUG] Error uploading video: {str(e)}")
             logger.error(f"Error uploading video: {str(e)}")
@@ -275,69 +272,25 @@ class StreamVideoUploadView(View):
                     'error': 'Video file too large (max 50MB)'
                 }, status=400)
             
-            # Save file temporarily with proper extension
-            file_extension = os.path.splitext(video_file.name)[1].lower()
-            if not file_extension:
-                # Default to .webm if no extension
-                file_extension = '.webm'
-            
-            # Ensure we have a valid extension
-            if file_extension not in ['.webm', '.mp4', '.avi', '.mov']:
-                file_extension = '.webm'
-            
-            temp_filename = f'hand-detection-video_{uuid.uuid4().hex[:8]}{file_extension}'
-            
-            # Reset file pointer to beginning
-            video_file.seek(0)
-            
-            file_path = default_storage.save(
-                f'temp/{temp_filename}',
-                ContentFile(video_file.read())
-            )
-            
-            print(f"🔍 [DEBUG] Video saved to: {file_path}")
-            
-            # Get the full path for processing
-            full_path = os.path.join(settings.MEDIA_ROOT, file_path)
-            print(f"🔍 [DEBUG] Full path for processing: {full_path}")
+            validate_upload(video_file, VIDEO_KINDS)
             
-            # Process the video using the working function
+            # Decode straight from the upload, without a copy under media/temp
             from .video_processing import prepare_video
             print(f"🔍 [DEBUG] Starting video processing...")
             
-            # Check if file exists and is readable
-            if not os.path.exists(full_path):
-                return JsonResponse({
-                    'statue': False,
-                    'success': False,
-                    'error': 'Video file not found after saving'
-                }, status=500)
-            
-            file_size = os.path.getsize(full_path)
-            print(f"🔍 [DEBUG] File size: {file_size} bytes")
-            
-            if file_size == 0:
-                return JsonResponse({
-                    'statue': False,
-                    'success': False,
-                    'error': 'Video file is empty'
-                }, status=500)
-            
-            result = prepare_video(full_path)
+            with upload_source(video_file) as video_path:
+                result = prepare_video(video_path)
             print(f"🔍 [DEBUG] Video processing result: {result}")
             
             if result:
-                # Update global variables for backward compatibility
-                global predicted_texts, Refresh
-                predicted_texts.append(result)
-                Refresh = True
+                # Push the result to the session's subscribers and polling shims
+                publish_result(request, 'gesture', result, gesture_video_url(request, result))
                 
                 return JsonResponse({
                     'statue': True,
                     'text': result,
                     'success': True,
-                    'message': 'Video processed successfully',
-                    'file_path': file_path
+                    'message': 'Video processed successfully'
                 })
             else:
                 return JsonResponse({
@@ -347,6 +300,12 @@ class StreamVideoUploadView(View):
                     'error': 'No gesture detected'
                 })
             
+        except UploadRejected as e:
+            return JsonResponse({
+                'statue': False,
+                'success': False,
+                'error': str(e)
+            }, status=400)
         except Exception as e:
             print(f"❌ [DEBUG] Error uploading video: {str(e)}")
             logger.error(f"Error uploading video: {str(e)}")
@@ -373,16 +332,11 @@ class TextToSignView(FormView):
             print(f"🔍 [DEBUG] TextToSignView form_valid received: {text}")
             session_id = self.kwargs.get('session_id', str(uuid.uuid4()))
             
-            # Process text to sign using the working function
-            video_path = process_text(text)
-            if video_path:
-                # Update global variables for backward compatibility
-                global translated_texts, Refresh_txt, current_vid
-                translated_texts = text
-                current_vid = 'concatenated_video.mp4'
-                Refresh_txt = True
-                
-                last_video_path = self.request.scheme + '://' + self.request.get_host() + '/media/' + 'concatenated_video.mp4'
+            # Render text to a content-addressed sign video
+            render = render_text(text)
+            if render:
+                last_video_path = self.request.build_absolute_uri(render['url'])
+                publish_result(self.request, 'text', text, last_video_path)
                 print(f"🔍 [DEBUG] TextToSignView video URL: {last_video_path}")
                 return JsonResponse({
                     'statue': True,
@@ -427,11 +381,8 @@ class VoiceToSignView(FormView):
             voice_file = form.cleaned_data['voice_note']
             session_id = self.kwargs.get('session_id', str(uuid.uuid4()))
             
-            # Save file temporarily
-            file_path = default_storage.save(
-                f'temp/{voice_file.name}',
-                ContentFile(voice_file.read())
-            )
+            # Stream the file to temporary storage, validating its magic bytes
+            file_path = save_upload(voice_file, 'temp', allowed_kinds=AUDIO_KINDS)['name']
             
             # Process voice to sign (this would be done asynchronously)
             # For now, return a placeholder response
@@ -442,6 +393,11 @@ class VoiceToSignView(FormView):
                 'video_url': '/media/placeholder_voice_to_sign.mp4'
             })
             
+        except UploadRejected as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=400)
         except Exception as e:
             logger.error(f"Error converting voice to sign: {str(e)}")
             return JsonResponse({
@@ -481,72 +437,26 @@ class StreamVoiceToSignView(View):
                     'error': 'Voice file too large (max 25MB)'
                 }, status=400)
             
-            # Save file temporarily with proper extension
-            file_extension = os.path.splitext(voice_file.name)[1].lower()
-            if not file_extension:
-                # Default to .webm if no extension
-                file_extension = '.webm'
-            
-            # Ensure we have a valid extension
-            if file_extension not in ['.webm', '.wav', '.mp3', '.m4a']:
-                file_extension = '.webm'
-            
-            temp_filename = f'voice-note_{uuid.uuid4().hex[:8]}{file_extension}'
-            
-            # Reset file pointer to beginning
-            voice_file.seek(0)
-            
-            file_path = default_storage.save(
-                f'temp/{temp_filename}',
-                ContentFile(voice_file.read())
-            )
-            
-            # Get the full path for processing
-            full_path = os.path.join(settings.MEDIA_ROOT, file_path)
-            
-            # Process voice to text using speech recognition
+            # Decode the upload in memory and transcribe it; no temp files are written
+            from .audio import AudioDecodeError
+            from .asr import NoSpeechError, TranscriptionError
             try:
-                import speech_recognition as sr
-                from pydub import AudioSegment
-                
-                # Convert audio file to wav format for speech recognition
-                audio_file_path = os.path.join(settings.MEDIA_ROOT, f'temp/converted_audio_{uuid.uuid4().hex[:8]}.wav')
-                audio = AudioSegment.from_file(full_path)
-                audio.export(audio_file_path, format="wav")
-                
-                # Perform speech recognition
-                recognizer = sr.Recognizer()
-                with sr.AudioFile(audio_file_path) as source:
-                    recognizer.adjust_for_ambient_noise(source)
-                    audio_data = recognizer.record(source)
-                    spoken_text = recognizer.recognize_google(audio_data, language="ar")
+                from .video_processing import transcribe_audio
+                spoken_text = transcribe_audio(voice_file)
                 
                 # Process the recognized text to sign language
-                video_path = process_text(spoken_text)
-                if video_path:
-                    # Update global variables for backward compatibility
-                    global translated_texts, Refresh_txt, current_vid
-                    translated_texts = spoken_text
-                    current_vid = 'concatenated_video.mp4'
-                    Refresh_txt = True
-                    
+                render = render_text(spoken_text)
+                if render:
                     # Create the video URL for the frontend
-                    video_url = request.scheme + '://' + request.get_host() + '/media/' + 'concatenated_video.mp4'
-                    
-                    # Clean up temporary files
-                    try:
-                        os.remove(full_path)
-                        os.remove(audio_file_path)
-                    except:
-                        pass
+                    video_url = request.build_absolute_uri(render['url'])
+                    publish_result(request, 'text', spoken_text, video_url)
                     
                     return JsonResponse({
                         'statue': True,
                         'text': spoken_text,
                         'videosrc': video_url,
                         'success': True,
-                        'message': 'Voice converted successfully',
-                        'file_path': file_path
+                        'message': 'Voice converted successfully'
                     })
                 else:
                     return JsonResponse({
@@ -555,17 +465,23 @@ class StreamVoiceToSignView(View):
                         'error': 'Failed to process recognized text'
                     })
                     
-            except sr.UnknownValueError:
+            except AudioDecodeError as e:
+                return JsonResponse({
+                    'statue': False,
+                    'success': False,
+                    'error': f'Could not decode audio; {e}'
+                })
+            except NoSpeechError:
                 return JsonResponse({
                     'statue': False,
                     'success': False,
                     'error': 'Could not understand audio'
                 })
-            except sr.RequestError as e:
+            except TranscriptionError as e:
                 return JsonResponse({
                     'statue': False,
                     'success': False,
-                    'error': f'Could not request results; {e}'
+                    'error': f'Could not transcribe audio; {e}'
                 })
             except Exception as e:
                 return JsonResponse({
@@ -601,17 +517,12 @@ class StreamTextToSignView(View):
                     'error': 'No text provided'
                 }, status=400)
             
-            # Process text to sign using the working function
-            video_path = process_text(text_input)
-            if video_path:
-                # Update global variables for backward compatibility
-                global translated_texts, Refresh_txt, current_vid
-                translated_texts = text_input
-                current_vid = 'concatenated_video.mp4'
-                Refresh_txt = True
-                
+            # Render text to a content-addressed sign video
+            render = render_text(text_input)
+            if render:
                 # Create the video URL for the frontend
-                video_url = request.scheme + '://' + request.get_host() + '/media/' + 'concatenated_video.mp4'
+                video_url = request.build_absolute_uri(render['url'])
+                publish_result(request, 'text', text_input, video_url)
                 
                 return JsonResponse({
                     'statue': True,
@@ -635,7 +546,86 @@ class StreamTextToSignView(View):
                 'error': 'Failed to process text'
             }, status=500)
 
-class GestureListView(LoginRequiredMixin, ListView):
+class StreamTextToSignPlaylistView(View):
+    """API view for progressive text-to-sign playback"""
+    
+    @method_decorator(csrf_exempt)
+    def dispatch(self, *args, **kwargs):
+        return super().dispatch(*args, **kwargs)
+    
+    def post(self, request):
+        try:
+            text_input = request.POST.get('text_input', '').strip()
+            
+            if not text_input:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'No text provided'
+                }, status=400)
+            
+            # Plan per-word segments; fingerspelled words keep rendering in the background
+            playlist = start_playlist(text_input)
+            if not playlist:
+                return JsonResponse({
+                    'statue': False,
+                    'success': False,
+                    'error': 'Failed to process text'
+                })
+            
+            return JsonResponse({
+                'statue': True,
+                'success': True,
+                'text': text_input,
+                'playlist_url': request.build_absolute_uri(
+                    reverse('video_app:text_to_sign_playlist', args=[playlist['key']])
+                ),
+                'segments': playlist['segments'],
+                'complete': playlist['complete']
+            })
+            
+        except Exception as e:
+            logger.error(f"Error planning text playlist: {str(e)}")
+            return JsonResponse({
+                'success': False,
+                'error': 'Failed to process text'
+            }, status=500)
+
+
+def _render_playlist(key, as_json, base_url):
+    playlist = load_playlist(key)
+    if not playlist or as_json:
+        return playlist, None
+    return playlist, build_m3u8(playlist, base_url)
+
+
+async def text_to_sign_playlist(request, key):
+    """Serve a progressive text-to-sign playlist as HLS (default) or JSON"""
+    # Players poll this while segments render; plan and file checks run in one worker thread hop
+    as_json = request.GET.get('format') == 'json'
+    base_url = request.scheme + '://' + request.get_host()
+    playlist, m3u8 = await sync_to_async(_render_playlist, thread_sensitive=False)(key, as_json, base_url)
+    if not playlist:
+        return JsonResponse({'success': False, 'error': 'Playlist not found'}, status=404)
+    
+    if as_json:
+        response = JsonResponse({'success': True, **playlist})
+        complete = playlist['complete']
+    else:
+        response = HttpResponse(m3u8, content_type='application/vnd.apple.mpegurl')
+        # Segments that could not be remuxed yet keep the HLS playlist open
+        complete = m3u8.endswith('#EXT-X-ENDLIST\n')
+    
+    # The playlist grows until every segment is rendered
+    response['Cache-Control'] = 'no-cache' if not complete else 'public, max-age=31536000, immutable'
+    return response
+
+
+def _start_of_day(day):
+    """Aware datetime at midnight of a date in the current time zone"""
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+class GestureListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """View for listing gestures with search functionality"""
     model = HandGesture
     template_name = 'video_app/gesture_list.html'
@@ -643,24 +633,25 @@ class GestureListView(LoginRequiredMixin, ListView):
     paginate_by = 20
     
     def get_queryset(self):
-        queryset = HandGesture.objects.filter(session__user=self.request.user)
+        queryset = HandGesture.objects.filter(user=self.request.user).select_related('session')
         
         # Apply search filters
         search_query = self.request.GET.get('search_query')
-        date_from = self.request.GET.get('date_from')
-        date_to = self.request.GET.get('date_to')
         
         if search_query:
-            queryset = queryset.filter(
-                Q(gesture_type__icontains=search_query) |
-                Q(session__session_name__icontains=search_query)
-            )
+            queryset = search_gestures(queryset, search_query)
+        
+        # Half-open datetime bounds keep created_at bare, so the created_at indexes apply
+        dates = GestureSearchForm(self.request.GET)
+        dates.is_valid()
+        date_from = dates.cleaned_data.get('date_from')
+        date_to = dates.cleaned_data.get('date_to')
         
         if date_from:
-            queryset = queryset.filter(created_at__date__gte=date_from)
+            queryset = queryset.filter(created_at__gte=_start_of_day(date_from))
         
         if date_to:
-            queryset = queryset.filter(created_at__date__lte=date_to)
+            queryset = queryset.filter(created_at__lt=_start_of_day(date_to + timedelta(days=1)))
         
         return queryset.order_by('-created_at')
     
@@ -715,11 +706,12 @@ class GestureAPIView(APIViewMixin, View):
             print(f"   - File size: {video_file.size} bytes")
             print(f"   - Session ID: {session_id}")
             
-            # Save video file
-            file_path = default_storage.save(
-                f'gesture_videos/{session_id}/{video_file.name}',
-                ContentFile(video_file.read())
-            )
+            # Stream the video file to storage, validating its magic bytes
+            file_path = save_upload(
+                video_file, sharded_directory('gesture_videos', session_id), video_file.name,
+                allowed_kinds=VIDEO_KINDS,
+                max_size=50 * 1024 * 1024
+            )['name']
             
             print(f"🔍 [DEBUG] Video saved to: {file_path}")
             
@@ -750,6 +742,11 @@ class GestureAPIView(APIViewMixin, View):
                     'message': 'Not recognized gesture'
                 })
             
+        except UploadRejected as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=400)
         except Exception as e:
             print(f"❌ [DEBUG] API Error processing video: {str(e)}")
             return self.handle_exception(e, "Failed to process gesture video")
@@ -783,8 +780,7 @@ class TextToSignAPIView(APIViewMixin, View):
                 processing_status='pending'
             )
             
-            # Process text (this would trigger WebSocket processing)
-            # For now, return a placeholder response
+            # The render job runner claims the row and pushes the result to the session group
             return JsonResponse({
                 'success': True,
                 'message': 'Text queued for conversion',
@@ -815,11 +811,12 @@ class VoiceToSignAPIView(APIViewMixin, View):
             voice_file = request.FILES['voice_note']
             session = get_object_or_404(GestureSession, id=session_id)
             
-            # Save audio file
-            file_path = default_storage.save(
-                f'voice_files/{session_id}/{voice_file.name}',
-                ContentFile(voice_file.read())
-            )
+            # Stream the audio file to storage, validating its magic bytes
+            file_path = save_upload(
+                voice_file, sharded_directory('voice_files', session_id), voice_file.name,
+                allowed_kinds=AUDIO_KINDS,
+                max_size=25 * 1024 * 1024
+            )['name']
             
             # Create voice-to-sign conversion record
             conversion = VoiceToSign.objects.create(
@@ -828,8 +825,7 @@ class VoiceToSignAPIView(APIViewMixin, View):
                 processing_status='pending'
             )
             
-            # Process voice (this would trigger WebSocket processing)
-            # For now, return a placeholder response
+            # The render job runner claims the row and pushes the result to the session group
             return JsonResponse({
                 'success': True,
                 'message': 'Voice queued for conversion',
@@ -837,82 +833,48 @@ class VoiceToSignAPIView(APIViewMixin, View):
                 'session_id': session_id
             })
             
+        except UploadRejected as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=400)
         except Exception as e:
             return self.handle_exception(e, "Failed to process voice to sign conversion")
 
-# Utility functions for backward compatibility
-def search_video(text):
-    """Search for video file by text name"""
-    video_files = [file for file in os.listdir(settings.MEDIA_ROOT) if file.endswith(".mp4")]
-    
-    for file in video_files:
-        file_name_without_ext = os.path.splitext(file)[0]
-        if file_name_without_ext == text:
-            video_path = os.path.join(settings.MEDIA_ROOT, file)
-            return video_path
-    
-    return None
+def _staff_system_stats(request):
+    # request.user is loaded lazily from the session, which needs the database
+    if not request.user.is_staff:
+        return None
+    return get_system_stats()
 
 
-def process_text(input_text):
-    """Process text to create sign language video"""
-    words = input_text.split()
-    video_filenames = []
-    
-    for word in words:
-        video_filename = search_video(word)
-        if video_filename:
-            video_filenames.append(video_filename)
-        else:
-            letters_videos = []
-            letters = []
-            for letter in word:
-                letter_filename = search_video(letter)
-                if letter_filename:
-                    letters.append(letter)
-                    letters_videos.append(letter_filename)
-            
-            if letters_videos:
-                from .video_processing import concatenate_letters
-                new_word_video = concatenate_letters(letters_videos, str(letters))            
-                if new_word_video:
-                    video_filenames.append(new_word_video)
-
-    if video_filenames:
-        from .video_processing import concatenate_videos
-        result = concatenate_videos(video_filenames)
-        return result
-    else:
-        return None
+async def system_stats(request):
+    """Dashboard statistics from the precomputed rollups (staff only)"""
+    stats = await sync_to_async(_staff_system_stats)(request)
+    if stats is None:
+        return JsonResponse({'success': False, 'error': 'Staff access required'}, status=403)
+    return JsonResponse({'success': True, 'stats': stats})
 
 
-# Legacy refresh detection endpoints for backward compatibility
-@csrf_exempt
-def detect_refresh(request):
+# Legacy refresh detection endpoints, kept as shims for clients that cannot
+# use the results/events/ stream yet. They are async so polling under ASGI
+# stays on the event loop.
+async def detect_refresh(request):
     """Legacy endpoint for detecting gesture refresh"""
-    global Refresh, predicted_texts
-    if Refresh == True:
-        text = predicted_texts[-1] if predicted_texts else None
-        if text and text in VIDEO_PATHS:
-            video_path = VIDEO_PATHS[text]
-            if os.path.exists(video_path):
-                video_name = VIDEO_PATHS_MEDIA[text]
-                last_video_path = request.scheme + '://' + request.get_host() + '/media/' + video_name
-                Refresh = False
-                return JsonResponse({"statue": True, "text": text, "videosrc": last_video_path}, safe=False)
-        return JsonResponse({"statue": False}, safe=False)
-    else:
-        return JsonResponse({"statue": False}, safe=False)
+    result = await apop_pending_result(request, 'gesture')
+    if result and result['videosrc']:
+        return JsonResponse({"statue": True, "text": result['text'], "videosrc": result['videosrc']}, safe=False)
+    return JsonResponse({"statue": False}, safe=False)
 
 
-@csrf_exempt
-def detect_refresh_txt(request):
+async def detect_refresh_txt(request):
     """Legacy endpoint for detecting text refresh"""
-    global Refresh_txt, translated_texts
-    if Refresh_txt == True:
-        last_video_path = request.scheme + '://' + request.get_host() + '/media/' + 'concatenated_video.mp4'
-        Refresh_txt = False
-        return JsonResponse({"statue": True, "text": translated_texts, "videosrc": last_video_path}, safe=False)
-    else:
-        return JsonResponse({"statue": False}, safe=False)
+    result = await apop_pending_result(request, 'text')
+    if result:
+        return JsonResponse({"statue": True, "text": result['text'], "videosrc": result['videosrc']}, safe=False)
+    return JsonResponse({"statue": False}, safe=False)
+
 
+# csrf_exempt does not wrap coroutine functions on Django 4.2, mark them directly
+detect_refresh.csrf_exempt = True
+detect_refresh_txt.csrf_exempt = True
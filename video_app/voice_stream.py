@@ -0,0 +1,113 @@
+"""
+Streaming voice-to-sign for WebSocket clients
+
+A client opens a stream, sends audio as binary frames (webm/ogg opus from
+MediaRecorder, or raw 16-bit PCM) and closes it. Audio is decoded and fed to
+an incremental recognizer as it arrives, and every finalized word is handed
+to a callback so signs can be shown while the user is still speaking.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+import numpy as np
+from .asr import open_stream, SAMPLE_RATE
+from .audio import StreamingDecoder, StreamingResampler
+
+logger = logging.getLogger(__name__)
+
+MAX_STREAM_BYTES = 25 * 1024 * 1024
+PCM_FORMATS = ('pcm16', 'pcm')
+
+
+class VoiceStreamError(Exception):
+    """Raised when a voice stream cannot accept more audio"""
+
+
+class VoiceStream:
+    """One client's incremental transcription session"""
+
+    def __init__(self, on_words: Callable[[List[str]], Awaitable[None]],
+                 input_format: str = 'webm', sample_rate: int = SAMPLE_RATE, language: str = 'ar'):
+        self.on_words = on_words
+        self.input_format = input_format
+        self.input_rate = sample_rate
+        self.language = language
+        self.words: List[str] = []
+        self.received_bytes = 0
+        self.recognizer = None
+        self.decoder: Optional[StreamingDecoder] = None
+        self.pump_task: Optional[asyncio.Task] = None
+        # Raw PCM: a sample split across frames waits for its second byte
+        self.pcm_remainder = b''
+        self.resampler = StreamingResampler(sample_rate, SAMPLE_RATE)
+
+    @property
+    def is_pcm(self) -> bool:
+        return self.input_format in PCM_FORMATS
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        # Loading the model on first use can take a while, keep it off the event loop
+        self.recognizer = await loop.run_in_executor(None, open_stream, SAMPLE_RATE, self.language)
+        if not self.is_pcm:
+            self.decoder = StreamingDecoder(SAMPLE_RATE)
+            await self.decoder.start()
+            self.pump_task = asyncio.create_task(self._pump())
+
+    async def _emit(self, words: List[str]):
+        if words:
+            self.words.extend(words)
+            await self.on_words(words)
+
+    async def _recognize(self, pcm: bytes):
+        loop = asyncio.get_running_loop()
+        await self._emit(await loop.run_in_executor(None, self.recognizer.accept, pcm))
+
+    async def _pump(self):
+        """Move decoded PCM from ffmpeg into the recognizer until EOF"""
+        while True:
+            pcm = await self.decoder.read()
+            if not pcm:
+                break
+            await self._recognize(pcm)
+
+    def _resample_pcm(self, data: bytes) -> bytes:
+        data = self.pcm_remainder + data
+        whole = len(data) - len(data) % 2
+        self.pcm_remainder = data[whole:]
+        if self.input_rate == SAMPLE_RATE:
+            return data[:whole]
+        samples = self.resampler.feed(np.frombuffer(data[:whole], dtype='<i2'))
+        return np.clip(np.round(samples), -32768, 32767).astype('<i2').tobytes()
+
+    async def feed(self, data: bytes):
+        """Feed one binary frame of audio"""
+        self.received_bytes += len(data)
+        if self.received_bytes > MAX_STREAM_BYTES:
+            raise VoiceStreamError('Voice stream too large (max 25MB)')
+
+        if self.is_pcm:
+            await self._recognize(self._resample_pcm(data))
+        else:
+            await self.decoder.feed(data)
+
+    async def finish(self) -> str:
+        """
+        End the stream and flush the recognizer
+
+        Returns:
+            Full transcript
+        """
+        if self.decoder:
+            await self.decoder.close()
+            await self.pump_task
+            await self.decoder.terminate()
+        loop = asyncio.get_running_loop()
+        await self._emit(await loop.run_in_executor(None, self.recognizer.finish))
+        return ' '.join(self.words)
+
+    async def abort(self):
+        if self.pump_task:
+            self.pump_task.cancel()
+        if self.decoder:
+            await self.decoder.terminate()